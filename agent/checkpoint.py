@@ -0,0 +1,47 @@
+import os
+import pathlib
+import sqlite3
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+CHECKPOINT_PATH = pathlib.Path(os.getenv("SOLACE_CHECKPOINT_PATH", "/tmp/solace/checkpoints.sqlite"))
+
+# State models stored in checkpoints; listed so deserialization doesn't rely on the permissive default
+_STATE_TYPES = [
+    ("agent.states", "Plan"),
+    ("agent.states", "File"),
+    ("agent.states", "TaskPlan"),
+    ("agent.states", "ImplementationTask"),
+    ("agent.states", "CoderState"),
+]
+
+
+def _serializer() -> JsonPlusSerializer:
+    """Serializer restricted to _STATE_TYPES where langgraph-checkpoint supports an allowlist.
+
+    The allowlist (allowed_msgpack_modules) arrived after langgraph-checkpoint
+    3.0.0, which uv.lock pins; that version takes no such argument and
+    deserializes the state models without one.
+    """
+    try:
+        return JsonPlusSerializer(allowed_msgpack_modules=_STATE_TYPES)
+    except TypeError:
+        return JsonPlusSerializer()
+
+
+def make_checkpointer():
+    """Checkpointer for the generation graph, keyed by thread_id (= session id).
+
+    Uses SQLite at SOLACE_CHECKPOINT_PATH when langgraph-checkpoint-sqlite is
+    installed, so a failed run can be resumed even after a restart; otherwise
+    falls back to an in-process saver.
+    """
+    serde = _serializer()
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        return InMemorySaver(serde=serde)
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(CHECKPOINT_PATH), check_same_thread=False)
+    return SqliteSaver(conn, serde=serde)
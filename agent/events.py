@@ -0,0 +1,35 @@
+from typing import Callable, Literal, Optional
+from pydantic import BaseModel, Field
+from langgraph.config import get_stream_writer
+
+from .states import Plan, TaskPlan
+
+EventKind = Literal["plan_ready", "task_plan_ready", "step_started", "file_written", "step_finished", "done"]
+
+
+class GenerationEvent(BaseModel):
+    kind: EventKind = Field(description="What happened: plan_ready, task_plan_ready, step_started, file_written, step_finished or done")
+    step: Optional[int] = Field(None, description="Index of the implementation step the event belongs to")
+    total_steps: Optional[int] = Field(None, description="Number of implementation steps in the task plan")
+    file_path: Optional[str] = Field(None, description="Project-relative path for step and file events")
+    content: Optional[str] = Field(None, description="Content written, for file_written events")
+    plan: Optional[Plan] = Field(None, description="The plan, for plan_ready events")
+    task_plan: Optional[TaskPlan] = Field(None, description="The task plan, for task_plan_ready events")
+    reused_steps: Optional[int] = Field(None, description="Steps kept from the previous run, for task_plan_ready events of incremental runs")
+
+
+def event_emitter() -> Callable[..., None]:
+    """Return a function that emits GenerationEvents on the graph's custom stream.
+
+    Must be called from inside a graph node. Outside a graph run (or when the
+    caller is not streaming) the returned function does nothing.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return lambda *args, **kwargs: None
+
+    def emit(kind: EventKind, **fields) -> None:
+        writer(GenerationEvent(kind=kind, **fields))
+
+    return emit
@@ -0,0 +1,64 @@
+import os
+import re
+
+_WORD = re.compile(r"[#.]?[A-Za-z_$][\w$-]{3,}")
+_COMMON = {
+    "with", "that", "this", "from", "into", "file", "function", "should", "must", "will", "each",
+    "when", "then", "make", "using", "uses", "also", "have", "other", "which", "their", "there",
+    "implement", "create", "update", "add", "ensure", "value", "values", "code", "data",
+}
+
+
+def coder_context_mode() -> str:
+    """How existing files are shown to the coder: "excerpt" (default) or "full"."""
+    mode = os.getenv("SOLACE_CODER_CONTEXT", "excerpt").lower()
+    return mode if mode in ("excerpt", "full") else "excerpt"
+
+
+def excerpt_threshold() -> int:
+    """Files up to this many characters are always sent in full."""
+    try:
+        return int(os.getenv("SOLACE_EXCERPT_THRESHOLD", "4000"))
+    except ValueError:
+        return 4000
+
+
+def _keywords(task_description: str) -> set[str]:
+    words = set()
+    for w in _WORD.findall(task_description):
+        bare = w.lstrip("#.")
+        if bare.lower() in _COMMON:
+            continue
+        words.add(w)
+        words.add(bare)
+    return words
+
+
+def relevant_excerpt(content: str, task_description: str, context: int = 3, head: int = 15, max_lines: int = 200) -> str:
+    """Return the parts of a file that matter for a task, with 1-based line numbers.
+
+    Keeps the first `head` lines (imports, top-level declarations) plus a
+    window of `context` lines around every line mentioning an identifier from
+    the task description. Skipped ranges are marked so the model knows the
+    file continues. Falls back to head and tail when nothing matches.
+    """
+    lines = content.splitlines()
+    keep: set[int] = set(range(min(head, len(lines))))
+    words = _keywords(task_description)
+    for i, line in enumerate(lines):
+        if any(w in line for w in words):
+            keep.update(range(max(0, i - context), min(len(lines), i + context + 1)))
+    if len(keep) <= head:
+        keep.update(range(max(0, len(lines) - head), len(lines)))
+    kept = sorted(keep)[:max_lines]
+
+    out: list[str] = []
+    prev = -1
+    for i in kept:
+        if i != prev + 1:
+            out.append(f"     ... (lines {prev + 2}-{i} omitted)")
+        out.append(f"{i + 1:5d}| {lines[i]}")
+        prev = i
+    if prev + 1 < len(lines):
+        out.append(f"     ... (lines {prev + 2}-{len(lines)} omitted)")
+    return "\n".join(out)
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import pathlib
+import threading
+import time
+import zipfile
+from typing import Callable, Union
+
+from .tracing import metrics
+
+EXPORT_DIR = pathlib.Path(os.getenv("SOLACE_EXPORT_DIR", "/tmp/solace/exports"))
+
+# already-compressed formats: deflating them again costs CPU and saves nothing
+STORED_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico", ".woff", ".woff2", ".zip", ".gz", ".tgz", ".bz2",
+    ".xz", ".7z", ".br", ".zst", ".mp3", ".mp4", ".m4a", ".webm", ".ogg", ".ogv", ".wasm", ".jar", ".whl",
+}
+
+
+def cache_entries() -> int:
+    """How many built archives are kept (SOLACE_EXPORT_CACHE_ENTRIES)."""
+    try:
+        return max(1, int(os.getenv("SOLACE_EXPORT_CACHE_ENTRIES", "16")))
+    except ValueError:
+        return 16
+
+
+def compress_type(path: str) -> int:
+    return zipfile.ZIP_STORED if pathlib.PurePosixPath(path).suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+
+
+def _prune() -> None:
+    archives = []
+    for p in EXPORT_DIR.glob("*.zip"):
+        try:
+            archives.append((p.stat().st_mtime, p))
+        except OSError:
+            continue
+    for _, old in sorted(archives, reverse=True)[cache_entries():]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def _cached(key: str, write: Callable[[zipfile.ZipFile], None]) -> pathlib.Path:
+    # archives are written straight to a temp file and renamed into place, so readers never see a partial one
+    target = EXPORT_DIR / f"{key}.zip"
+    if target.exists():
+        os.utime(target)
+        metrics.incr("export.cache_hits")
+        return target
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+    t0 = time.perf_counter()
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            write(zf)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+    metrics.incr("export.builds")
+    metrics.observe("export.build_ms", (time.perf_counter() - t0) * 1000)
+    _prune()
+    return target
+
+
+def zip_payload(files: dict[str, Union[str, bytes]]) -> pathlib.Path:
+    """ZIP of an in-memory project (path -> content), built once per distinct content."""
+    digests = []
+    for path in sorted(files):
+        content = files[path]
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digests.append(f"{path}\0{hashlib.sha1(data).hexdigest()}")
+    key = "p-" + hashlib.sha1("\n".join(digests).encode()).hexdigest()[:24]
+
+    def write(zf: zipfile.ZipFile) -> None:
+        for path in sorted(files):
+            zf.writestr(path, files[path], compress_type=compress_type(path))
+
+    return _cached(key, write)
+
+
+def zip_directory(directory: pathlib.Path) -> pathlib.Path:
+    """ZIP of a directory, keyed by its files' paths, sizes and mtimes; files are streamed from disk."""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for name in sorted(filenames):
+            p = pathlib.Path(dirpath, name)
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((p, p.relative_to(directory).as_posix(), st.st_size, st.st_mtime_ns))
+    fingerprint = "\n".join(f"{rel}\0{size}\0{mtime}" for _, rel, size, mtime in entries)
+    key = "d-" + hashlib.sha1(f"{directory.resolve()}\n{fingerprint}".encode()).hexdigest()[:24]
+
+    def write(zf: zipfile.ZipFile) -> None:
+        for p, rel, _, _ in entries:
+            try:
+                zf.write(p, arcname=rel, compress_type=compress_type(rel))
+            except OSError:
+                continue
+
+    return _cached(key, write)
+
+
+def zip_bytes(source: Union[pathlib.Path, dict]) -> bytes:
+    """The ZIP of a project directory or payload for st.download_button(data=...).
+
+    Streamlit (1.51, as locked) needs the bytes when the button is
+    rendered, so this runs on every rerun; after the first build it only
+    fingerprints the source and reads the cached archive.
+    """
+    path = zip_directory(source) if isinstance(source, pathlib.Path) else zip_payload(source)
+    return path.read_bytes()
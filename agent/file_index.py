@@ -0,0 +1,240 @@
+import os
+import pathlib
+import re
+import threading
+import weakref
+from bisect import bisect_left, insort
+from typing import Optional
+
+from .storage import DiskBackend, StorageBackend
+
+# Always hidden from listings, on top of the project's own .gitignore
+BUILTIN_IGNORES = [
+    "node_modules/", ".git/", ".venv/", "venv/", "__pycache__/", "dist/", "build/", ".next/", ".nuxt/",
+    ".cache/", ".parcel-cache/", ".turbo/", "coverage/", ".pytest_cache/", ".mypy_cache/", "*.pyc", ".DS_Store",
+]
+
+
+def _translate(glob: str) -> str:
+    out, i = [], 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif glob[i] == "[" and "]" in glob[i + 1:]:
+            end = glob.index("]", i + 1)
+            out.append("[" + glob[i + 1:end].replace("!", "^", 1) + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Subset of .gitignore semantics: globs with * ? ** [..], negation, dir-only and anchored patterns.
+
+    The last matching pattern wins, and nothing under an ignored directory
+    can be re-included (as in git).
+    """
+
+    def __init__(self, patterns: list[str]):
+        self._rules: list[tuple[re.Pattern, bool, bool]] = []
+        for line in patterns:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            body = _translate(line.lstrip("/"))
+            self._rules.append((re.compile(("^" if anchored else "^(?:.*/)?") + body + "$"), negate, dir_only))
+
+    def _match(self, path: str, is_dir: bool) -> bool:
+        ignored = False
+        for regex, negate, dir_only in self._rules:
+            if (not dir_only or is_dir) and regex.match(path):
+                ignored = not negate
+        return ignored
+
+    def ignored(self, path: str, is_dir: bool = False) -> bool:
+        parts = path.split("/")
+        for n in range(1, len(parts)):
+            if self._match("/".join(parts[:n]), True):
+                return True
+        return self._match(path, is_dir)
+
+
+class FileIndex:
+    """Sorted, ignore-filtered list of a session's project files.
+
+    Built lazily from the storage backend (for disk storage, by walking the
+    directory without entering ignored folders). It listens to the backend,
+    so every write and delete keeps it current, whichever code made it.
+    Files a command creates on disk storage are not seen by the backend;
+    after run_cmd the index is rebuilt if a directory mtime changed.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._files: Optional[list[str]] = None
+        self._rules: Optional[IgnoreRules] = None
+        self._dir_mtimes: dict[str, float] = {}
+        storage.add_listener(self._on_change)
+
+    def _on_change(self, path: str, deleted: bool) -> None:
+        if path == ".gitignore":
+            self.invalidate()
+        elif deleted:
+            self.remove(path)
+        else:
+            self.add(path)
+
+    def rules(self) -> IgnoreRules:
+        with self._lock:
+            if self._rules is None:
+                raw = self.storage.read(".gitignore")
+                gitignore = raw.decode("utf-8", errors="replace").splitlines() if raw else []
+                self._rules = IgnoreRules(BUILTIN_IGNORES + gitignore)
+            return self._rules
+
+    def _build(self) -> list[str]:
+        rules = self.rules()
+        if isinstance(self.storage, DiskBackend):
+            root = self.storage.root
+            files: list[str] = []
+            self._dir_mtimes = {}
+            for dirpath, dirnames, filenames in os.walk(root):
+                rel_dir = pathlib.Path(dirpath).relative_to(root).as_posix()
+                rel_dir = "" if rel_dir == "." else rel_dir
+                try:
+                    self._dir_mtimes[dirpath] = os.stat(dirpath).st_mtime
+                except OSError:
+                    continue
+                dirnames[:] = [d for d in dirnames if not rules.ignored(f"{rel_dir}/{d}" if rel_dir else d, True)]
+                for name in filenames:
+                    rel = f"{rel_dir}/{name}" if rel_dir else name
+                    if not name.endswith(".tmp") and not rules.ignored(rel):
+                        files.append(rel)
+            return sorted(files)
+        return [p for p in self.storage.list() if not rules.ignored(p)]
+
+    def files(self) -> list[str]:
+        with self._lock:
+            if self._files is None:
+                self._files = self._build()
+            return self._files
+
+    def add(self, path: str) -> None:
+        with self._lock:
+            if path == ".gitignore":
+                self.invalidate()
+            elif self._files is not None and not self.rules().ignored(path):
+                i = bisect_left(self._files, path)
+                if i == len(self._files) or self._files[i] != path:
+                    insort(self._files, path)
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            if self._files is not None and path in self._files:
+                self._files.remove(path)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._files = None
+            self._rules = None
+
+    def after_command(self) -> None:
+        """Refresh after run_cmd on disk storage (memory storage reports what the command changed)."""
+        with self._lock:
+            if self._files is None or not isinstance(self.storage, DiskBackend):
+                return
+            # a directory's mtime moves when entries are added, removed or renamed in it
+            if any(_mtime(d) != mtime for d, mtime in self._dir_mtimes.items()):
+                self.invalidate()
+
+    def is_dir(self, directory: str) -> bool:
+        if not directory:
+            return True
+        files = self.files()
+        i = bisect_left(files, directory + "/")
+        return i < len(files) and files[i].startswith(directory + "/")
+
+    def entries(self, directory: str = "", depth: Optional[int] = None) -> list[str]:
+        """Files under directory (project-relative paths, sorted).
+
+        With depth, only files at most `depth` levels below directory are
+        listed; deeper folders collapse into one "dir/ (N files)" entry.
+        """
+        prefix = directory + "/" if directory else ""
+        depth = None if depth is None else max(1, depth)
+        files = self.files()
+        lo = bisect_left(files, prefix) if prefix else 0
+        out: list[str] = []
+        collapsed: dict[str, int] = {}
+        for path in files[lo:]:
+            if prefix and not path.startswith(prefix):
+                break
+            parts = path[len(prefix):].split("/")
+            if depth is None or len(parts) <= depth:
+                out.append(path)
+                continue
+            folder = prefix + "/".join(parts[:depth])
+            if folder not in collapsed:
+                collapsed[folder] = 0
+                out.append(folder)
+            collapsed[folder] += 1
+        return [f"{p}/ ({_files_label(collapsed[p])})" if p in collapsed else p for p in out]
+
+
+def _files_label(n: int) -> str:
+    return f"{n} file" if n == 1 else f"{n} files"
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+# Both sides weak: the backend keeps its index alive through the listener, and nothing here keeps the backend
+_INDEXES: "weakref.WeakKeyDictionary[StorageBackend, weakref.ref]" = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def file_index(storage: StorageBackend) -> FileIndex:
+    """The index of a storage backend; it lives and dies with the backend."""
+    with _INDEXES_LOCK:
+        ref = _INDEXES.get(storage)
+        index = ref() if ref is not None else None
+        if index is None:
+            index = FileIndex(storage)
+            _INDEXES[storage] = weakref.ref(index)
+        return index
+
+
+def page(entries: list[str], offset: int = 0, limit: int = 200) -> str:
+    """One page of entries, with a note on how to get the next one."""
+    offset = max(0, offset)
+    chunk = entries[offset:offset + limit] if limit > 0 else entries[offset:]
+    if not chunk:
+        return "No files found." if not entries else f"No entries at offset {offset} (total {len(entries)})."
+    text = "\n".join(chunk)
+    end = offset + len(chunk)
+    if end < len(entries):
+        text += f"\n... {len(entries) - end} more entries; call again with offset={end}"
+    return text
@@ -1,53 +1,241 @@
 from dotenv import load_dotenv
 load_dotenv()
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
 from pprint import pprint
 from .prompts import *
 from .states import *
 from .tools import *
+from .events import GenerationEvent, event_emitter
+from .excerpt import coder_context_mode, excerpt_threshold, relevant_excerpt
+from .llm_cache import bypass_llm_cache
+from .models import get_model
+from .ratelimit import llm_lane
+from .tracing import metrics, record_usage, span, traced
+from .checkpoint import make_checkpointer
+from .scheduler import (
+    StepCancelled, StepsFailed, batch_steps, cancel_requested, coder_batch_tokens, estimate_tokens, ready_steps,
+    run_concurrently, step_dependencies,
+)
+from .storage import normalize_path
+from .structured import StreamingArrayParser, invoke_structured, message_text, parse_or_reask
+from .pipeline import StepPipeline, architect_pipeline
+from .incremental import dropped_files, load_run, reusable_steps, save_run
+from .symbols import interface_summary_chars, symbol_index
 from langgraph.constants import END
 from langgraph.graph import StateGraph
-from langchain.agents import create_agent
 import json
-import re
+import threading
+from contextlib import nullcontext
+from typing import Iterator
+from pydantic import ValidationError
 
 user_prompt= "I want to build a simple calculator web application."
  
-# llm= ChatGroq(model= "openai/gpt-oss-120b")
-llm= ChatGoogleGenerativeAI(model= "gemini-2.5-flash-lite", temperature= 0)
-def _extract_json(text: str) -> str:
-    # pull first top-level JSON object
-    m = re.search(r"\{[\s\S]*\}", text)
-    return m.group(0) if m else text
+# Each node gets its model from the routes in agent.models (SOLACE_MODEL_* / SOLACE_MODEL_ROUTES).
+# Assigning a chat model here uses it for every node instead (the offline benchmarks do this).
+llm= None
+
+
+def node_model(node: str):
+    return llm if llm is not None else get_model(node)
 
 
 def planner_agent(state: dict)-> dict:
     user_prompt= state["user_prompt"]
-    msg = llm.invoke(planner_prompt(user_prompt))
-    raw = getattr(msg, "content", str(msg))
-    data = json.loads(_extract_json(raw))
-    resp = Plan.model_validate(data)
+    previous= state.get("previous_plan")
+    prompt= planner_prompt(user_prompt, previous.model_dump_json() if previous is not None else None)
+    with llm_lane("planner"):
+        resp = invoke_structured(node_model("planner"), prompt, Plan)
+    event_emitter()("plan_ready", plan= resp)
     return { "plan": resp}
 
 def architect_agent(state: dict)-> dict:
     plan= state["plan"]
     plan_json = plan.model_dump_json()
-    msg = llm.invoke(architect_prompt(plan_json))
-    raw = getattr(msg, "content", str(msg))
-    data = json.loads(_extract_json(raw))
-    tp = TaskPlan.model_validate(data)
+    previous= state.get("previous_task_plan")
+    if previous is None and architect_pipeline():
+        return pipelined_architect_agent(state, plan, plan_json)
+    previous_json= json.dumps([t.model_dump(mode="json") for t in previous.implimentation_steps]) if previous is not None else None
+    with llm_lane("architect"):
+        tp = invoke_structured(node_model("architect"), architect_prompt(plan_json, previous_json), TaskPlan)
     tp.plan = plan
-    return { "task_plan": tp}
+    if previous is None:
+        event_emitter()("task_plan_ready", task_plan= tp, total_steps= len(tp.implimentation_steps))
+        return { "task_plan": tp}
+    coder_state= reuse_previous_steps(state, tp)
+    event_emitter()("task_plan_ready", task_plan= tp, total_steps= len(tp.implimentation_steps),
+                    reused_steps= len(coder_state.completed_steps))
+    return { "task_plan": tp, "coder_state": coder_state}
+
+
+def reuse_previous_steps(state: dict, tp: TaskPlan) -> CoderState:
+    """Incremental runs: mark the steps whose result from the previous run still holds as completed.
+
+    The session's storage holds the previous run's files. Files only the
+    previous task plan wrote are removed; see incremental.reusable_steps for
+    which steps are kept.
+    """
+    sid= state.get("session_id") or current_session_id()
+    storage= get_storage(sid)
+    old= state["previous_task_plan"]
+    reused= reusable_steps(old, tp, state.get("previous_files") or {}, storage.snapshot())
+    for path in dropped_files(old, tp):
+        storage.delete(path)
+    steps= tp.implimentation_steps
+    metrics.incr("incremental.runs")
+    metrics.incr("incremental.steps_reused", len(reused))
+    metrics.incr("incremental.steps_total", len(steps))
+    pending= [i for i in range(len(steps)) if i not in reused]
+    return CoderState(task_plan= tp, current_step_index= pending[0] if pending else len(steps), completed_steps= sorted(reused))
+
+
+CODER_TOOLS= (
+    read_file,
+    write_file,
+    edit_file,
+    list_files,
+    print_tree,
+    get_current_directory,
+    run_cmd,
+    # compatibility tool names expected by some models
+    repo_browser_read_file,
+    repo_browser_write_file,
+    repo_browser_list_files,
+    repo_browser_get_current_directory,
+    repo_browser_run_cmd,
+    repo_browser_print_tree,
+)
+
+# Compiled coder agents keyed on (model, tool names); building one costs far more than a step's setup
+_coder_agents: dict[tuple, tuple] = {}
+_coder_agents_lock= threading.Lock()
+
+
+def get_coder_agent(model= None, tools= CODER_TOOLS):
+    """Return the compiled coder ReAct agent for this model and tool set, building it only once.
+
+    The agent holds no session state: the session id travels in each
+    invocation's config (`configurable.session_id`) and the tools read it from there.
+    """
+    model= model or node_model("coder")
+    key= (id(model), tuple(t.name for t in tools))
+    with _coder_agents_lock:
+        cached= _coder_agents.get(key)
+        if cached is None or cached[0] is not model:
+            from langchain.agents import create_agent  # heavy; only needed once a coder step runs
+            cached= _coder_agents[key]= (model, create_agent(model, list(tools)))
+        return cached[1]
+
+
+def _interface_section(interface: str) -> str:
+    if not interface:
+        return ""
+    return (
+        "\nOther project files and their interfaces (functions, classes, exports, element ids, selectors, imports). "
+        "Stay compatible with them; call read_file only for details not listed here:\n"
+        f"{interface}"
+    )
+
+
+def _project_interface(tasks: list[ImplementationTask], session_id: Optional[str]) -> str:
+    """Symbol summary of the project files these steps do not write, the files they depend on first."""
+    if not interface_summary_chars():
+        return ""
+    first = []
+    for task in tasks:
+        for dep in task.depends_on or []:
+            try:
+                first.append(normalize_path(dep))
+            except ValueError:
+                continue
+    summary = symbol_index(get_storage(session_id)).summary(exclude=[_step_path(t) for t in tasks], first=first)
+    if summary:
+        metrics.observe("coder.interface_chars", len(summary))
+    return summary
+
+
+def _task_prompt(task: ImplementationTask, existing_content: str, interface: str = "") -> str:
+    if not existing_content:
+        return (
+            f"Task: {task.task_description}\n"
+            f"File to modify: {task.file_path}\n"
+            "The file does not exist yet. Use write_file(path, content) to create it."
+            + _interface_section(interface)
+        )
+    if coder_context_mode() == "full" or len(existing_content) <= excerpt_threshold():
+        return (
+            f"Task: {task.task_description}\n"
+            f"File to modify: {task.file_path}\n"
+            f"Existing file content:\n{existing_content}\n"
+            "Use edit_file(path, edits) for targeted changes, or write_file(path, content) to replace the whole file."
+            + _interface_section(interface)
+        )
+    return (
+        f"Task: {task.task_description}\n"
+        f"File to modify: {task.file_path}\n"
+        f"Relevant excerpt of the existing file ({len(existing_content.splitlines())} lines, line numbers are not part of the file):\n"
+        f"{relevant_excerpt(existing_content, task.task_description)}\n"
+        "Use edit_file(path, edits) with search text copied exactly from the lines above (without the line-number prefix). "
+        "Call read_file(path) only if you need parts of the file that are not shown."
+        + _interface_section(interface)
+    )
+
+
+def _invoke_coder(user_prompt: str, config: dict) -> None:
+    system_prompt= coder_system_prompt()
+    result= get_coder_agent().invoke({"messages": [{"role": "system", "content": system_prompt},
+     {"role": "user", "content": user_prompt}]}, config)
+    record_usage(result.get("messages", []))
+
+
+def _coder_step(task: ImplementationTask, session_id: Optional[str]= None) -> None:
+    """Run one implementation step through the tool-using coder agent."""
+    config= {"configurable": {"session_id": session_id}}
+    existing_content= read_file.invoke({"path": task.file_path}, config)
+    _invoke_coder(_task_prompt(task, existing_content, _project_interface([task], session_id)), config)
+
+
+# Allowance for the code the model writes per file when sizing a batch
+BATCH_OUTPUT_TOKENS_PER_FILE= 500
+
+
+def _coder_batch(tasks: list[ImplementationTask], session_id: Optional[str]= None) -> None:
+    """Run several small implementation steps through one coder invocation."""
+    config= {"configurable": {"session_id": session_id}}
+    parts= []
+    for n, task in enumerate(tasks, 1):
+        existing_content= read_file.invoke({"path": task.file_path}, config)
+        parts.append(f"### File {n} of {len(tasks)}\n{_task_prompt(task, existing_content)}")
+    user_prompt= (
+        f"Implement the following {len(tasks)} files in this session. "
+        "Write every one of them (write_file, or edit_file for existing files) before you finish.\n\n"
+        + "\n\n".join(parts)
+        + _interface_section(_project_interface(tasks, session_id))
+    )
+    _invoke_coder(user_prompt, config)
+
+
+def _step_path(task: ImplementationTask) -> str:
+    try:
+        return normalize_path(task.file_path)
+    except ValueError:
+        return task.file_path
 
 
 def coder_agent(state: dict) -> dict:
-    """LangGraph tool-using coder agent."""
+    """LangGraph tool-using coder agent.
+
+    Each pass runs every step whose dependencies are done concurrently on a
+    bounded worker pool, then loops back until all steps are completed.
+    With SOLACE_CODER_BATCH_TOKENS set, consecutive small steps of a pass are
+    grouped into one coder call; files the batch did not write are redone
+    as single steps. Cancellation (scheduler.cancel_scope) is checked before
+    every step; the pass then ends with status CANCELLED, keeping the steps
+    that finished.
+    """
     # Route tool calls to the session-specific temp directory if provided
-    sid = state.get("session_id")
+    sid = state.get("session_id") or current_session_id()
     if sid:
         try:
-            set_default_session_id(sid)
             init_project_root(sid)
         except Exception:
             pass
@@ -56,66 +244,282 @@ def coder_agent(state: dict) -> dict:
         coder_state= CoderState(task_plan= state["task_plan"], current_step_index= 0)
 
     steps= coder_state.task_plan.implimentation_steps
+    deps= step_dependencies(steps)
+    ready= ready_steps(deps, coder_state.completed_steps)
 
-    if coder_state.current_step_index >= len(steps):
+    emit= event_emitter()
+    if not ready:
+        emit("done", total_steps= len(steps))
         return {"coder_state": coder_state, "status": "DONE"}
+    if cancel_requested():
+        return {"coder_state": coder_state, "status": "CANCELLED", "error": "cancelled"}
 
-    current_task= steps[coder_state.current_step_index]
-    existing_content= read_file.run(current_task.file_path)
-    user_prompt= (
-        f"Task: {current_task.task_description}\n"
-        f"File to modify: {current_task.file_path}\n"
-        f"Existing file content:\n{existing_content}\n"
-        "Use write_file(path, content) tp save your changes."
-    )
-    user_prompt= (
-        f"Task: {current_task.task_description}\n"
-        f"File to modify: {current_task.file_path}\n"
-        f"Existing file content:\n{existing_content}\n"
-        "Use write_file(path, content) tp save your changes."
-    )
-    system_prompt= coder_system_prompt()
-    # resp= llm.invoke(system_prompt= system_prompt, user_prompt= user_prompt)
-    coder_tools= [
-        read_file,
-        write_file,
-        list_files,
-        get_current_directory,
-        run_cmd,
-        # compatibility tool names expected by some models
-        repo_browser_read_file,
-        repo_browser_write_file,
-        repo_browser_list_files,
-        repo_browser_get_current_directory,
-        repo_browser_run_cmd,
-        repo_browser_print_tree,
-    ]
-
-    react_agent= create_agent(llm, coder_tools)
-
-    react_agent.invoke({"messages": [{"role": "system", "content": system_prompt},
-     {"role": "user", "content": user_prompt}],
-     "tools": coder_tools})
-    
-    coder_state.current_step_index += 1
+    finished: list[int]= []
+
+    def run_step(i: int) -> None:
+        if cancel_requested():
+            raise StepCancelled(f"cancelled before step {i}")
+        emit("step_started", step= i, total_steps= len(steps), file_path= steps[i].file_path)
+        on_write= lambda path, content: emit("file_written", step= i, file_path= path, content= content)
+        with observe_writes(on_write), span("coder_step", "step", step= i, file_path= steps[i].file_path):
+            _coder_step(steps[i], sid)
+        emit("step_finished", step= i, total_steps= len(steps), file_path= steps[i].file_path)
+        finished.append(i)
+
+    def run_batch(batch: list[int]) -> None:
+        if len(batch) == 1:
+            return run_step(batch[0])
+        by_path= {_step_path(steps[i]): i for i in batch}
+        written: set[int]= set()
+
+        def on_write(path: str, content: str) -> None:
+            i= by_path.get(path)
+            if i is not None and content.strip():
+                written.add(i)
+            emit("file_written", step= batch[0] if i is None else i, file_path= path, content= content)
+
+        for i in batch:
+            emit("step_started", step= i, total_steps= len(steps), file_path= steps[i].file_path)
+        metrics.incr("coder.batches")
+        try:
+            with observe_writes(on_write), span("coder_batch", "step", steps= batch, files= [steps[i].file_path for i in batch]):
+                _coder_batch([steps[i] for i in batch], sid)
+        except Exception:
+            # validation below sends every unwritten file back through a single step
+            pass
+        for i in batch:
+            if i in written:
+                emit("step_finished", step= i, total_steps= len(steps), file_path= steps[i].file_path)
+                finished.append(i)
+        missing= [i for i in batch if i not in written]
+        if missing:
+            metrics.incr("coder.batch_fallbacks", len(missing))
+        for i in missing:
+            run_step(i)
+
+    budget= coder_batch_tokens()
+    if budget:
+        storage= get_storage(sid)
+
+        def cost(i: int) -> int:
+            existing= storage.read(_step_path(steps[i])) or b""
+            return estimate_tokens(steps[i].task_description) + len(existing) // 4 + BATCH_OUTPUT_TOKENS_PER_FILE
+
+        batches= batch_steps(ready, cost, budget)
+    else:
+        batches= [[i] for i in ready]
+
+    failure= None
+    with session_scope(sid), llm_lane("coder"):
+        try:
+            run_concurrently(lambda b: run_batch(batches[b]), list(range(len(batches))))
+        except StepsFailed as e:
+            # keep the steps that did finish so a resumed run only redoes the failed ones
+            failure= e.error
+
+    coder_state.completed_steps= sorted(set(coder_state.completed_steps) | set(finished))
+    pending= [i for i in range(len(steps)) if i not in coder_state.completed_steps]
+    coder_state.current_step_index= pending[0] if pending else len(steps)
+    if isinstance(failure, StepCancelled) or (failure is not None and cancel_requested()):
+        return {"coder_state": coder_state, "status": "CANCELLED", "error": "cancelled"}
+    if failure is not None:
+        return {"coder_state": coder_state, "status": "FAILED", "error": f"{type(failure).__name__}: {failure}"}
     return{"coder_state": coder_state}
 
 
-graph= StateGraph(dict)
-graph.add_node("planner", planner_agent)
-graph.add_node("architect", architect_agent)
-graph.add_node("coder", coder_agent)
+def pipelined_architect_agent(state: dict, plan: Plan, plan_json: str) -> dict:
+    """Architect that streams the task plan and starts each step on the coder as soon as it is complete.
+
+    Steps are parsed out of the reply as their JSON objects close and run on
+    a StepPipeline, so architect and coder time overlap. The full reply is
+    then validated (re-asking the model if needed). A finished step counts as
+    done only if the final plan has the same step at the same position;
+    files written by any other step that ran are put back as they were, and
+    those steps are left to the coder node along with everything not started.
+    """
+    sid= state.get("session_id") or current_session_id()
+    if sid:
+        try:
+            init_project_root(sid)
+        except Exception:
+            pass
+    storage= get_storage(sid)
+    initial= {path: storage.read(path) for path in storage.list()}
+    written: dict[int, set[str]]= {}
+    emit= event_emitter()
+
+    def run_step(i: int, task: ImplementationTask) -> None:
+        paths= written.setdefault(i, set())
+
+        def on_write(path: str, content: str) -> None:
+            paths.add(path)
+            emit("file_written", step= i, file_path= path, content= content)
+
+        emit("step_started", step= i, file_path= task.file_path)
+        with session_scope(sid), llm_lane("coder"), observe_writes(on_write), \
+                span("coder_step", "step", step= i, file_path= task.file_path, pipelined= True):
+            _coder_step(task, sid)
+        emit("step_finished", step= i, file_path= task.file_path)
+
+    model= node_model("architect")
+    parser= StreamingArrayParser("implimentation_steps")
+    pipeline= StepPipeline(run_step)
+    accepting= True
+    try:
+        with llm_lane("architect"):
+            reply= None
+            for chunk in model.stream(architect_prompt(plan_json)):
+                reply= chunk if reply is None else reply + chunk
+                for item in parser.feed(message_text(chunk)):
+                    try:
+                        task= ImplementationTask.model_validate(item)
+                    except ValidationError:
+                        # positions after an unusable step can't be matched to the final plan
+                        accepting= False
+                    if accepting:
+                        pipeline.add(task)
+            record_usage(reply)
+            tp= parse_or_reask(model, parser.text, TaskPlan)
+    finally:
+        finished= pipeline.close()
+    tp.plan= plan
+
+    final= tp.implimentation_steps
+    matched= 0
+    while matched < min(len(final), len(pipeline.steps)) and final[matched] == pipeline.steps[matched]:
+        matched+= 1
+    done= {i for i in finished if i < matched}
+    stale= set(written) - done
+    touched= set().union(*(written[i] for i in stale)) if stale else set()
+    for path in touched:
+        if initial.get(path) is None:
+            storage.delete(path)
+        else:
+            storage.write(path, initial[path])
+    done= {i for i in done if not written.get(i, set()) & touched}
+    metrics.incr("pipeline.steps_started", len(written))
+    metrics.incr("pipeline.steps_kept", len(done))
+    if stale:
+        metrics.incr("pipeline.steps_discarded", len(stale))
+
+    event_emitter()("task_plan_ready", task_plan= tp, total_steps= len(final))
+    pending= [i for i in range(len(final)) if i not in done]
+    coder_state= CoderState(task_plan= tp, current_step_index= pending[0] if pending else len(final),
+                            completed_steps= sorted(done))
+    return {"task_plan": tp, "coder_state": coder_state}
 
-graph.add_edge("planner", "architect")
-graph.add_edge("architect", "coder")
-graph.add_conditional_edges(
-    "coder",
-    lambda s: "END" if s.get("status") == "DONE" else "coder", {"END": END, "coder": "coder"}
-)
 
-graph.set_entry_point("planner")
+def build_graph() -> StateGraph:
+    graph= StateGraph(GraphState)
+    graph.add_node("planner", traced("planner", "node")(planner_agent))
+    graph.add_node("architect", traced("architect", "node")(architect_agent))
+    graph.add_node("coder", traced("coder", "node")(coder_agent))
 
-agent= graph.compile()
+    graph.add_edge("planner", "architect")
+    graph.add_edge("architect", "coder")
+    graph.add_conditional_edges(
+        "coder",
+        lambda s: "END" if s.get("status") in ("DONE", "FAILED", "CANCELLED") else "coder", {"END": END, "coder": "coder"}
+    )
+
+    graph.set_entry_point("planner")
+    return graph
+
+
+_agent= None
+_agent_lock= threading.Lock()
+
+
+def get_agent():
+    """The compiled, checkpointed generation graph, built on first use and shared by all sessions."""
+    global _agent
+    with _agent_lock:
+        if _agent is None:
+            _agent= build_graph().compile(checkpointer= make_checkpointer())
+        return _agent
+
+
+class GenerationFailed(RuntimeError):
+    """A coder step failed; the run is checkpointed and can be resumed."""
+
+
+class GenerationCancelled(GenerationFailed):
+    """The run was cancelled between coder steps; like a failure, it is checkpointed and can be resumed."""
+
+
+# runs that stopped early and continue from their checkpoint on resume
+_RESUMABLE_STATUS= ("FAILED", "CANCELLED")
+
+
+def _thread_config(session_id: Optional[str], recursion_limit: int= 100) -> dict:
+    # one checkpoint thread per session: a new generation replaces it, a resume continues it
+    return {"recursion_limit": recursion_limit, "configurable": {"thread_id": session_id or "default"}}
+
+
+def can_resume(session_id: Optional[str]) -> bool:
+    """True if the session has a checkpointed run that stopped before finishing."""
+    snapshot= get_agent().get_state(_thread_config(session_id))
+    return bool(snapshot.values) and (bool(snapshot.next) or snapshot.values.get("status") in _RESUMABLE_STATUS)
+
+
+def stream_generation(user_prompt: str, session_id: Optional[str]= None, recursion_limit: int= 100, resume: bool= False,
+                      incremental: bool= False) -> Iterator[GenerationEvent]:
+    """Run the graph and yield GenerationEvents as planning and coding progress.
+
+    The graph is checkpointed per session after every node and coder pass.
+    With resume=True the last run of the session continues from its last
+    checkpoint (plan, task plan and finished steps are kept) instead of
+    starting over, bypassing the LLM response cache. With incremental=True a new run starts from the
+    session's last finished generation (its plan, task plan and the files,
+    which must be in the session's storage): only new or changed steps and
+    the steps depending on them are coded again. Every finished run is
+    recorded for that (incremental.save_run). Raises GenerationFailed if a
+    coder step failed, and GenerationCancelled if the run was cancelled
+    (scheduler.cancel_scope).
+    """
+    agent= get_agent()
+    config= _thread_config(session_id, recursion_limit)
+    storage= get_storage(session_id)
+    root= get_project_root(session_id)
+    if resume:
+        inputs= None
+        if agent.get_state(config).values.get("status") in _RESUMABLE_STATUS:
+            # re-enter the coder as if the architect had just finished; completed steps are kept
+            agent.update_state(config, {"status": None, "error": None}, as_node= "architect")
+        if not storage.list() and root.exists():
+            # files were saved next to the checkpoint when the run failed
+            storage.sync_from_disk(root)
+    else:
+        agent.checkpointer.delete_thread(config["configurable"]["thread_id"])
+        inputs= {"user_prompt": user_prompt, "session_id": session_id}
+        previous= load_run(session_id) if incremental and session_id else None
+        if previous is not None:
+            inputs.update(previous_plan= previous["plan"], previous_task_plan= previous["task_plan"],
+                          previous_files= previous["files"])
+    try:
+        # a resumed run redoes calls that failed; cached replies would replay the same failure
+        with bypass_llm_cache() if resume else nullcontext():
+            for chunk in agent.stream(inputs, config, stream_mode= "custom"):
+                if isinstance(chunk, GenerationEvent):
+                    yield chunk
+        values= agent.get_state(config).values
+        if values.get("status") == "CANCELLED":
+            raise GenerationCancelled("generation cancelled")
+        if values.get("status") == "FAILED":
+            raise GenerationFailed(values.get("error") or "coder step failed")
+        if session_id and values.get("plan") is not None and values.get("task_plan") is not None:
+            try:
+                save_run(session_id, values["plan"], values["task_plan"], storage.snapshot())
+            except Exception:
+                pass
+    except Exception:
+        # keep the generated files with the checkpoint so a resume (even after a restart) has them
+        try:
+            storage.sync_to_disk(root)
+        except Exception:
+            pass
+        raise
+    agent.checkpointer.delete_thread(config["configurable"]["thread_id"])
 
 
 
@@ -123,6 +527,6 @@ if __name__ == "__main__":
 
     user_prompt= "create a simple calculator web application"
 
-    result= agent.invoke( {"user_prompt": user_prompt}, {"recursion_limit": 100} )
+    result= get_agent().invoke( {"user_prompt": user_prompt}, {"recursion_limit": 100, "configurable": {"thread_id": "cli"}} )
 
     print(result)
\ No newline at end of file
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import pathlib
+import time
+from collections import Counter
+from typing import Optional
+
+from .scheduler import step_dependencies
+from .states import ImplementationTask, Plan, TaskPlan
+from .storage import normalize_path
+from .tools import get_storage
+
+RUNS_DIR = pathlib.Path(os.getenv("SOLACE_RUNS_DIR", "/tmp/solace/runs"))
+
+
+def step_key(task: ImplementationTask) -> str:
+    """What a step does: its file, its task description and what it depends on."""
+    try:
+        path = normalize_path(task.file_path)
+    except ValueError:
+        path = task.file_path
+    deps = sorted(task.depends_on) if task.depends_on is not None else None
+    raw = json.dumps([path, task.task_description.strip(), deps])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def file_digest(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _record_path(session_id: str) -> pathlib.Path:
+    return RUNS_DIR / f"{hashlib.sha1(session_id.encode('utf-8')).hexdigest()[:32]}.json"
+
+
+def save_run(session_id: str, plan: Plan, task_plan: TaskPlan, files: dict[str, str]) -> None:
+    """Remember a finished generation: its plan, task plan and the digest of every file it left behind."""
+    record = {
+        "session_id": session_id,
+        "saved_at": time.time(),
+        "plan": plan.model_dump(mode="json"),
+        "task_plan": {"implimentation_steps": [t.model_dump(mode="json") for t in task_plan.implimentation_steps]},
+        "files": {path: file_digest(content) for path, content in files.items()},
+    }
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    target = _record_path(session_id)
+    tmp = target.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(record), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+def load_run(session_id: str) -> Optional[dict]:
+    """The last finished generation of a session as {"plan", "task_plan", "files"}, or None."""
+    try:
+        record = json.loads(_record_path(session_id).read_text(encoding="utf-8"))
+        return {
+            "plan": Plan.model_validate(record["plan"]),
+            "task_plan": TaskPlan.model_validate(record["task_plan"]),
+            "files": dict(record["files"]),
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def restore_files(session_id: str, files: dict[str, str]) -> None:
+    """Make the session's storage hold exactly these files (e.g. the project kept in the browser)."""
+    storage = get_storage(session_id)
+    for path in storage.list():
+        if path not in files:
+            storage.delete(path)
+    for path, content in files.items():
+        storage.write(normalize_path(path), content.encode("utf-8"))
+
+
+def cleanup_runs(max_age_hours: int = 48) -> int:
+    """Remove run records older than max_age_hours. Returns number of deletions."""
+    if not RUNS_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    count = 0
+    for entry in RUNS_DIR.glob("*.json"):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def reusable_steps(old: TaskPlan, new: TaskPlan, old_files: dict[str, str], current: dict[str, str]) -> set[int]:
+    """Indices of new steps whose result from the previous run can be kept.
+
+    A step is reusable when the previous task plan had the same step (same
+    step_key; repeated steps are matched one to one), its file is still
+    exactly what the previous run left (old_files digests vs current
+    contents), and none of the steps it depends on, directly or through
+    other steps, has to run again.
+    """
+    available = Counter(step_key(t) for t in old.implimentation_steps)
+    steps = new.implimentation_steps
+    dirty: set[int] = set()
+    for i, task in enumerate(steps):
+        key = step_key(task)
+        try:
+            path = normalize_path(task.file_path)
+        except ValueError:
+            path = task.file_path
+        content = current.get(path)
+        if available[key] > 0 and content is not None and old_files.get(path) == file_digest(content):
+            available[key] -= 1
+        else:
+            dirty.add(i)
+    # dependencies only point at earlier steps, so one forward pass propagates them
+    for i, deps in enumerate(step_dependencies(steps)):
+        if deps & dirty:
+            dirty.add(i)
+    return {i for i in range(len(steps)) if i not in dirty}
+
+
+def dropped_files(old: TaskPlan, new: TaskPlan) -> set[str]:
+    """Files the previous task plan wrote that no step of the new one does."""
+    def paths(tp: TaskPlan) -> set[str]:
+        out = set()
+        for t in tp.implimentation_steps:
+            try:
+                out.add(normalize_path(t.file_path))
+            except ValueError:
+                continue
+        return out
+
+    return paths(old) - paths(new)
@@ -0,0 +1,321 @@
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from .tracing import metrics, start_trace
+
+JOBS_PATH = pathlib.Path(os.getenv("SOLACE_JOBS_PATH", "/tmp/solace/jobs.sqlite"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_COLUMNS = (
+    "id", "session_id", "prompt", "resume", "status", "plan_name", "total_steps", "steps_done", "steps_reused",
+    "current_file", "files_written", "last_file", "last_content", "error", "trace_id", "cancel_requested", "pid", "created_at", "started_at",
+    "finished_at",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    resume INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    plan_name TEXT,
+    total_steps INTEGER,
+    steps_done INTEGER NOT NULL DEFAULT 0,
+    steps_reused INTEGER NOT NULL DEFAULT 0,
+    current_file TEXT,
+    files_written TEXT NOT NULL DEFAULT '[]',
+    last_file TEXT,
+    last_content TEXT,
+    error TEXT,
+    trace_id TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_session ON jobs (session_id, created_at);
+"""
+
+# columns added after the table was first created: name -> definition
+_ADDED_COLUMNS = {"steps_reused": "INTEGER NOT NULL DEFAULT 0", "last_file": "TEXT", "last_content": "TEXT"}
+
+# Longest last-written content kept on a job row for the live code preview
+PREVIEW_CHARS = 100_000
+
+
+def job_workers() -> int:
+    """Generations that run at the same time in this process (SOLACE_JOB_WORKERS)."""
+    try:
+        return max(1, int(os.getenv("SOLACE_JOB_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+def job_queue_limit() -> int:
+    """Jobs allowed to wait for a worker before new submissions are refused (SOLACE_JOB_QUEUE_LIMIT)."""
+    try:
+        return max(0, int(os.getenv("SOLACE_JOB_QUEUE_LIMIT", "32")))
+    except ValueError:
+        return 32
+
+
+class JobRejected(RuntimeError):
+    """A submission was refused (queue full, or the session already has a job); nothing was queued."""
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobStore:
+    """The job table: one row per generation with its status and progress, in SQLite at `path`.
+
+    Rows outlive the process, so a page that comes back later (or another
+    Streamlit worker) can still read how a job ended.
+    """
+
+    def __init__(self, path: pathlib.Path = JOBS_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, definition in _ADDED_COLUMNS.items():
+            if name not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str, prompt: str, resume: bool = False) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, session_id, prompt, resume, status, pid, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, session_id, prompt, int(resume), QUEUED, os.getpid(), time.time()),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        if "files_written" in fields:
+            fields["files_written"] = json.dumps(fields["files_written"])
+        cols = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job["files_written"] = json.loads(job["files_written"] or "[]")
+        job["resume"] = bool(job["resume"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def interrupt_orphans(self) -> int:
+        """Mark unfinished jobs whose process is gone as failed (their runs are checkpointed and can be resumed).
+
+        Called when a queue starts, so rows carrying this process's pid belong to an earlier process.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, pid FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+            orphans = [job_id for job_id, pid in rows if pid == os.getpid() or not _pid_alive(pid)]
+            for job_id in orphans:
+                self._conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                                   (FAILED, "interrupted: the server stopped", time.time(), job_id))
+        return len(orphans)
+
+    def cleanup(self, max_age_hours: int = 6) -> int:
+        """Delete finished jobs older than max_age_hours. Returns number of deletions."""
+        cutoff = time.time() - max_age_hours * 3600
+        with self._lock:
+            cur = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+                (*FINISHED, cutoff),
+            )
+        return cur.rowcount
+
+
+class _Progress:
+    """Folds a job's GenerationEvents into its row."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.files: list[str] = []
+        self.done: set[int] = set()
+        self.reused = 0
+
+    def __call__(self, event) -> None:
+        if event.kind == "plan_ready":
+            self.store.update(self.job_id, plan_name=event.plan.name)
+        elif event.kind == "task_plan_ready":
+            # steps kept from the previous run count as done
+            self.reused = event.reused_steps or 0
+            self.store.update(self.job_id, total_steps=event.total_steps, steps_reused=self.reused,
+                              steps_done=self.reused + len(self.done))
+        elif event.kind == "step_started":
+            # steps started while the task plan is still streaming don't know the total yet
+            if event.total_steps is None:
+                self.store.update(self.job_id, current_file=event.file_path)
+            else:
+                self.store.update(self.job_id, current_file=event.file_path, total_steps=event.total_steps)
+        elif event.kind == "step_finished":
+            self.done.add(event.step)
+            self.store.update(self.job_id, steps_done=self.reused + len(self.done))
+        elif event.kind == "file_written":
+            # the latest write is shown as it happens, like the inline preview before jobs
+            fields = {"last_file": event.file_path, "last_content": (event.content or "")[:PREVIEW_CHARS]}
+            if event.file_path not in self.files:
+                self.files.append(event.file_path)
+                fields["files_written"] = self.files
+            self.store.update(self.job_id, **fields)
+
+
+class JobQueue:
+    """Runs generations on a bounded worker pool, off the Streamlit script threads.
+
+    At most `workers` jobs run at once and at most `queue_limit` wait for a
+    worker; a session has at most one job in flight. Submissions beyond that
+    raise JobRejected instead of queueing without bound. Cancelling a job
+    that is still waiting drops it; a running one stops before its next
+    coder step.
+    """
+
+    def __init__(self, store: JobStore, workers: Optional[int] = None, queue_limit: Optional[int] = None):
+        self.store = store
+        self.workers = workers or job_workers()
+        self.queue_limit = job_queue_limit() if queue_limit is None else queue_limit
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="solace-job")
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._futures: dict[str, Future] = {}
+        self._cancel: dict[str, threading.Event] = {}
+        self._by_session: dict[str, str] = {}
+        store.interrupt_orphans()
+
+    def submit(self, prompt: str, session_id: str, resume: bool = False, incremental: bool = False) -> str:
+        """Queue a generation for session_id (see graph.stream_generation for resume and incremental); returns the job id."""
+        with self._lock:
+            if session_id in self._by_session:
+                metrics.incr("jobs.rejected", reason="session_busy")
+                raise JobRejected("a generation is already running for this session")
+            # counted together: under a burst, admitted jobs sit in the pool's queue before a worker takes them
+            if self._waiting + self._running >= self.workers + self.queue_limit:
+                metrics.incr("jobs.rejected", reason="queue_full")
+                raise JobRejected(f"the server is busy ({self._waiting} generations waiting); try again shortly")
+            job_id = self.store.create(session_id, prompt, resume)
+            cancel = threading.Event()
+            self._cancel[job_id] = cancel
+            self._by_session[session_id] = job_id
+            self._waiting += 1
+            self._futures[job_id] = self._pool.submit(self._run, job_id, prompt, session_id, resume, incremental,
+                                                  cancel, time.time())
+        metrics.incr("jobs.submitted")
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a job to stop; False if it is not in flight in this process."""
+        with self._lock:
+            cancel = self._cancel.get(job_id)
+            if cancel is None:
+                return False
+            cancel.set()
+            dropped = self._futures[job_id].cancel()
+            if dropped:
+                self._waiting -= 1
+                self._forget(job_id)
+        self.store.update(job_id, cancel_requested=1)
+        if dropped:
+            self.store.update(job_id, status=CANCELLED, finished_at=time.time())
+            metrics.incr("jobs.finished", status=CANCELLED)
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def active_job(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._by_session.get(session_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": self._running, "waiting": self._waiting, "workers": self.workers,
+                    "queue_limit": self.queue_limit}
+
+    def _forget(self, job_id: str) -> None:
+        # caller holds self._lock
+        self._futures.pop(job_id, None)
+        self._cancel.pop(job_id, None)
+        for sid, jid in list(self._by_session.items()):
+            if jid == job_id:
+                del self._by_session[sid]
+
+    def _run(self, job_id: str, prompt: str, session_id: str, resume: bool, incremental: bool,
+             cancel: threading.Event, submitted: float) -> None:
+        from .graph import GenerationCancelled, stream_generation
+        from .scheduler import cancel_scope
+        from .tools import init_project_root, session_scope
+
+        with self._lock:
+            self._waiting -= 1
+            self._running += 1
+        started = time.time()
+        metrics.observe("jobs.wait_ms", (started - submitted) * 1000)
+        self.store.update(job_id, status=RUNNING, started_at=started)
+        status, error = SUCCEEDED, None
+        try:
+            if cancel.is_set():
+                raise GenerationCancelled("cancelled before it started")
+            init_project_root(session_id)
+            progress = _Progress(self.store, job_id)
+            with cancel_scope(cancel), session_scope(session_id), start_trace(session_id) as trace_id:
+                self.store.update(job_id, trace_id=trace_id)
+                for event in stream_generation(prompt, session_id, resume=resume, incremental=incremental):
+                    progress(event)
+        except GenerationCancelled:
+            status = CANCELLED
+        except Exception as e:
+            status, error = FAILED, f"{type(e).__name__}: {e}"
+        finally:
+            finished = time.time()
+            self.store.update(job_id, status=status, error=error, current_file=None, finished_at=finished)
+            metrics.incr("jobs.finished", status=status)
+            metrics.observe("jobs.run_ms", (finished - started) * 1000)
+            with self._lock:
+                self._running -= 1
+                self._forget(job_id)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def job_queue() -> JobQueue:
+    """The process-wide job queue, started on first use (SOLACE_JOB_WORKERS, SOLACE_JOB_QUEUE_LIMIT, SOLACE_JOBS_PATH)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(JobStore(JOBS_PATH))
+        return _queue
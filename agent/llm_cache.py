@@ -0,0 +1,184 @@
+import contextvars
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+CACHE_PATH = pathlib.Path(os.getenv("SOLACE_LLM_CACHE_PATH", "/tmp/solace/cache/llm.sqlite"))
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("solace_llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache():
+    """Skip the response cache (no lookup, no store) for model calls made inside this block."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _encode(generations: Sequence[Generation]) -> str:
+    out = []
+    for g in generations:
+        if isinstance(g, ChatGeneration):
+            out.append({"message": message_to_dict(g.message), "info": g.generation_info})
+        else:
+            out.append({"text": g.text, "info": g.generation_info})
+    return json.dumps(out)
+
+
+def _decode(raw: str) -> list[Generation]:
+    gens: list[Generation] = []
+    for item in json.loads(raw):
+        if "message" in item:
+            gens.append(ChatGeneration(message=messages_from_dict([item["message"]])[0], generation_info=item.get("info")))
+        else:
+            gens.append(Generation(text=item["text"], generation_info=item.get("info")))
+    return gens
+
+
+class ResponseCache(BaseCache):
+    """Disk-backed, content-addressed cache of model responses with LRU eviction.
+
+    Entries are keyed on a hash of the model's llm_string (model name, params
+    and bound tools) and the serialized prompt, so only exact repeats hit.
+    Entries older than `max_age_seconds` are dropped, and when the stored
+    size exceeds `max_bytes` the least recently used entries are evicted.
+    Attach it to a chat model with `cache=`; `bypass_llm_cache()` opts a call out.
+    """
+
+    def __init__(self, path: pathlib.Path = CACHE_PATH, max_bytes: int = 256 * 1024 * 1024, max_age_seconds: float = 7 * 24 * 3600):
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, value TEXT, size INTEGER,"
+            " created REAL, accessed REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        model_hash = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()[:16]
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{model_hash}:{prompt_hash}"
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list[Generation]]:
+        if _bypass.get():
+            return None
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        try:
+            gens = _decode(row[0])
+        except Exception:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return gens
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if _bypass.get():
+            return
+        try:
+            value = _encode(return_val)
+        except Exception:
+            # unserializable response: just don't cache it
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(prompt, llm_string), _model_name(llm_string), value, len(value), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        cur = self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age_seconds,))
+        self.evictions += max(cur.rowcount, 0)
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            row = self._db.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> dict[str, int]:
+        """Hit/miss/eviction counters plus the current number of entries and stored bytes."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries, "bytes": size}
+
+
+def _model_name(llm_string: str) -> str:
+    # serializable models produce "<json of the model>---<call params>"; others a repr of their params
+    head = llm_string.split("---", 1)[0]
+    try:
+        kwargs = json.loads(head).get("kwargs", {})
+        return str(kwargs.get("model") or kwargs.get("model_name") or "")
+    except Exception:
+        pass
+    for field in ("model_name", "model"):
+        marker = f"('{field}', '"
+        i = llm_string.find(marker)
+        if i != -1:
+            start = i + len(marker)
+            return llm_string[start:llm_string.find("'", start)]
+    return ""
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache, or None when disabled with SOLACE_LLM_CACHE=0."""
+    global _shared_cache
+    if os.getenv("SOLACE_LLM_CACHE", "1").lower() in ("0", "false", "no", "off"):
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            try:
+                _shared_cache = ResponseCache(
+                    max_bytes=int(float(os.getenv("SOLACE_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                    max_age_seconds=float(os.getenv("SOLACE_LLM_CACHE_MAX_AGE_HOURS", "168")) * 3600,
+                )
+            except Exception:
+                # cache is an optimization only; run uncached if the db can't be opened
+                return None
+        return _shared_cache
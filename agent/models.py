@@ -0,0 +1,207 @@
+import importlib
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from pydantic import ConfigDict
+
+from .llm_cache import response_cache
+from .ratelimit import ScheduledChatModel, llm_scheduler
+from .tracing import metrics
+
+# provider -> (module, class, API key env var, kwargs that turn the client's own retries off)
+PROVIDERS = {
+    "google": ("langchain_google_genai", "ChatGoogleGenerativeAI", "GOOGLE_API_KEY", {"max_retries": 1}),
+    "groq": ("langchain_groq", "ChatGroq", "GROQ_API_KEY", {"max_retries": 0}),
+}
+
+DEFAULT_ROUTES: dict[str, dict] = {
+    "default": {"provider": "google", "model": "gemini-2.5-flash-lite"},
+    # used by every route on error or timeout, if GROQ_API_KEY is set
+    "fallback": {"provider": "groq", "model": "openai/gpt-oss-120b"},
+}
+
+NODES = ("planner", "architect", "coder")
+
+
+def _parse_route(value: Any) -> Optional[dict]:
+    # "provider:model" shorthand or a full {"provider", "model", ...} object
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        provider, _, model = value.partition(":")
+        return {"provider": provider.strip(), "model": model.strip()}
+    return dict(value)
+
+
+def model_routes() -> dict[str, Optional[dict]]:
+    """Route table: DEFAULT_ROUTES, overridden by SOLACE_MODEL_ROUTES (JSON) and SOLACE_MODEL_<NAME>.
+
+    Keys are node names (planner, architect, coder), "default" and
+    "fallback". A route is {"provider", "model", "temperature"?, "timeout"?,
+    "fallback"?}; a route's own "fallback" (a route object, "provider:model",
+    or null for none) replaces the global one.
+    """
+    routes: dict[str, Optional[dict]] = {k: dict(v) for k, v in DEFAULT_ROUTES.items()}
+    raw = os.getenv("SOLACE_MODEL_ROUTES")
+    if raw:
+        for name, value in json.loads(raw).items():
+            routes[name] = _parse_route(value)
+    for name in (*NODES, "default", "fallback"):
+        value = os.getenv(f"SOLACE_MODEL_{name.upper()}")
+        if value is not None:
+            routes[name] = _parse_route(value)
+    return routes
+
+
+def _available(spec: dict) -> bool:
+    provider = PROVIDERS.get(spec.get("provider", ""))
+    return provider is not None and bool(os.getenv(provider[2]))
+
+
+def _build(spec: dict) -> ScheduledChatModel:
+    # provider packages are imported only when a route actually uses them
+    module, cls, _, no_retries = PROVIDERS[spec["provider"]]
+    chat_cls = getattr(importlib.import_module(module), cls)
+    timeout = float(spec.get("timeout", os.getenv("SOLACE_MODEL_TIMEOUT", "60")))
+    inner = chat_cls(model=spec["model"], temperature=spec.get("temperature", 0), timeout=timeout, **no_retries)
+    return ScheduledChatModel(inner=inner, scheduler=llm_scheduler(spec["provider"]), cache=response_cache())
+
+
+def _label(spec: dict) -> str:
+    return f"{spec['provider']}:{spec['model']}"
+
+
+class RoutedChatModel(BaseChatModel):
+    """The model for one graph node: a primary model plus an optional fallback on another provider.
+
+    Any error from the primary (timeouts included) sends the call to the
+    fallback. Latency and outcome of every attempt are recorded in the
+    metrics registry under route.* with the route and model as labels.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    route: str
+    primary: Runnable
+    primary_name: str
+    fallback: Optional[Runnable] = None
+    fallback_name: Optional[str] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"route": self.route, "primary": self.primary_name, "fallback": self.fallback_name}
+
+    def _attempt(self, model: Runnable, name: str, messages: list[BaseMessage], stop, kwargs: dict):
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            return model.invoke(messages, stop=stop, **kwargs)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            metrics.observe("route.latency_ms", (time.perf_counter() - t0) * 1000, route=self.route, model=name, outcome=outcome)
+            metrics.incr(f"route.{'calls' if outcome == 'ok' else 'errors'}", route=self.route, model=name)
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        try:
+            message = self._attempt(self.primary, self.primary_name, messages, stop, kwargs)
+        except Exception:
+            if self.fallback is None:
+                raise
+            metrics.incr("route.fallbacks", route=self.route, model=self.fallback_name)
+            message = self._attempt(self.fallback, self.fallback_name, messages, stop, kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        # the fallback only takes over if the primary failed before its first chunk
+        candidates = [(self.primary, self.primary_name)]
+        if self.fallback is not None:
+            candidates.append((self.fallback, self.fallback_name))
+        for n, (model, name) in enumerate(candidates):
+            if n:
+                metrics.incr("route.fallbacks", route=self.route, model=name)
+            t0 = time.perf_counter()
+            outcome = "ok"
+            yielded = False
+            try:
+                for chunk in model.stream(messages, stop=stop, **kwargs):
+                    yielded = True
+                    yield ChatGenerationChunk(message=chunk)
+                return
+            except Exception:
+                outcome = "error"
+                if yielded or n == len(candidates) - 1:
+                    raise
+            finally:
+                metrics.observe("route.latency_ms", (time.perf_counter() - t0) * 1000, route=self.route, model=name, outcome=outcome)
+                metrics.incr(f"route.{'calls' if outcome == 'ok' else 'errors'}", route=self.route, model=name)
+
+    def bind_tools(self, tools, **kwargs):
+        # each provider formats tools its own way, so bind them on both models
+        return self.model_copy(update={
+            "primary": self.primary.bind_tools(tools, **kwargs),
+            "fallback": self.fallback.bind_tools(tools, **kwargs) if self.fallback is not None else None,
+        })
+
+
+_models: dict[str, RoutedChatModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(node: str) -> RoutedChatModel:
+    """Model for a graph node, built once per node from model_routes()."""
+    with _models_lock:
+        model = _models.get(node)
+        if model is None:
+            routes = model_routes()
+            spec = routes.get(node) or routes["default"]
+            fallback = _parse_route(spec["fallback"]) if "fallback" in spec else routes.get("fallback")
+            if fallback is not None and (not _available(fallback) or _label(fallback) == _label(spec)):
+                fallback = None
+            model = _models[node] = RoutedChatModel(
+                route=node,
+                primary=_build(spec),
+                primary_name=_label(spec),
+                fallback=_build(fallback) if fallback else None,
+                fallback_name=_label(fallback) if fallback else None,
+            )
+        return model
+
+
+def reset_models() -> None:
+    """Forget built models so the next get_model() reads the routes again."""
+    with _models_lock:
+        _models.clear()
+
+
+def route_stats() -> list[dict]:
+    """Per route and model: calls, errors, fallbacks taken and latency p50/p95, from the metrics registry."""
+    snap = metrics.snapshot()
+    rows: dict[tuple, dict] = {}
+
+    def row(labels: dict) -> dict:
+        key = (labels.get("route"), labels.get("model"))
+        return rows.setdefault(key, {"route": key[0], "model": key[1], "calls": 0, "errors": 0, "fallbacks": 0,
+                                     "p50_ms": None, "p95_ms": None})
+
+    for c in snap["counters"]:
+        if c["name"] in ("route.calls", "route.errors", "route.fallbacks"):
+            row(c["labels"])[c["name"].split(".", 1)[1]] += int(c["value"])
+    for h in snap["histograms"]:
+        if h["name"] == "route.latency_ms" and h["labels"].get("outcome") == "ok":
+            r = row(h["labels"])
+            r["p50_ms"], r["p95_ms"] = round(h["p50"], 1), round(h["p95"], 1)
+    return sorted(rows.values(), key=lambda r: (r["route"] or "", r["model"] or ""))
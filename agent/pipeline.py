@@ -0,0 +1,73 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from .scheduler import cancel_requested, coder_workers, step_dependencies
+from .states import ImplementationTask
+
+
+def architect_pipeline() -> bool:
+    """Start coder steps while the architect's task plan is still streaming in (SOLACE_ARCHITECT_PIPELINE=1)."""
+    return os.getenv("SOLACE_ARCHITECT_PIPELINE", "0").lower() in ("1", "true", "yes", "on")
+
+
+class StepPipeline:
+    """Runs implementation steps as they arrive, before the whole task plan is known.
+
+    add() appends the next step of the plan; every step whose dependencies
+    (scheduler.step_dependencies, which only look at earlier steps, so they
+    are final as soon as a step arrives) have finished is started on a
+    bounded pool. stop() starts nothing more; close() waits for the steps
+    already running. A failed step is recorded and its dependents are not
+    started, so the coder node can redo them.
+    """
+
+    def __init__(self, run: Callable[[int, ImplementationTask], None], max_workers: Optional[int] = None):
+        self.steps: list[ImplementationTask] = []
+        self.finished: set[int] = set()
+        self.failed: dict[int, BaseException] = {}
+        self._run = run
+        self._deps: list[set[int]] = []
+        self._started: set[int] = set()
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._pool = ContextThreadPoolExecutor(max_workers=max_workers or coder_workers())
+
+    def add(self, task: ImplementationTask) -> int:
+        with self._lock:
+            self.steps.append(task)
+            self._deps = step_dependencies(self.steps)
+        self._dispatch()
+        return len(self.steps) - 1
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+
+    def close(self) -> set[int]:
+        """Stop, wait for running steps and return the indices that finished."""
+        self.stop()
+        self._pool.shutdown(wait=True)
+        return set(self.finished)
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            if self._stopped or cancel_requested():
+                return
+            ready = [i for i, d in enumerate(self._deps) if i not in self._started and d <= self.finished]
+            self._started.update(ready)
+            for i in ready:
+                self._pool.submit(self._step, i)
+
+    def _step(self, i: int) -> None:
+        try:
+            self._run(i, self.steps[i])
+        except Exception as e:
+            with self._lock:
+                self.failed[i] = e
+            return
+        with self._lock:
+            self.finished.add(i)
+        self._dispatch()
@@ -0,0 +1,305 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import pathlib
+import posixpath
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+
+from .tracing import metrics
+
+# text-like types worth compressing; images, fonts and archives are already compressed
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml",
+                 "application/manifest+json", "application/wasm")
+_MIN_GZIP_BYTES = 1024
+
+_EXTRA_TYPES = {".js": "application/javascript", ".mjs": "application/javascript", ".json": "application/json",
+                ".svg": "image/svg+xml", ".wasm": "application/wasm", ".webmanifest": "application/manifest+json",
+                ".ico": "image/x-icon", ".md": "text/markdown", ".ts": "text/plain", ".tsx": "text/plain",
+                ".jsx": "text/plain"}
+
+
+def idle_seconds() -> float:
+    """How long a session's preview stays published without requests or updates (SOLACE_PREVIEW_IDLE_SECONDS)."""
+    try:
+        return float(os.getenv("SOLACE_PREVIEW_IDLE_SECONDS", "3600"))
+    except ValueError:
+        return 3600.0
+
+
+def content_type(path: str) -> str:
+    ext = posixpath.splitext(path)[1].lower()
+    ctype = _EXTRA_TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if ctype.startswith("text/") or ctype in ("application/javascript", "application/json", "image/svg+xml"):
+        ctype += "; charset=utf-8"
+    return ctype
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    return hashlib.sha1(content.encode("utf-8") if isinstance(content, str) else content).hexdigest()
+
+
+class _Asset:
+    """One file of a published site: body, type and ETag, plus a gzip copy made on first request."""
+
+    __slots__ = ("body", "ctype", "etag", "digest", "_gzip")
+
+    def __init__(self, path: str, content: Union[str, bytes], digest: str):
+        self.body = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        self.ctype = content_type(path)
+        self.digest = digest
+        self.etag = '"' + digest[:20] + '"'
+        self._gzip: Optional[bytes] = None
+
+    def compressible(self) -> bool:
+        return len(self.body) >= _MIN_GZIP_BYTES and self.ctype.startswith(_COMPRESSIBLE)
+
+    def gzipped(self) -> bytes:
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzip
+
+
+class _Site:
+    def __init__(self):
+        self.assets: dict[str, _Asset] = {}
+        self.digest: Optional[str] = None
+        self.payload: Optional[dict] = None  # the last published mapping, for the identity fast path
+        self.last_used = time.time()
+
+
+class PreviewServer:
+    """One threaded HTTP server for every session's live preview.
+
+    Sessions publish their files (path -> text or bytes) and the server
+    answers /<session_id>/<path> straight from memory, one thread per
+    connection, with HTTP/1.1 keep-alive, ETag revalidation and gzip for
+    text assets. Requests for root-absolute URLs (e.g. "/app.js") are routed
+    by the Referer to the session that loaded the page. Sessions that are
+    neither requested nor republished for idle_seconds() are dropped.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._sites: dict[str, _Site] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="solace-preview", daemon=True)
+        self._thread.start()
+
+    def url(self, session_id: str) -> str:
+        return f"http://{self.host}:{self.port}/{urllib.parse.quote(session_id)}/"
+
+    def publish(self, session_id: str, files: dict[str, Union[str, bytes]]) -> str:
+        """Serve `files` for session_id (replacing what it served before); returns the site URL.
+
+        Sync is incremental: republishing the same mapping object, or one
+        with the same content hash, is a no-op, and otherwise only files
+        whose hash changed are rebuilt (the rest keep their ETag and gzip
+        copy). Treat a published mapping as read-only.
+        """
+        with self._lock:
+            site = self._sites.get(session_id)
+            if site is not None and site.payload is files:
+                site.last_used = time.time()
+                metrics.incr("preview.syncs", outcome="unchanged")
+                return self.url(session_id)
+        manifest = {posixpath.normpath(p.replace("\\", "/")).lstrip("/"): (content_hash(c), c) for p, c in files.items()}
+        digest = hashlib.sha1("\n".join(f"{p}\0{h}" for p, (h, _) in sorted(manifest.items())).encode()).hexdigest()
+        with self._lock:
+            site = self._sites.get(session_id) or _Site()
+            if site.digest != digest:
+                old, assets, written = site.assets, {}, 0
+                for path, (h, content) in manifest.items():
+                    prev = old.get(path)
+                    if prev is not None and prev.digest == h:
+                        assets[path] = prev
+                    else:
+                        assets[path] = _Asset(path, content, h)
+                        written += 1
+                site.assets, site.digest = assets, digest
+                metrics.incr("preview.syncs", outcome="updated")
+                metrics.incr("preview.files_written", written)
+                metrics.incr("preview.files_removed", len(set(old) - set(assets)))
+            else:
+                metrics.incr("preview.syncs", outcome="unchanged")
+            site.payload = files
+            site.last_used = time.time()
+            self._sites[session_id] = site
+        self.sweep()
+        return self.url(session_id)
+
+    def release(self, session_id: str) -> None:
+        with self._lock:
+            self._sites.pop(session_id, None)
+
+    def sessions(self) -> list[str]:
+        with self._lock:
+            return list(self._sites)
+
+    def sweep(self, force: bool = False) -> int:
+        """Drop idle sessions (at most once a minute unless forced). Returns how many were dropped."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_sweep < 60:
+                return 0
+            self._last_sweep = now
+            cutoff = now - idle_seconds()
+            stale = [sid for sid, site in self._sites.items() if site.last_used < cutoff]
+            for sid in stale:
+                del self._sites[sid]
+        return len(stale)
+
+    def lookup(self, session_id: str, path: str) -> tuple[bool, Optional[_Asset]]:
+        """(session known, asset or None) for a request path inside a session."""
+        with self._lock:
+            site = self._sites.get(session_id)
+            if site is None:
+                return False, None
+            site.last_used = time.time()
+            assets = site.assets
+        path = posixpath.normpath("/" + path).lstrip("/")
+        if path in ("", "."):
+            path = "index.html"
+        asset = assets.get(path)
+        if asset is None and posixpath.splitext(path)[1] == "":
+            asset = assets.get(posixpath.join(path, "index.html"))
+        return True, asset
+
+    def known(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sites
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _handler_for(server: PreviewServer):
+    class PreviewHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "SolacePreview"
+        # headers and body go out in separate writes; without TCP_NODELAY keep-alive responses wait on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _route(self) -> tuple[Optional[str], str]:
+            path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+            session_id, _, rest = path.lstrip("/").partition("/")
+            if server.known(session_id):
+                if not rest and not path.endswith("/"):
+                    return None, f"/{urllib.parse.quote(session_id)}/"  # relative URLs need the trailing slash
+                return session_id, rest
+            # "/style.css" from a page under /<session_id>/ comes without the prefix
+            referer = urllib.parse.unquote(urllib.parse.urlsplit(self.headers.get("Referer", "")).path)
+            ref_session = referer.lstrip("/").partition("/")[0]
+            if ref_session and server.known(ref_session):
+                return ref_session, path.lstrip("/")
+            return "", ""
+
+        def _send(self, status: int, body: bytes = b"", headers: Optional[dict] = None, head: bool = False) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and not head:
+                self.wfile.write(body)
+
+        def _serve(self, head: bool) -> None:
+            session_id, rest = self._route()
+            if session_id is None:
+                self._send(301, headers={"Location": rest}, head=head)
+                return
+            found, asset = server.lookup(session_id, rest) if session_id else (False, None)
+            if asset is None:
+                msg = b"Not found" if found else b"Unknown or expired preview session"
+                self._send(404, msg, {"Content-Type": "text/plain; charset=utf-8", "Cache-Control": "no-store"}, head)
+                return
+            headers = {"ETag": asset.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding",
+                       "X-Content-Type-Options": "nosniff"}
+            if asset.etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+                self._send(304, headers=headers, head=True)
+                return
+            headers["Content-Type"] = asset.ctype
+            body = asset.body
+            if asset.compressible() and "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = asset.gzipped()
+                headers["Content-Encoding"] = "gzip"
+            self._send(200, body, headers, head)
+
+        def do_GET(self):
+            self._serve(head=False)
+
+        def do_HEAD(self):
+            self._serve(head=True)
+
+    return PreviewHandler
+
+
+class DirectorySnapshot:
+    """path -> bytes view of a directory that re-reads only files whose size or mtime changed.
+
+    refresh() returns the same mapping object while nothing changed, so
+    publishing it again hits PreviewServer's identity fast path.
+    """
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self.payload: dict[str, bytes] = {}
+        self._stats: dict[str, tuple[int, int]] = {}
+
+    def _scan(self, directory: str, prefix: str, stats: dict) -> None:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            rel = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    self._scan(entry.path, rel + "/", stats)
+                elif entry.is_file():
+                    st = entry.stat()
+                    stats[rel] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+
+    def refresh(self) -> dict[str, bytes]:
+        stats: dict[str, tuple[int, int]] = {}
+        self._scan(str(self.directory), "", stats)
+        if stats == self._stats:
+            return self.payload
+        payload = {}
+        for rel, key in stats.items():
+            if self._stats.get(rel) == key and rel in self.payload:
+                payload[rel] = self.payload[rel]
+                continue
+            try:
+                payload[rel] = (self.directory / rel).read_bytes()
+            except OSError:
+                continue
+        self._stats, self.payload = stats, payload
+        return payload
+
+
+_server: Optional[PreviewServer] = None
+_server_lock = threading.Lock()
+
+
+def preview_server() -> PreviewServer:
+    """The process-wide preview server, started on first use (SOLACE_PREVIEW_HOST / SOLACE_PREVIEW_PORT, 0 = any)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = PreviewServer(os.getenv("SOLACE_PREVIEW_HOST", "127.0.0.1"),
+                                    int(os.getenv("SOLACE_PREVIEW_PORT", "0")))
+        return _server
@@ -1,4 +1,7 @@
-def planner_prompt(user_prompt: str) -> str:
+from typing import Optional
+
+
+def planner_prompt(user_prompt: str, previous_plan: Optional[str]= None) -> str:
     PLANNER_PROMPT=  f"""
 You are an expert software planner.
 Return ONLY a JSON object matching this schema, no prose:
@@ -11,6 +14,15 @@ Return ONLY a JSON object matching this schema, no prose:
 }}
 
 User request: {user_prompt}
+"""
+    if previous_plan:
+        PLANNER_PROMPT+= f"""
+The project already exists, built from the plan below. If the request changes or extends this app, keep everything that
+still applies exactly as it is (same file paths and purposes) and only add or change what the request needs.
+If it asks for a different app, ignore it.
+
+Current plan JSON:
+{previous_plan}
 """
 
     return PLANNER_PROMPT
@@ -25,45 +37,71 @@ You have access to tools to read and write files.
 Use ONLY the following tools:
 - read_file(path: str)
 - write_file(path: str, content: str)
-- list_files(directory: str = ".")
+- edit_file(path: str, edits: [{"search": str, "replace": str}])
+- list_files(directory: str = ".", offset: int = 0, limit: int = 200, depth: int = None)
+- print_tree(path: str = "", depth: int = 2)
 - get_current_directory()
 - run_cmd(cmd: str, cwd: str = None, timeout: int = 30)
 
-Do NOT use repo_browser.* tools, print_tree, or any tools except those explicitly listed. Use only the exact names above.
+Do NOT use repo_browser.* tools or any tools except those explicitly listed. Use only the exact names above.
 
 Examples of correct use:
 read_file("index.html")
 list_files("src/")
+print_tree("src", depth=1)
 Incorrect:
 repo_browser.read_file(path="index.html")
 repo_browser.print_tree(path="src/")
-print_tree(path="src")
 
 Always:
-- Review all existing files to maintain compatibility.
-- Implement the FULL file content, integrating with other modules.
+- Maintain compatibility with the existing files. When the task lists the other files' interfaces, rely on that list and read a file only for details it does not show.
+- For a new file, write its complete content with write_file, integrating with other modules.
+- For changes to a file that already exists, use edit_file with small search/replace edits instead of rewriting the whole file with write_file. Each search text must match the file exactly once. You may be shown only an excerpt of such a file; edit it without reproducing the rest.
 - Maintain consistent naming of variables, functions, and imports.
 - When a module is imported from another file, ensure it exists and is implemented as described.
     """
     return CODER_SYSTEM_PROMPT
 
-def architect_prompt(plan: str) -> str:
+def architect_prompt(plan: str, previous_steps: Optional[str]= None) -> str:
     ARCHITECT_PROMPT= f"""
 You are an expert software architect.
 Given the project plan (JSON), produce ONLY a JSON object matching this schema, no prose:
 {{
   "implimentation_steps": [
-    {{"file_path": string, "task_description": string}}
+    {{"file_path": string, "task_description": string, "depends_on": string[]}}
   ]
 }}
 
 Guidelines:
 - Create at least one task per planned file.
 - Order tasks by dependencies.
+- In "depends_on" list the file paths of earlier tasks this task needs to see (e.g. the HTML a script queries). Use [] when the task is independent so it can be implemented in parallel.
 - Be explicit about functions, components, signatures, and integration details.
 
 Project Plan JSON:
 {plan}
+"""
+    if previous_steps:
+        ARCHITECT_PROMPT+= f"""
+The files were already implemented with the tasks below. Repeat every task whose file and purpose did not change
+exactly as it is (same file_path, task_description and depends_on, in the same order), so it is not redone.
+Change or add tasks only for what the new plan changes.
+
+Current implementation steps JSON:
+{previous_steps}
+"""
+
+    return ARCHITECT_PROMPT
+def structured_repair_prompt(schema_name: str, error: str, previous: str) -> str:
+    REPAIR_PROMPT= f"""
+Your previous reply could not be parsed as a {schema_name} JSON object.
+Error:
+{error}
+
+Previous reply:
+{previous}
+
+Return ONLY the corrected JSON object, no prose and no code fences.
 """
 
-    return ARCHITECT_PROMPT
\ No newline at end of file
+    return REPAIR_PROMPT
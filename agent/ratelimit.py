@@ -0,0 +1,276 @@
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from .tracing import metrics
+
+# Lower value = served first when calls are queued
+LANE_PRIORITY = {"planner": 0, "architect": 1, "default": 2, "coder": 3}
+
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("solace_llm_lane", default="default")
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_TEXT = re.compile(r"\b(429|500|502|503|504)\b|RESOURCE_EXHAUSTED|UNAVAILABLE|rate.?limit|overloaded", re.IGNORECASE)
+
+
+@contextmanager
+def llm_lane(lane: str):
+    """Queue model calls made inside this block in the given priority lane."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane() -> str:
+    return _lane.get()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """`limit` units per `period` seconds, refilled evenly; limit 0 means unlimited.
+
+    At most `burst` units (default: the whole limit) are stored, which caps
+    how many calls can go out back to back after an idle spell.
+    Not thread-safe on its own: LLMScheduler calls it under its lock.
+    """
+
+    def __init__(self, limit: int, period: float = 60.0, burst: Optional[int] = None):
+        self.capacity = max(1, min(limit, burst or limit)) if limit else 0
+        self.rate = limit / period if limit else 0.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        # settle an estimate against actual usage; may leave the bucket in debt
+        if self.capacity:
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    def drain(self, now: float) -> None:
+        if self.capacity:
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class LLMScheduler:
+    """Admission control shared by every session in front of one provider.
+
+    A call waits in a priority queue (lanes from LANE_PRIORITY, FIFO within a
+    lane) until a concurrency slot is free and the requests-per-minute and
+    tokens-per-minute buckets allow it. Token use is estimated up front and
+    settled against the provider's reported usage afterwards. A rate-limit
+    response drains the request bucket so every queued caller slows down,
+    not only the one that got the 429.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 8, period: float = 60.0, burst: float = 0.25):
+        # providers count over a sliding minute: a full bucket plus a minute of refill
+        # would exceed it, so only `burst` of the limit may be spent back to back
+        self.requests = TokenBucket(rpm, period, int(rpm * burst))
+        self.tokens = TokenBucket(tpm, period, int(tpm * burst))
+        self.max_concurrency = max(1, max_concurrency)
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @contextmanager
+    def slot(self, lane: str, est_tokens: int = 0) -> Iterator[None]:
+        """Wait for a turn to call the model; the block is the call itself."""
+        entry = (LANE_PRIORITY.get(lane, LANE_PRIORITY["default"]), next(self._seq))
+        t0 = time.perf_counter()
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            metrics.observe("llm.queue_depth", len(self._queue), lane=lane)
+            while True:
+                now = time.monotonic()
+                delay = max(self.requests.wait_time(1, now), self.tokens.wait_time(est_tokens, now))
+                if self._queue[0] == entry and self._in_flight < self.max_concurrency and delay == 0:
+                    break
+                self._cond.wait(delay if delay > 0 and self._queue[0] == entry else None)
+            heapq.heappop(self._queue)
+            self._in_flight += 1
+            self.requests.take(1)
+            self.tokens.take(est_tokens)
+            self._cond.notify_all()
+        metrics.observe("llm.queue_wait_ms", (time.perf_counter() - t0) * 1000, lane=lane)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def settle(self, est_tokens: int, actual_tokens: int) -> None:
+        with self._cond:
+            self.tokens.adjust(actual_tokens - est_tokens)
+
+    def rate_limited(self) -> None:
+        with self._cond:
+            self.requests.drain(time.monotonic())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True for provider rate-limit (429) and server (5xx) errors, however the client wraps them."""
+    seen = set()
+    e: Optional[BaseException] = error
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        for status in (getattr(e, "status_code", None), getattr(e, "code", None),
+                       getattr(getattr(e, "response", None), "status_code", None)):
+            if isinstance(status, int) and status in _RETRYABLE_STATUS:
+                return True
+        e = e.__cause__ or e.__context__
+    return bool(_RETRYABLE_TEXT.search(str(error)))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff, so callers that failed together don't retry together."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _estimate_tokens(messages: list[BaseMessage]) -> int:
+    # ~4 characters per token for the prompt plus a flat allowance for the reply
+    return sum(len(str(m.content)) for m in messages) // 4 + 500
+
+
+class ScheduledChatModel(BaseChatModel):
+    """Chat model wrapper that routes every call through an LLMScheduler.
+
+    Put the response cache on this wrapper rather than on `inner`, so cache
+    hits don't wait for a slot. `inner` should have its own retries turned
+    off; retries here back off with jitter and count against the shared limits.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    scheduler: LLMScheduler
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_cap: float = 30.0
+
+    @property
+    def _llm_type(self) -> str:
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return dict(self.inner._identifying_params)
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        lane = current_lane()
+        est = _estimate_tokens(messages)
+        attempt = 0
+        while True:
+            try:
+                with self.scheduler.slot(lane, est):
+                    message = self.inner.invoke(messages, stop=stop, **kwargs)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    metrics.incr("llm.errors", lane=lane)
+                    raise
+                self.scheduler.rate_limited()
+                metrics.incr("llm.retries", lane=lane)
+                time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+                attempt += 1
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            self.scheduler.settle(est, int(usage["total_tokens"]))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        # the slot is held until the stream ends; retries only happen before the first chunk arrived
+        lane = current_lane()
+        est = _estimate_tokens(messages)
+        attempt = 0
+        while True:
+            yielded = False
+            usage: dict = {}
+            try:
+                with self.scheduler.slot(lane, est):
+                    for chunk in self.inner.stream(messages, stop=stop, **kwargs):
+                        yielded = True
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        yield ChatGenerationChunk(message=chunk)
+                break
+            except Exception as e:
+                if yielded or attempt >= self.max_retries or not is_retryable(e):
+                    metrics.incr("llm.errors", lane=lane)
+                    raise
+                self.scheduler.rate_limited()
+                metrics.incr("llm.retries", lane=lane)
+                time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap))
+                attempt += 1
+        if usage.get("total_tokens"):
+            self.scheduler.settle(est, int(usage["total_tokens"]))
+
+    def bind_tools(self, tools, **kwargs):
+        # let the provider format the tools, then bind the same call kwargs on the wrapper
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+
+_schedulers: dict[str, LLMScheduler] = {}
+_scheduler_lock = threading.Lock()
+
+
+def llm_scheduler(provider: str = "default") -> LLMScheduler:
+    """Process-wide scheduler for one provider's limits.
+
+    Configured by SOLACE_LLM_<PROVIDER>_RPM / _TPM / _CONCURRENCY, falling
+    back to SOLACE_LLM_RPM, SOLACE_LLM_TPM (0 = unlimited) and SOLACE_LLM_CONCURRENCY.
+    """
+    def setting(name: str, default: int) -> int:
+        return _env_int(f"SOLACE_LLM_{provider.upper()}_{name}", _env_int(f"SOLACE_LLM_{name}", default))
+
+    with _scheduler_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            scheduler = _schedulers[provider] = LLMScheduler(
+                rpm=setting("RPM", 0),
+                tpm=setting("TPM", 0),
+                max_concurrency=setting("CONCURRENCY", 8),
+            )
+        return scheduler
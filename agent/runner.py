@@ -0,0 +1,297 @@
+import os
+import pathlib
+import re
+import shlex
+import shutil
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Optional
+
+# exit code reported when a command is killed for running past its timeout (same as coreutils `timeout`)
+TIMEOUT_EXIT_CODE = 124
+
+# variables never passed to generated commands
+_SECRET_ENV = re.compile(r"(API_KEY|TOKEN|SECRET|PASSWORD|CREDENTIAL)", re.IGNORECASE)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def output_cap() -> int:
+    """Bytes of stdout (and, separately, stderr) returned to the model per command (SOLACE_CMD_OUTPUT_BYTES)."""
+    return _env_int("SOLACE_CMD_OUTPUT_BYTES", 16000)
+
+
+def runner_kind() -> str:
+    """"shell" (default): one long-lived shell per session; "subprocess": a fresh process per command."""
+    kind = os.getenv("SOLACE_CMD_RUNNER", "shell").lower()
+    if kind == "shell" and (os.name != "posix" or shutil.which("bash") is None):
+        return "subprocess"
+    return kind if kind in ("shell", "subprocess") else "shell"
+
+
+class TruncatedOutput:
+    """Keeps the first and last `max_bytes // 2` bytes of a stream and counts what was dropped in between."""
+
+    def __init__(self, max_bytes: int):
+        self.head_max = max_bytes // 2
+        self.tail_max = max_bytes - self.head_max
+        self.head = bytearray()
+        self.tail: deque[bytes] = deque()
+        self.tail_size = 0
+        self.total = 0
+
+    def append(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_max - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data or not self.tail_max:
+            return
+        self.tail.append(data)
+        self.tail_size += len(data)
+        while self.tail_size - len(self.tail[0]) >= self.tail_max:
+            self.tail_size -= len(self.tail.popleft())
+
+    def text(self) -> str:
+        tail = b"".join(self.tail)[-self.tail_max:] if self.tail_max else b""
+        omitted = self.total - len(self.head) - len(tail)
+        out = self.head.decode("utf-8", errors="replace")
+        if omitted > 0:
+            out += f"\n... [{omitted} bytes omitted] ...\n"
+        return out + tail.decode("utf-8", errors="replace")
+
+
+def _sandbox_env() -> dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not _SECRET_ENV.search(k)}
+    env.update({"PS1": "", "PS2": ""})
+    return env
+
+
+def _ulimits() -> str:
+    # shell prefix capping CPU seconds, data segment (KB) and file size (KB) of every process it starts
+    limits = (("-t", _env_int("SOLACE_CMD_CPU_SECONDS", 120)), ("-d", _env_int("SOLACE_CMD_MEMORY_MB", 2048) * 1024),
+              ("-f", _env_int("SOLACE_CMD_FILE_MB", 256) * 1024))
+    return "".join(f"ulimit {flag} {value} 2>/dev/null; " for flag, value in limits if value)
+
+
+class _Capture:
+    def __init__(self, marker: bytes, max_bytes: int, on_output: Optional[Callable[[str, str], None]]):
+        self.marker = marker
+        self.out = TruncatedOutput(max_bytes)
+        self.err = TruncatedOutput(max_bytes)
+        self.on_output = on_output
+        self.exit_code: Optional[int] = None
+        self.out_done = threading.Event()
+        self.err_done = threading.Event()
+
+
+class ShellRunner:
+    """One long-lived bash per session that runs commands one after another.
+
+    Each command runs in a subshell (so `cd`, `exit` or a syntax error can't
+    break the session shell), with stdin from /dev/null. A sentinel line
+    with the exit code marks its end on stdout and stderr. Output is read by
+    two reader threads into head/tail-truncated buffers. The shell leads its
+    own process group with CPU, memory and file-size limits (ulimit). On
+    timeout the whole group is killed and the shell is restarted on the
+    next command.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._capture: Optional[_Capture] = None
+        self._token = uuid.uuid4().hex
+        self._seq = 0
+        self.last_used = time.time()
+
+    def _start(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._proc = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            cwd=str(self.root), env=_sandbox_env(), start_new_session=True,
+        )
+        self._proc.stdin.write((_ulimits() + "\n").encode())
+        for stream, is_err in ((self._proc.stdout, False), (self._proc.stderr, True)):
+            threading.Thread(target=self._read, args=(self._proc, stream, is_err), daemon=True).start()
+
+    def _read(self, proc: subprocess.Popen, stream, is_err: bool) -> None:
+        pending_newline = False
+        while True:
+            line = stream.readline(65536)
+            capture = self._capture if self._proc is proc else None
+            if not line:
+                if capture is not None:
+                    (capture.err_done if is_err else capture.out_done).set()
+                return
+            if capture is None:
+                continue
+            if line.startswith(capture.marker):
+                if not is_err:
+                    try:
+                        capture.exit_code = int(line[len(capture.marker):].strip() or 0)
+                    except ValueError:
+                        capture.exit_code = -1
+                pending_newline = False
+                (capture.err_done if is_err else capture.out_done).set()
+                continue
+            if pending_newline:
+                self._emit(capture, b"\n", is_err)
+            # the sentinel is printed after a newline; hold back a bare trailing one until we know
+            if line.endswith(b"\n"):
+                line, pending_newline = line[:-1], True
+            self._emit(capture, line, is_err)
+
+    @staticmethod
+    def _emit(capture: _Capture, data: bytes, is_err: bool) -> None:
+        if not data:
+            return
+        (capture.err if is_err else capture.out).append(data)
+        if capture.on_output is not None:
+            try:
+                capture.on_output("stderr" if is_err else "stdout", data.decode("utf-8", errors="replace"))
+            except Exception:
+                pass
+
+    def run(self, cmd: str, cwd: pathlib.Path, timeout: float = 30,
+            on_output: Optional[Callable[[str, str], None]] = None) -> tuple[int, str, str]:
+        """Run cmd in cwd; returns (exit code, stdout, stderr) with each stream truncated to output_cap()."""
+        with self._lock:
+            self.last_used = time.time()
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            self._seq += 1
+            marker = f"__SOLACE_DONE_{self._token}_{self._seq}__".encode()
+            capture = self._capture = _Capture(marker, output_cap(), on_output)
+            script = (
+                f"( cd -- {shlex.quote(str(cwd))} && eval {shlex.quote(cmd)} ) < /dev/null\n"
+                f"__solace_rc=$?; printf '\\n{marker.decode()} %s\\n' \"$__solace_rc\"; printf '\\n{marker.decode()}\\n' >&2\n"
+            )
+            try:
+                self._proc.stdin.write(script.encode())
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self.close()
+                return -1, "", "ERROR: command shell exited unexpectedly"
+            deadline = time.monotonic() + timeout
+            finished = capture.out_done.wait(timeout) and capture.err_done.wait(max(0.0, deadline - time.monotonic()))
+            if not finished:
+                self.close()
+                note = f"\n[timed out after {timeout}s; process group killed]"
+                return TIMEOUT_EXIT_CODE, capture.out.text(), capture.err.text() + note
+            self._capture = None
+            code = capture.exit_code if capture.exit_code is not None else -1
+            return code, capture.out.text(), capture.err.text()
+
+    def close(self) -> None:
+        proc, self._proc, self._capture = self._proc, None, None
+        if proc is None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+def _drain(stream, sink: TruncatedOutput) -> None:
+    # chunked reads: only the capped head and tail of a noisy command are ever held in memory
+    while True:
+        chunk = stream.read1(65536)
+        if not chunk:
+            return
+        sink.append(chunk)
+
+
+def run_subprocess(cmd: str, cwd: pathlib.Path, timeout: float = 30) -> tuple[int, str, str]:
+    """One-off runner: a fresh shell per command, in its own process group, with the same limits and truncation."""
+    posix = os.name == "posix"
+    proc = subprocess.Popen(
+        (_ulimits() + cmd) if posix else cmd, shell=True, cwd=str(cwd), stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=_sandbox_env(), start_new_session=posix,
+    )
+    cap = output_cap()
+    stdout, stderr = TruncatedOutput(cap), TruncatedOutput(cap)
+    readers = [threading.Thread(target=_drain, args=(stream, sink), daemon=True)
+               for stream, sink in ((proc.stdout, stdout), (proc.stderr, stderr))]
+    for reader in readers:
+        reader.start()
+    deadline = time.monotonic() + timeout
+    try:
+        proc.wait(timeout)
+        # like communicate(): also wait for the pipes, which background children may hold open
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        finished = not any(reader.is_alive() for reader in readers)
+    except subprocess.TimeoutExpired:
+        finished = False
+    note = ""
+    if finished:
+        code = proc.returncode
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            proc.kill()
+        proc.wait()
+        for reader in readers:
+            reader.join(5)
+        code = TIMEOUT_EXIT_CODE
+        note = f"\n[timed out after {timeout}s; process group killed]"
+    for stream in (proc.stdout, proc.stderr):
+        try:
+            stream.close()
+        except Exception:
+            pass
+    return code, stdout.text(), stderr.text() + note
+
+
+_RUNNERS: dict[str, ShellRunner] = {}
+_RUNNERS_LOCK = threading.Lock()
+
+
+def get_runner(key: str, root: pathlib.Path) -> ShellRunner:
+    """The shell runner of a session, started lazily on its first command."""
+    with _RUNNERS_LOCK:
+        runner = _RUNNERS.get(key)
+        if runner is None:
+            runner = _RUNNERS[key] = ShellRunner(root)
+        return runner
+
+
+def close_runner(key: str) -> None:
+    with _RUNNERS_LOCK:
+        runner = _RUNNERS.pop(key, None)
+    if runner is not None:
+        runner.close()
+
+
+def close_idle_runners(max_idle_seconds: float) -> int:
+    """Stop the shells of sessions that ran no command for max_idle_seconds. Returns how many were stopped."""
+    cutoff = time.time() - max_idle_seconds
+    with _RUNNERS_LOCK:
+        stale = [k for k, r in _RUNNERS.items() if r.last_used < cutoff]
+        runners = [_RUNNERS.pop(k) for k in stale]
+    for runner in runners:
+        runner.close()
+    return len(runners)
@@ -0,0 +1,168 @@
+import contextvars
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from .states import ImplementationTask
+
+
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("solace_cancel", default=None)
+
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    """Let event cancel the generation running in this context; checked before each coder step starts."""
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def cancel_requested() -> bool:
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+class StepCancelled(Exception):
+    """A step was not started because the generation was cancelled."""
+
+
+def coder_workers() -> int:
+    """Max number of implementation steps the coder runs at the same time."""
+    try:
+        return max(1, int(os.getenv("SOLACE_CODER_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+def coder_batch_tokens() -> int:
+    """Token budget for batching small steps into one coder call (SOLACE_CODER_BATCH_TOKENS); 0 disables batching."""
+    try:
+        return max(0, int(os.getenv("SOLACE_CODER_BATCH_TOKENS", "0")))
+    except ValueError:
+        return 0
+
+
+def estimate_tokens(text: str) -> int:
+    # rough count (~4 characters per token); only used to size batches
+    return len(text) // 4 + 1
+
+
+def _norm_path(path: str) -> str:
+    path = path.strip().replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path
+
+
+def _mentions(text: str, path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    for needle in {path, name}:
+        if needle and re.search(rf"(?<![\w./-]){re.escape(needle)}(?![\w-])", text):
+            return True
+    return False
+
+
+def step_dependencies(steps: list[ImplementationTask]) -> list[set[int]]:
+    """For every step, return the indices of earlier steps it has to wait for.
+
+    A step always waits for the previous step on the same file. Explicit
+    `depends_on` paths from the architect map to the latest earlier step writing
+    that path. When the architect left `depends_on` unset, dependencies are
+    inferred from earlier file paths mentioned in the task description.
+    Only earlier steps are considered, so the result is always acyclic.
+    """
+    last_writer: dict[str, int] = {}
+    deps: list[set[int]] = []
+    for i, task in enumerate(steps):
+        path = _norm_path(task.file_path)
+        d: set[int] = set()
+        if path in last_writer:
+            d.add(last_writer[path])
+        if task.depends_on is not None:
+            for dep in task.depends_on:
+                j = last_writer.get(_norm_path(dep))
+                if j is not None:
+                    d.add(j)
+        else:
+            for other, j in last_writer.items():
+                if other != path and _mentions(task.task_description, other):
+                    d.add(j)
+        deps.append(d)
+        last_writer[path] = i
+    return deps
+
+
+def ready_steps(deps: list[set[int]], completed: Iterable[int]) -> list[int]:
+    """Indices of steps that are not completed and whose dependencies all are."""
+    done = set(completed)
+    return [i for i, d in enumerate(deps) if i not in done and d <= done]
+
+
+def batch_steps(indices: Iterable[int], cost: Callable[[int], int], budget: int, max_size: int = 8) -> list[list[int]]:
+    """Group ready steps into batches for one coder call each.
+
+    Only runs of consecutive indices are grouped, so a batch keeps the
+    architect's order. A batch's summed cost stays within budget; a step
+    that alone exceeds it runs by itself.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for i in sorted(indices):
+        c = cost(i)
+        if current and (i != current[-1] + 1 or used + c > budget or len(current) >= max_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += c
+    if current:
+        batches.append(current)
+    return batches
+
+
+class StepsFailed(Exception):
+    """Raised by run_concurrently when a step failed; carries the steps that did finish."""
+
+    def __init__(self, finished: list[int], error: BaseException):
+        super().__init__(str(error))
+        self.finished = finished
+        self.error = error
+
+
+def run_concurrently(fn: Callable[[int], None], indices: list[int], max_workers: Optional[int] = None) -> list[int]:
+    """Run fn(i) for every index on a bounded thread pool.
+
+    Returns the indices that finished successfully. If any call raised,
+    StepsFailed is raised after the remaining calls have finished (so no file
+    write is left half-way), carrying the finished indices and the first error.
+    Calls that have not started when cancellation is requested (cancel_scope)
+    raise StepCancelled instead of running; calls already running finish.
+    """
+    if not indices:
+        return []
+    workers = min(max_workers or coder_workers(), len(indices))
+    finished: list[int] = []
+    error: Optional[BaseException] = None
+
+    def run(i: int) -> None:
+        if cancel_requested():
+            raise StepCancelled(f"cancelled before step {i}")
+        fn(i)
+
+    with ContextThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run, i): i for i in indices}
+        for fut, i in futures.items():
+            try:
+                fut.result()
+                finished.append(i)
+            except Exception as e:
+                if error is None:
+                    error = e
+    if error is not None:
+        raise StepsFailed(finished, error) from error
+    return finished
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Optional, TypedDict
 
 class File(BaseModel):
     path: str = Field(description= " The file path where the file will be created, e.g. 'src/components/Header.js'")
@@ -17,12 +17,33 @@ class Plan(BaseModel):
 class ImplementationTask(BaseModel):
     file_path: str = Field(description="The file path where the implementation task will be carried out, e.g. 'src/components/Header.js'")
     task_description: str = Field(description="A detailed description of the implementation task, specifying what needs to be done, including variable names, function signatures, component details, and integration points with other tasks.")
+    depends_on: Optional[list[str]]= Field(None, description="File paths of earlier tasks this task builds on, e.g. ['index.html']. Empty list when the task is independent of other files.")
 
 class TaskPlan(BaseModel):
     implimentation_steps: list[ImplementationTask]= Field(description="A list of implementation tasks to be carried out for the project")
     model_config= ConfigDict(extra="allow")
 
+class FileEdit(BaseModel):
+    search: str = Field(description="Exact text currently in the file to replace; must match exactly once, including whitespace")
+    replace: str = Field(description="Text to put in place of the search text")
+
 class CoderState(BaseModel):
     task_plan: TaskPlan= Field(description="The plann for the task to be implemented")
     current_step_index: int= Field(description="The index of the current implementation step being worked on")
+    completed_steps: list[int]= Field(default_factory=list, description="Indices of the implementation steps that are already done")
     current_file_content: Optional[str]= Field(None, description="The existing content of the file being modified")
+
+
+class GraphState(TypedDict, total=False):
+    """Shared state of the planner -> architect -> coder graph; nodes return partial updates."""
+    user_prompt: str
+    session_id: Optional[str]
+    plan: Plan
+    task_plan: TaskPlan
+    coder_state: CoderState
+    status: Optional[str]
+    error: Optional[str]
+    # incremental runs: the session's last finished generation (agent.incremental)
+    previous_plan: Optional[Plan]
+    previous_task_plan: Optional[TaskPlan]
+    previous_files: Optional[dict[str, str]]
@@ -0,0 +1,293 @@
+import os
+import pathlib
+import posixpath
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+# Directories pulled back from disk after run_cmd are skipped when they are dependency/VCS caches
+SKIP_DIRS = {"node_modules", ".git", ".venv", "venv", "__pycache__"}
+
+
+def normalize_path(path: str) -> str:
+    """Normalize a project-relative path to 'a/b.txt' form; reject paths escaping the project."""
+    p = posixpath.normpath(path.replace("\\", "/").strip() or ".")
+    if p.startswith("/") or p == ".." or p.startswith("../"):
+        raise ValueError("Attempt to write outside project root")
+    return "" if p == "." else p
+
+
+def _under(path: str, directory: str) -> bool:
+    return not directory or path == directory or path.startswith(directory + "/")
+
+
+class StorageBackend(ABC):
+    """Where a session's generated project files live.
+
+    Paths are project-relative ('src/app.js'). `version` increases on every
+    change so callers can cheaply tell whether anything was written.
+    Listeners (the file and symbol indexes) hear about every path the
+    backend writes or deletes, whoever asked for it.
+    """
+
+    def __init__(self):
+        self.last_access = time.time()
+        self._listeners: list[Callable[[str, bool], None]] = []
+
+    def add_listener(self, listener: Callable[[str, bool], None]) -> None:
+        """Call listener(path, deleted) after each file this backend writes or deletes.
+
+        Listeners run after the backend's own lock is released. A disk
+        backend cannot see what a subprocess changes; see sync_from_disk.
+        """
+        self._listeners.append(listener)
+
+    def _changed(self, path: str, deleted: bool = False) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(path, deleted)
+            except Exception:
+                # listeners keep derived data (indexes); never fail the write over them
+                pass
+
+    @abstractmethod
+    def read(self, path: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def write(self, path: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def delete(self, path: str) -> bool: ...
+
+    @abstractmethod
+    def list(self, directory: str = "") -> list[str]:
+        """Sorted relative paths of all files under directory."""
+
+    @property
+    @abstractmethod
+    def version(self) -> int: ...
+
+    @abstractmethod
+    def sync_to_disk(self, root: pathlib.Path) -> None:
+        """Make the files visible on disk under root (for subprocesses)."""
+
+    @abstractmethod
+    def sync_from_disk(self, root: pathlib.Path) -> None:
+        """Pick up files created, changed or removed on disk under root."""
+
+    def is_dir(self, directory: str) -> bool:
+        directory = normalize_path(directory)
+        return not directory or any(_under(p, directory) and p != directory for p in self.list(directory))
+
+    def snapshot(self) -> dict[str, str]:
+        """All text files as path -> content. Files that are not valid UTF-8 are skipped."""
+        data: dict[str, str] = {}
+        for path in self.list():
+            raw = self.read(path)
+            if raw is None:
+                continue
+            try:
+                data[path] = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+        return data
+
+
+class MemoryBackend(StorageBackend):
+    """Files kept in process memory (path -> bytes) with a per-file mtime and a global version."""
+
+    def __init__(self):
+        super().__init__()
+        self._files: dict[str, tuple[bytes, float]] = {}
+        self._version = 0
+        self._synced_version = -1
+        self._synced_at = 0.0
+        # deleted since the last sync_to_disk; their mirror copies must go too, or sync_from_disk imports them again
+        self._deleted: set[str] = set()
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def read(self, path: str) -> Optional[bytes]:
+        self.last_access = time.time()
+        with self._lock:
+            entry = self._files.get(normalize_path(path))
+            return entry[0] if entry else None
+
+    def write(self, path: str, data: bytes) -> None:
+        self.last_access = time.time()
+        path = normalize_path(path)
+        with self._lock:
+            self._files[path] = (data, time.time())
+            self._deleted.discard(path)
+            self._version += 1
+        self._changed(path)
+
+    def delete(self, path: str) -> bool:
+        path = normalize_path(path)
+        with self._lock:
+            if self._files.pop(path, None) is None:
+                return False
+            self._deleted.add(path)
+            self._version += 1
+        self._changed(path, deleted=True)
+        return True
+
+    def list(self, directory: str = "") -> list[str]:
+        self.last_access = time.time()
+        directory = normalize_path(directory)
+        with self._lock:
+            return sorted(p for p in self._files if _under(p, directory))
+
+    def sync_to_disk(self, root: pathlib.Path) -> None:
+        with self._lock:
+            if self._synced_version == self._version and root.exists():
+                return
+            root.mkdir(parents=True, exist_ok=True)
+            for path in self._deleted:
+                try:
+                    (root / path).unlink(missing_ok=True)
+                except OSError:
+                    continue
+            self._deleted.clear()
+            for path, (data, mtime) in self._files.items():
+                target = root / path
+                if self._synced_version >= 0 and mtime <= self._synced_at and target.exists():
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+            self._synced_version = self._version
+            self._synced_at = time.time()
+
+    def sync_from_disk(self, root: pathlib.Path) -> None:
+        if not root.exists():
+            return
+        changed: list[tuple[str, bool]] = []
+        with self._lock:
+            since = self._synced_at
+            on_disk: set[str] = set()
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+                for name in filenames:
+                    full = pathlib.Path(dirpath) / name
+                    rel = full.relative_to(root).as_posix()
+                    if rel in self._deleted:
+                        # a stale mirror copy; sync_to_disk removes it
+                        continue
+                    on_disk.add(rel)
+                    entry = self._files.get(rel)
+                    if entry is not None and entry[1] > since:
+                        # written in memory while the command ran: memory wins
+                        continue
+                    try:
+                        if entry is None or full.stat().st_mtime > since:
+                            data = full.read_bytes()
+                            if entry is None or entry[0] != data:
+                                self._files[rel] = (data, time.time())
+                                self._version += 1
+                                changed.append((rel, False))
+                    except OSError:
+                        continue
+            for rel, (_, mtime) in list(self._files.items()):
+                if rel not in on_disk and mtime <= since and not any(part in SKIP_DIRS for part in rel.split("/")):
+                    del self._files[rel]
+                    self._version += 1
+                    changed.append((rel, True))
+            self._synced_version = self._version
+            self._synced_at = time.time()
+        for rel, deleted in changed:
+            self._changed(rel, deleted)
+
+
+class DiskBackend(StorageBackend):
+    """Files stored directly under a directory on disk (the previous behaviour)."""
+
+    def __init__(self, root: pathlib.Path):
+        super().__init__()
+        self.root = root
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _path(self, path: str) -> pathlib.Path:
+        return self.root / normalize_path(path)
+
+    def read(self, path: str) -> Optional[bytes]:
+        p = self._path(path)
+        return p.read_bytes() if p.is_file() else None
+
+    def write(self, path: str, data: bytes) -> None:
+        # write to a sibling temp file and rename, so readers never see a half-written file
+        p = self._path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, p)
+        self._version += 1
+        self._changed(normalize_path(path))
+
+    def delete(self, path: str) -> bool:
+        p = self._path(path)
+        if not p.is_file():
+            return False
+        p.unlink()
+        self._version += 1
+        self._changed(normalize_path(path), deleted=True)
+        return True
+
+    def list(self, directory: str = "") -> list[str]:
+        base = self._path(directory)
+        if not base.is_dir():
+            return []
+        return sorted(p.relative_to(self.root).as_posix() for p in base.rglob("*") if p.is_file())
+
+    def sync_to_disk(self, root: pathlib.Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+
+    def sync_from_disk(self, root: pathlib.Path) -> None:
+        self._version += 1
+
+
+def storage_kind() -> str:
+    """Backend used for new sessions: "memory" (default) or "disk" (SOLACE_STORAGE)."""
+    kind = os.getenv("SOLACE_STORAGE", "memory").lower()
+    return kind if kind in ("memory", "disk") else "memory"
+
+
+_BACKENDS: dict[str, StorageBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_backend(key: str, root: pathlib.Path) -> StorageBackend:
+    """Return the backend for a session key, creating it on first use."""
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            backend = _BACKENDS[key] = MemoryBackend() if storage_kind() == "memory" else DiskBackend(root)
+        return backend
+
+
+def drop_backend(key: str) -> None:
+    with _BACKENDS_LOCK:
+        _BACKENDS.pop(key, None)
+
+
+def drop_idle_backends(max_idle_seconds: float) -> int:
+    """Forget in-memory backends not touched for max_idle_seconds. Returns how many were dropped."""
+    cutoff = time.time() - max_idle_seconds
+    with _BACKENDS_LOCK:
+        stale = [k for k, b in _BACKENDS.items() if b.last_access < cutoff]
+        for k in stale:
+            del _BACKENDS[k]
+    return len(stale)
+
+
+def remove_tree(root: pathlib.Path) -> None:
+    if root.exists():
+        shutil.rmtree(root)
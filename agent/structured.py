@@ -0,0 +1,297 @@
+import json
+import os
+import re
+from typing import Any, Optional, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from .llm_cache import bypass_llm_cache
+from .prompts import structured_repair_prompt
+from .tracing import annotate, metrics, record_usage
+
+T = TypeVar("T", bound=BaseModel)
+
+_FENCE = re.compile(r"```[A-Za-z]*[ \t]*\n?([\s\S]*?)(?:```|$)")
+_PARTIAL_LITERAL = re.compile(r"([\[:,]\s*)([A-Za-z]+|-?\d*\.?\d*[eE]?[-+]?)$")
+_DANGLING_KEY = re.compile(r'([{,]\s*)"(?:[^"\\]|\\.)*"\s*$')
+
+
+class StructuredOutputError(ValueError):
+    """The model's reply could not be turned into the requested schema, even after a re-ask."""
+
+
+def structured_output_mode() -> str:
+    """"native" (default): use the model's structured-output support when it has one; "json": prompt and parse only."""
+    mode = os.getenv("SOLACE_STRUCTURED_OUTPUT", "native").lower()
+    return mode if mode in ("native", "json") else "native"
+
+
+def repair_json(text: str) -> str:
+    """Best-effort fix-up of a model's JSON reply.
+
+    Scans the first top-level object or array character by character, so
+    prose before or after it is dropped. Code fences, trailing commas,
+    mismatched closers and truncation (open strings, dangling keys,
+    half-written literals, unclosed brackets) are repaired.
+    """
+    fenced = _FENCE.search(text)
+    if fenced and re.search(r"[{\[]", fenced.group(1)):
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text.strip()
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_str = escaped = False
+    for ch in text[min(starts):]:
+        if in_str:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+            elif ch == "\n":
+                # raw newline inside a string is invalid JSON; keep it escaped
+                out[-1] = "\\n"
+            continue
+        if ch == '"':
+            in_str = True
+            out.append(ch)
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            if not stack or ch != stack[-1]:
+                continue
+            _drop_trailing_comma(out)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out)
+        else:
+            out.append(ch)
+
+    # truncated reply: finish the open string/value and close every bracket
+    if in_str:
+        if escaped:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out).rstrip()
+    m = _PARTIAL_LITERAL.search(repaired)
+    if m and m.group(2) and m.group(2) not in ("true", "false", "null"):
+        token = m.group(2)
+        # a cut-off number keeps its complete digits; a cut-off word becomes null
+        number = "" if token[0].isalpha() else token.rstrip(".eE+-")
+        repaired = repaired[: m.start(2)] + (number if number.lstrip("-") else "null")
+    if stack and stack[-1] == "}" and _DANGLING_KEY.search(repaired):
+        repaired += ": null"
+    repaired = repaired.rstrip()
+    if repaired.endswith(":"):
+        repaired += " null"
+    out = list(repaired)
+    for closer in reversed(stack):
+        _drop_trailing_comma(out)
+        out.append(closer)
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: list[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse_json_lenient(text: str) -> tuple[Any, bool]:
+    """Parse JSON from a model reply; returns (value, repaired). Raises ValueError if even the repair fails."""
+    try:
+        return json.loads(text.strip()), False
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text)), True
+
+
+def _drop_failed_last_item(data: Any, error: ValidationError) -> bool:
+    # a truncated array usually ends in a half-written item: drop it if that's what failed
+    for err in error.errors():
+        container = data
+        for key in err["loc"]:
+            if isinstance(container, list) and isinstance(key, int):
+                if key == len(container) - 1:
+                    container.pop()
+                    return True
+                break
+            try:
+                container = container[key]
+            except (KeyError, IndexError, TypeError):
+                break
+    return False
+
+
+def parse_structured(text: str, schema: type[T]) -> tuple[T, str]:
+    """Parse and validate a reply against schema; returns (instance, outcome).
+
+    The outcome is "clean", "repaired" (the JSON needed fixing up), or
+    "truncated" (the reply was cut off and its half-written last list
+    items were dropped, so the instance is missing them).
+    """
+    data, repaired = parse_json_lenient(text)
+    dropped = 0
+    while True:
+        try:
+            result = schema.model_validate(data)
+        except ValidationError as e:
+            if not repaired or not _drop_failed_last_item(data, e):
+                raise
+            dropped += 1
+            continue
+        if dropped:
+            metrics.incr("structured.dropped_items", dropped, schema=schema.__name__)
+            annotate(dropped_items=dropped)
+            return result, "truncated"
+        return result, "repaired" if repaired else "clean"
+
+
+class StreamingArrayParser:
+    """Picks complete items out of one array of a JSON reply while the reply is still streaming.
+
+    feed() takes the next piece of text and returns the items of the array
+    under `key` (a key of the top-level object) whose closing bracket
+    arrived in it, parsed as JSON. Text before the object (prose, a code
+    fence) is skipped. Items are returned once, in order; an item that is
+    not valid JSON is returned as None so positions stay aligned.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_str = self._escaped = False
+        self._str_start = -1
+        self._last_str: Optional[str] = None
+        self._key: Optional[str] = None
+        self._array_depth = 0
+        self._item_start = -1
+        self._done = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        self.text += chunk
+        items: list[Any] = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_str:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_str = False
+                    self._last_str = text[self._str_start:i]
+                continue
+            if self._done or (not self._stack and ch != "{"):
+                continue
+            if ch == '"':
+                self._in_str = True
+                self._str_start = i + 1
+            elif ch == ":" and len(self._stack) == 1:
+                self._key = self._last_str
+            elif ch == "," and len(self._stack) == 1:
+                self._key = None
+            elif ch in "{[":
+                if ch == "[" and len(self._stack) == 1 and self._key == self.key and not self._array_depth:
+                    self._array_depth = 2
+                elif ch == "{" and self._array_depth and len(self._stack) == self._array_depth:
+                    self._item_start = i
+                self._stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if not self._stack or ch != self._stack[-1]:
+                    continue
+                self._stack.pop()
+                if self._array_depth and len(self._stack) == self._array_depth and ch == "}" and self._item_start >= 0:
+                    try:
+                        items.append(json.loads(text[self._item_start:i + 1]))
+                    except json.JSONDecodeError:
+                        items.append(None)
+                    self._item_start = -1
+                elif self._array_depth and len(self._stack) < self._array_depth:
+                    # the array closed; later keys don't matter
+                    self._done = True
+        self._pos = len(text)
+        return items
+
+
+def message_text(msg: Any) -> str:
+    tool_calls = getattr(msg, "tool_calls", None)
+    if tool_calls:
+        return json.dumps(tool_calls[0].get("args", {}))
+    content = getattr(msg, "content", msg)
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return str(content)
+
+
+def _native(model, prompt: str, schema: type[T]) -> tuple[Optional[T], Any]:
+    # (parsed instance or None, raw message or None) from the model's own structured output
+    try:
+        runnable = model.with_structured_output(schema, include_raw=True)
+    except (NotImplementedError, ValueError, TypeError):
+        return None, None
+    out = runnable.invoke(prompt)
+    raw = out.get("raw")
+    record_usage(raw)
+    parsed = out.get("parsed")
+    if parsed is not None:
+        try:
+            return (parsed if isinstance(parsed, schema) else schema.model_validate(parsed)), raw
+        except ValidationError:
+            pass
+    return None, raw
+
+
+def invoke_structured(model, prompt: str, schema: type[T], max_reasks: int = 1) -> T:
+    """Ask the model for an instance of schema with as few model calls as possible.
+
+    Uses the model's native structured output where available, otherwise
+    parses the plain reply, repairing it locally if needed. Only when that
+    fails is the model re-asked, with just the error and its previous reply.
+    """
+    name = schema.__name__
+    raw = None
+    if structured_output_mode() == "native":
+        result, raw = _native(model, prompt, schema)
+        if result is not None:
+            metrics.incr("structured.outputs", schema=name, outcome="native")
+            return result
+    if raw is None:
+        raw = model.invoke(prompt)
+        record_usage(raw)
+    return parse_or_reask(model, message_text(raw), schema, max_reasks)
+
+
+def parse_or_reask(model, text: str, schema: type[T], max_reasks: int = 1) -> T:
+    """Parse a reply already received (e.g. streamed) into schema, re-asking the model only if that fails."""
+    name = schema.__name__
+    error: Exception = ValueError("empty reply")
+    for attempt in range(max_reasks + 1):
+        try:
+            result, outcome = parse_structured(text, schema)
+        except ValueError as e:
+            # json.JSONDecodeError and pydantic's ValidationError are both ValueErrors
+            error = e
+        else:
+            if attempt and outcome != "truncated":
+                outcome = "reask"
+            metrics.incr("structured.outputs", schema=name, outcome=outcome)
+            return result
+        if attempt < max_reasks:
+            # the repair prompt is deterministic: a cached reply would just replay the same failure
+            with bypass_llm_cache():
+                reply = model.invoke(structured_repair_prompt(name, str(error)[:1500], text))
+            record_usage(reply)
+            text = message_text(reply)
+    metrics.incr("structured.outputs", schema=name, outcome="failed")
+    raise StructuredOutputError(f"{name}: {error}") from error
@@ -0,0 +1,291 @@
+import ast
+import hashlib
+import os
+import re
+import threading
+import weakref
+from html.parser import HTMLParser
+from typing import Iterable, Optional
+
+from .file_index import file_index
+from .storage import StorageBackend
+
+# Entries kept per kind of symbol before the rest is summarized as "+N more"
+MAX_ITEMS = 24
+# Files larger than this are listed by name only
+MAX_PARSE_BYTES = 400_000
+
+_JS_EXTS = (".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx")
+_HTML_EXTS = (".html", ".htm")
+_CSS_EXTS = (".css", ".scss")
+
+
+def interface_summary_chars() -> int:
+    """Budget for the project interface summary given to each coder step; 0 turns it off (SOLACE_CODER_INTERFACE_CHARS)."""
+    try:
+        return max(0, int(os.getenv("SOLACE_CODER_INTERFACE_CHARS", "3000")))
+    except ValueError:
+        return 3000
+
+
+def _params(raw: str) -> str:
+    return ", ".join(p.strip().split("=")[0].strip() for p in raw.split(",") if p.strip())
+
+
+def _add(symbols: dict[str, list[str]], kind: str, item: str) -> None:
+    items = symbols.setdefault(kind, [])
+    if item and item not in items:
+        items.append(item)
+
+
+def _python_symbols(content: str) -> dict[str, list[str]]:
+    symbols: dict[str, list[str]] = {}
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        for m in re.finditer(r"^(?:async\s+)?(def|class)\s+([A-Za-z]\w*)", content, re.M):
+            _add(symbols, "classes" if m.group(1) == "class" else "functions", m.group(2))
+        return symbols
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            _add(symbols, "functions", f"{node.name}({', '.join(a.arg for a in node.args.args)})")
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            methods = [n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                       and (not n.name.startswith("_") or n.name == "__init__")]
+            _add(symbols, "classes", f"{node.name}[{', '.join(methods)}]" if methods else node.name)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id.isupper():
+                    _add(symbols, "constants", target.id)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                _add(symbols, "imports", alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            _add(symbols, "imports", "." * node.level + (node.module or ""))
+    return symbols
+
+
+_JS_EXPORT_FN = re.compile(r"^[ \t]*export\s+(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)?\s*\(([^)]*)\)", re.M)
+_JS_EXPORT_CLASS = re.compile(r"^[ \t]*export\s+(?:default\s+)?class\s+([A-Za-z_$][\w$]*)", re.M)
+_JS_EXPORT_VAR = re.compile(r"^[ \t]*export\s+(?:const|let|var)\s+([A-Za-z_$][\w$]*)", re.M)
+_JS_EXPORT_LIST = re.compile(r"^[ \t]*export\s*\{([^}]*)\}", re.M)
+_JS_MODULE_EXPORTS = re.compile(r"^[ \t]*module\.exports\s*=\s*\{([^}]*)\}", re.M)
+_JS_NAMED_EXPORT = re.compile(r"^[ \t]*(?:module\.)?exports\.([A-Za-z_$][\w$]*)\s*=", re.M)
+_JS_FUNCTION = re.compile(r"^(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(([^)]*)\)", re.M)
+_JS_ARROW = re.compile(r"^(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:\(([^)]*)\)|([A-Za-z_$][\w$]*))\s*=>", re.M)
+_JS_CLASS = re.compile(r"^class\s+([A-Za-z_$][\w$]*)", re.M)
+_JS_IMPORT = re.compile(r"""^[ \t]*import\s+(?:[^'";]*?\s+from\s+)?['"]([^'"]+)['"]|\brequire\(\s*['"]([^'"]+)['"]\s*\)""", re.M)
+_JS_DOM = re.compile(r"""\b(?:getElementById|querySelector(?:All)?)\(\s*['"]([^'"]+)['"]\s*\)""")
+
+
+def _js_symbols(content: str) -> dict[str, list[str]]:
+    symbols: dict[str, list[str]] = {}
+    for m in _JS_EXPORT_FN.finditer(content):
+        _add(symbols, "exports", f"{m.group(1) or 'default'}({_params(m.group(2))})")
+    for pattern in (_JS_EXPORT_CLASS, _JS_EXPORT_VAR, _JS_NAMED_EXPORT):
+        for m in pattern.finditer(content):
+            _add(symbols, "exports", m.group(1))
+    for pattern in (_JS_EXPORT_LIST, _JS_MODULE_EXPORTS):
+        for m in pattern.finditer(content):
+            for name in m.group(1).split(","):
+                _add(symbols, "exports", name.split(":")[0].strip().split(" as ")[-1].strip())
+    exported = {e.split("(")[0] for e in symbols.get("exports", [])}
+    for m in _JS_FUNCTION.finditer(content):
+        if m.group(1) not in exported:
+            _add(symbols, "functions", f"{m.group(1)}({_params(m.group(2))})")
+    for m in _JS_ARROW.finditer(content):
+        if m.group(1) not in exported:
+            _add(symbols, "functions", f"{m.group(1)}({_params(m.group(2) or m.group(3) or '')})")
+    for m in _JS_CLASS.finditer(content):
+        if m.group(1) not in exported:
+            _add(symbols, "classes", m.group(1))
+    for m in _JS_IMPORT.finditer(content):
+        _add(symbols, "imports", m.group(1) or m.group(2))
+    for m in _JS_DOM.finditer(content):
+        selector = m.group(1)
+        _add(symbols, "uses", selector if m.group(0).startswith("querySelector") else f"#{selector}")
+    return symbols
+
+
+class _HTMLSymbols(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.symbols: dict[str, list[str]] = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get("id"):
+            _add(self.symbols, "ids", f"{tag}#{attrs['id']}")
+        for cls in (attrs.get("class") or "").split():
+            _add(self.symbols, "classes", f".{cls}")
+        if tag == "script" and attrs.get("src"):
+            _add(self.symbols, "imports", attrs["src"])
+        elif tag == "link" and attrs.get("href") and "stylesheet" in (attrs.get("rel") or ""):
+            _add(self.symbols, "imports", attrs["href"])
+        elif tag in ("input", "select", "textarea", "button", "form") and attrs.get("name"):
+            _add(self.symbols, "names", attrs["name"])
+
+
+def _html_symbols(content: str) -> dict[str, list[str]]:
+    parser = _HTMLSymbols()
+    try:
+        parser.feed(content)
+        parser.close()
+    except Exception:
+        # html.parser is lenient; keep whatever it collected before giving up
+        pass
+    return parser.symbols
+
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_RULE = re.compile(r"([^{};]+)\{")
+_CSS_VAR = re.compile(r"(--[\w-]+)\s*:")
+_CSS_KEYFRAME = re.compile(r"(?:from|to|[\d.]+%)")
+_CSS_IMPORT = re.compile(r"""@import\s+(?:url\()?\s*['"]?([^'")\s;]+)""")
+
+
+def _css_symbols(content: str) -> dict[str, list[str]]:
+    symbols: dict[str, list[str]] = {}
+    content = _CSS_COMMENT.sub("", content)
+    for m in _CSS_RULE.finditer(content):
+        head = " ".join(m.group(1).split())
+        if head.startswith("@"):
+            if head.startswith(("@media", "@supports", "@container", "@layer")):
+                continue
+            _add(symbols, "at-rules", head)
+            continue
+        for selector in head.split(","):
+            selector = selector.strip()
+            if not _CSS_KEYFRAME.fullmatch(selector):
+                _add(symbols, "selectors", selector)
+    for m in _CSS_VAR.finditer(content):
+        _add(symbols, "vars", m.group(1))
+    for m in _CSS_IMPORT.finditer(content):
+        _add(symbols, "imports", m.group(1))
+    return symbols
+
+
+def extract_symbols(path: str, content: str) -> dict[str, list[str]]:
+    """The interface of one file as {kind: [names]}: functions, classes, exports, element ids, selectors, imports.
+
+    Python is parsed with ast; JS/TS with regular expressions over the
+    source, HTML with html.parser and CSS from its rule heads. Other files
+    (and files too large to parse) have no symbols.
+    """
+    if len(content) > MAX_PARSE_BYTES:
+        return {}
+    lower = path.lower()
+    if lower.endswith(".py"):
+        return _python_symbols(content)
+    if lower.endswith(_JS_EXTS):
+        return _js_symbols(content)
+    if lower.endswith(_HTML_EXTS):
+        return _html_symbols(content)
+    if lower.endswith(_CSS_EXTS):
+        return _css_symbols(content)
+    return {}
+
+
+def _render(path: str, symbols: dict[str, list[str]]) -> str:
+    parts = []
+    for kind, items in symbols.items():
+        shown = ", ".join(items[:MAX_ITEMS])
+        if len(items) > MAX_ITEMS:
+            shown += f", +{len(items) - MAX_ITEMS} more"
+        parts.append(f"{kind}: {shown}")
+    return f"{path} - " + "; ".join(parts) if parts else path
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class SymbolIndex:
+    """Rendered symbol lines of a session's project files, one per file.
+
+    It listens to the backend and re-parses each file as it is written, so
+    a summary built after a coder step never re-parses the files it
+    touched. Each line is keyed on the digest of the content it was built
+    from, so a file changed behind the backend's back (a command on disk
+    storage) is rebuilt on the next summary.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._lines: dict[str, tuple[str, str]] = {}
+        storage.add_listener(self._on_change)
+
+    def _on_change(self, path: str, deleted: bool) -> None:
+        if deleted:
+            self.remove(path)
+        else:
+            self.line(path)
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._lines.pop(path, None)
+
+    def line(self, path: str) -> Optional[str]:
+        """The summary line of one file, or None if it does not exist."""
+        data = self.storage.read(path)
+        if data is None:
+            self.remove(path)
+            return None
+        digest = _digest(data)
+        with self._lock:
+            cached = self._lines.get(path)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        try:
+            symbols = extract_symbols(path, data.decode("utf-8"))
+        except UnicodeDecodeError:
+            symbols = {}
+        line = _render(path, symbols)
+        with self._lock:
+            self._lines[path] = (digest, line)
+        return line
+
+    def summary(self, exclude: Iterable[str] = (), first: Iterable[str] = (), max_chars: Optional[int] = None) -> str:
+        """One line per project file except `exclude`, files in `first` leading, cut to max_chars.
+
+        Files that do not fit are named in a closing "... N more files" line.
+        """
+        max_chars = interface_summary_chars() if max_chars is None else max_chars
+        files = file_index(self.storage).files()
+        with self._lock:
+            for stale in set(self._lines) - set(files):
+                del self._lines[stale]
+        skip = set(exclude)
+        present = set(files)
+        leading = [p for p in dict.fromkeys(first) if p in present and p not in skip]
+        skip.update(leading)
+        order = leading + [p for p in files if p not in skip]
+        lines, used = [], 0
+        for n, path in enumerate(order):
+            line = self.line(path)
+            if line is None:
+                continue
+            if used + len(line) + 1 > max_chars:
+                rest = order[n:]
+                lines.append(f"... {len(rest)} more files: {', '.join(rest[:MAX_ITEMS])}")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+
+# as in file_index: the backend keeps its index alive through the listener
+_INDEXES: "weakref.WeakKeyDictionary[StorageBackend, weakref.ref]" = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def symbol_index(storage: StorageBackend) -> SymbolIndex:
+    """The symbol index of a storage backend; it lives and dies with the backend."""
+    with _INDEXES_LOCK:
+        ref = _INDEXES.get(storage)
+        index = ref() if ref is not None else None
+        if index is None:
+            index = SymbolIndex(storage)
+            _INDEXES[storage] = weakref.ref(index)
+        return index
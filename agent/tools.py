@@ -1,28 +1,64 @@
+import contextvars
 import pathlib
-import subprocess
-from typing import Tuple, Optional
+from contextlib import contextmanager
+from typing import Callable, Tuple, Optional
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
+
+from .file_index import file_index, page
+from .runner import close_idle_runners, close_runner, get_runner, run_subprocess, runner_kind
+from .states import FileEdit
+from .tracing import traced
+from .storage import StorageBackend, drop_backend, drop_idle_backends, get_backend, normalize_path, remove_tree, storage_kind
 import os
 import shutil
+import threading
 import time
 
-DEFAULT_SESSION_ID: Optional[str] = None
+# Session that tool calls route to when no explicit session_id is given; bound per thread/task via session_scope
+_CURRENT_SESSION: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("solace_session_id", default=None)
+
+# One lock per resolved file path so concurrent coder steps never interleave writes to the same file
+_FILE_LOCKS: dict[pathlib.Path, threading.Lock] = {}
+_FILE_LOCKS_GUARD = threading.Lock()
+
+# Callback notified with (relative path, content) after every write_file in the current context
+_WRITE_OBSERVER: contextvars.ContextVar[Optional[Callable[[str, str], None]]] = contextvars.ContextVar("solace_write_observer", default=None)
+
+
+@contextmanager
+def session_scope(session_id: Optional[str]):
+    """Route tool calls made in this context (and threads/tasks spawned from it) to session_id.
+
+    Unlike a process-wide default, the binding is a contextvar, so concurrent
+    generations in other threads or asyncio tasks keep their own session.
+    """
+    token = _CURRENT_SESSION.set(session_id)
+    try:
+        yield
+    finally:
+        _CURRENT_SESSION.reset(token)
 
 
-def set_default_session_id(session_id: Optional[str]) -> None:
-    """Set a module-level default session id used when tools are called without session_id."""
-    global DEFAULT_SESSION_ID
-    DEFAULT_SESSION_ID = session_id
+def current_session_id() -> Optional[str]:
+    return _CURRENT_SESSION.get()
 
 
 def get_project_root(session_id: Optional[str] = None) -> pathlib.Path:
-    sid = session_id or DEFAULT_SESSION_ID
+    sid = session_id or _CURRENT_SESSION.get()
     if sid:
         return pathlib.Path(f"/tmp/solace/sessions/{sid}")
     return pathlib.Path.cwd() / "generated_project"
 
 PROJECT_ROOT = get_project_root()  # DEPRECATED: always use get_project_root in new code
 
+
+def session_from_config(session_id: Optional[str], config: Optional[RunnableConfig]) -> Optional[str]:
+    """Pick the session for a tool call: explicit argument first, then the invocation's configurable."""
+    if session_id:
+        return session_id
+    return ((config or {}).get("configurable") or {}).get("session_id")
+
 def safe_path_for_project(path: str, session_id: Optional[str] = None) -> pathlib.Path:
     project_root = get_project_root(session_id)
     p = (project_root / path).resolve()
@@ -30,71 +66,248 @@ def safe_path_for_project(path: str, session_id: Optional[str] = None) -> pathli
         raise ValueError("Attempt to write outside project root")
     return p
 
+
+@contextmanager
+def observe_writes(callback: Callable[[str, str], None]):
+    """Call callback(path, content) after each write_file made within this block (including from agent tool calls)."""
+    token = _WRITE_OBSERVER.set(callback)
+    try:
+        yield
+    finally:
+        _WRITE_OBSERVER.reset(token)
+
+
+def file_lock(p: pathlib.Path) -> threading.Lock:
+    """Return the lock that serializes reads and writes of a single project file."""
+    with _FILE_LOCKS_GUARD:
+        lock = _FILE_LOCKS.get(p)
+        if lock is None:
+            lock = _FILE_LOCKS[p] = threading.Lock()
+        return lock
+
+
+def get_storage(session_id: Optional[str] = None) -> StorageBackend:
+    """Storage backend holding a session's files (in memory unless SOLACE_STORAGE=disk)."""
+    sid = session_id or _CURRENT_SESSION.get()
+    return get_backend(sid or "", get_project_root(sid))
+
+
+def _project_path(path: str, session_id: Optional[str]) -> Tuple[str, pathlib.Path]:
+    # validated project-relative path plus its on-disk location (used for locking and messages)
+    p = safe_path_for_project(path, session_id)
+    rel = p.relative_to(get_project_root(session_id).resolve()).as_posix()
+    return normalize_path(rel), p
+
+
+def _notify_write(rel: str, content: str) -> None:
+    observer = _WRITE_OBSERVER.get()
+    if observer is not None:
+        try:
+            observer(rel, content)
+        except Exception:
+            # observers are best-effort (progress UI); never fail the write
+            pass
+
+
+def apply_edits(content: str, edits: list) -> str:
+    """Apply search/replace edits in order and return the new content.
+
+    Every search text must occur exactly once in the content as it stands
+    when that edit is applied; otherwise ValueError is raised and nothing is
+    applied.
+    """
+    for n, edit in enumerate(edits, 1):
+        if isinstance(edit, dict):
+            edit = FileEdit.model_validate(edit)
+        if not edit.search:
+            raise ValueError(f"edit {n}: search text is empty")
+        count = content.count(edit.search)
+        if count != 1:
+            where = "not found" if count == 0 else f"found {count} times; include more surrounding lines"
+            raise ValueError(f"edit {n}: search text {where}")
+        content = content.replace(edit.search, edit.replace, 1)
+    return content
+
+
 @tool
-def write_file(path: str, content: str, session_id: Optional[str] = None) -> str:
+@traced("write_file", "tool")
+def write_file(path: str, content: str, session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
     """Writes content to a file at the specified path within the project root (per session)."""
-    p = safe_path_for_project(path, session_id)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with open(p, "w", encoding="utf-8") as f:
-        f.write(content)
+    session_id = session_from_config(session_id, config)
+    rel, p = _project_path(path, session_id)
+    storage = get_storage(session_id)
+    with file_lock(p):
+        storage.write(rel, content.encode("utf-8"))
+    _notify_write(rel, content)
     return f"WROTE:{p}"
 
 @tool
-def read_file(path: str, session_id: Optional[str] = None) -> str:
+@traced("edit_file", "tool")
+def edit_file(path: str, edits: list[FileEdit], session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
+    """Applies search/replace edits to an existing file instead of rewriting it.
+
+    Each edit replaces one exact occurrence of `search` with `replace`. All
+    edits are validated first and applied together; if any search text is
+    missing or ambiguous, the file is left unchanged and an error is returned.
+    """
+    session_id = session_from_config(session_id, config)
+    rel, p = _project_path(path, session_id)
+    storage = get_storage(session_id)
+    with file_lock(p):
+        data = storage.read(rel)
+        if data is None:
+            return f"ERROR: {path} does not exist; use write_file to create it"
+        try:
+            content = apply_edits(data.decode("utf-8"), edits)
+        except (ValueError, UnicodeDecodeError) as e:
+            return f"ERROR: no changes applied to {path}: {e}"
+        storage.write(rel, content.encode("utf-8"))
+    _notify_write(rel, content)
+    return f"EDITED:{p} ({len(edits)} edits)"
+
+@tool
+@traced("read_file", "tool")
+def read_file(path: str, session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
     """Reads content from a file at the specified path within the project root (per session)."""
-    p = safe_path_for_project(path, session_id)
-    if not p.exists():
+    session_id = session_from_config(session_id, config)
+    rel, p = _project_path(path, session_id)
+    with file_lock(p):
+        data = get_storage(session_id).read(rel)
+    if data is None:
         return ""
-    with open(p, "r", encoding="utf-8") as f:
-        return f.read()
+    return data.decode("utf-8", errors="replace")
 
 @tool
-def get_current_directory(session_id: Optional[str] = None) -> str:
+@traced("get_current_directory", "tool")
+def get_current_directory(session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
     """Returns the current working directory (project root)."""
-    return str(get_project_root(session_id))
+    return str(get_project_root(session_from_config(session_id, config)))
 
 @tool
-def list_files(directory: str = ".", session_id: Optional[str] = None) -> str:
-    """Lists all files in the specified directory within the project root (per session)."""
-    p = safe_path_for_project(directory, session_id)
-    project_root = get_project_root(session_id)
-    if not p.is_dir():
+@traced("list_files", "tool")
+def list_files(directory: str = ".", offset: int = 0, limit: int = 200, depth: Optional[int] = None,
+               session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
+    """Lists files in the specified directory within the project root (per session).
+
+    Dependency, build and VCS folders (node_modules, dist, .git, ...) and
+    anything in the project's .gitignore are left out. At most `limit`
+    entries are returned starting at `offset`; with `depth`, folders deeper
+    than that many levels are summarized as "dir/ (N files)".
+    """
+    session_id = session_from_config(session_id, config)
+    rel, p = _project_path(directory, session_id)
+    index = file_index(get_storage(session_id))
+    if rel and index.rules().ignored(rel, True):
+        return f"ERROR: {rel} is excluded from listings (.gitignore or built-in ignore rules)"
+    if not index.is_dir(rel):
         return f"ERROR: {p} is not a directory"
-    files = [str(f.relative_to(project_root)) for f in p.glob("**/*") if f.is_file()]
-    return "\n".join(files) if files else "No files found."
+    return page(index.entries(rel, depth), offset, limit)
+
+@tool
+@traced("print_tree", "tool")
+def print_tree(path: str = "", depth: int = 2, session_id: Optional[str] = None, config: RunnableConfig = None) -> str:
+    """Prints a tree of files under the project root (per session).
+
+    Args:
+        path: Subdirectory relative to the project root to list. Defaults to root.
+        depth: Max depth of recursion. Defaults to 2; deeper folders show as "name/ (N files)".
+    """
+    session_id = session_from_config(session_id, config)
+    index = file_index(get_storage(session_id))
+    rel, base = _project_path(path, session_id) if path else ("", get_project_root(session_id))
+    if rel in index.files():
+        return rel
+    if not index.is_dir(rel):
+        return f"Path not found: {base}" if rel else "(empty)"
+
+    # folders at `depth` are not expanded; they only carry the number of files below them
+    tree: dict = {}
+    for f in index.entries(rel):
+        parts = (f[len(rel) + 1:] if rel else f).split("/")
+        node = tree
+        for level, part in enumerate(parts[:-1]):
+            if level >= depth:
+                node[part] = (node.get(part) or 0) + 1
+                break
+            node = node.setdefault(part, {})
+        else:
+            node.setdefault(parts[-1], None)
+    lines: list[str] = []
+
+    def walk(node: dict, parent: str, level: int):
+        for name, child in sorted(node.items(), key=lambda kv: (kv[1] is None, kv[0].lower())):
+            entry = f"{parent}/{name}" if parent else name
+            prefix = "  " * level + ("- " if level else "")
+            if child is None:
+                lines.append(f"{prefix}{entry}")
+            elif isinstance(child, int):
+                lines.append(f"{prefix}{entry}/ ({child} file{'' if child == 1 else 's'})")
+            else:
+                lines.append(f"{prefix}{entry}/")
+                walk(child, entry, level + 1)
+
+    walk(tree, rel, 0)
+    if len(lines) > 500:
+        lines = lines[:500] + [f"... {len(lines) - 500} more lines; use a smaller depth or a subdirectory"]
+    return "\n".join(lines) if lines else "(empty)"
 
 @tool
-def run_cmd(cmd: str, cwd: str = None, timeout: int = 30, session_id: Optional[str] = None) -> Tuple[int, str, str]:
-    """Runs a shell command in the specified directory and returns the result."""
+@traced("run_cmd", "tool")
+def run_cmd(cmd: str, cwd: str = None, timeout: int = 30, session_id: Optional[str] = None, config: RunnableConfig = None) -> Tuple[int, str, str]:
+    """Runs a shell command in the specified directory and returns (exit code, stdout, stderr).
+
+    Long output is cut to its beginning and end. A command still running
+    after `timeout` seconds is killed with everything it started (exit code 124).
+    """
+    session_id = session_from_config(session_id, config)
     cwd_dir = safe_path_for_project(cwd if cwd else ".", session_id)
-    res = subprocess.run(cmd, shell=True, cwd=str(cwd_dir), capture_output=True, text=True, timeout=timeout)
-    return res.returncode, res.stdout, res.stderr
+    root = get_project_root(session_id)
+    storage = get_storage(session_id)
+    # the command needs real files: mirror the session to disk first, then pick up whatever it changed
+    storage.sync_to_disk(root)
+    try:
+        if runner_kind() == "shell":
+            result = get_runner(session_id or "", root).run(cmd, cwd_dir, timeout)
+        else:
+            result = run_subprocess(cmd, cwd_dir, timeout)
+    finally:
+        storage.sync_from_disk(root)
+        file_index(storage).after_command()
+    return result
 
 def init_project_root(session_id: Optional[str] = None):
     root = get_project_root(session_id)
-    root.mkdir(parents=True, exist_ok=True)
+    get_storage(session_id)
+    if storage_kind() == "disk":
+        root.mkdir(parents=True, exist_ok=True)
     return root
 
 
 def delete_session_root(session_id: str) -> bool:
-    """Delete the entire session root directory tree safely. Returns True on success."""
+    """Delete the session's files (in memory and any on-disk mirror). Returns True on success."""
     root = get_project_root(session_id)
+    close_runner(session_id)
+    drop_backend(session_id)
+    with _FILE_LOCKS_GUARD:
+        resolved = root.resolve()
+        for p in [p for p in _FILE_LOCKS if resolved in p.parents]:
+            _FILE_LOCKS.pop(p, None)
     try:
-        if root.exists():
-            shutil.rmtree(root)
+        remove_tree(root)
         return True
     except Exception:
         return False
 
 
 def cleanup_stale_sessions(max_age_hours: int = 6) -> int:
-    """Remove session directories older than max_age_hours. Returns number of deletions."""
+    """Remove sessions idle for more than max_age_hours (memory and disk). Returns number of deletions."""
+    close_idle_runners(max_age_hours * 3600)
+    count = drop_idle_backends(max_age_hours * 3600)
     base = pathlib.Path("/tmp/solace/sessions")
     if not base.exists():
-        return 0
+        return count
     now = time.time()
     cutoff = now - max_age_hours * 3600
-    count = 0
     for entry in base.iterdir():
         try:
             if not entry.is_dir():
@@ -111,67 +324,49 @@ def cleanup_stale_sessions(max_age_hours: int = 6) -> int:
 # --- Compatibility aliases for models that expect repo_browser.* tools ---
 
 @tool("repo_browser.write_file")
-def repo_browser_write_file(path: str, content: str) -> str:
+@traced("repo_browser.write_file", "tool")
+def repo_browser_write_file(path: str, content: str, config: RunnableConfig = None) -> str:
     """Compatibility alias that writes a file inside the generated project root."""
-    return write_file.run(path, content)
+    return write_file.invoke({"path": path, "content": content}, config)
 
 
 @tool("repo_browser.read_file")
-def repo_browser_read_file(path: str) -> str:
+@traced("repo_browser.read_file", "tool")
+def repo_browser_read_file(path: str, config: RunnableConfig = None) -> str:
     """Compatibility alias that reads a file from the generated project root."""
-    return read_file.run(path)
+    return read_file.invoke({"path": path}, config)
 
 
 @tool("repo_browser.open_file")
-def repo_browser_open_file(path: str) -> str:
+@traced("repo_browser.open_file", "tool")
+def repo_browser_open_file(path: str, config: RunnableConfig = None) -> str:
     """Compatibility alias for models that call open_file instead of read_file."""
-    return read_file.run(path)
+    return read_file.invoke({"path": path}, config)
 
 
 @tool("repo_browser.list_files")
-def repo_browser_list_files(directory: str = ".") -> str:
+@traced("repo_browser.list_files", "tool")
+def repo_browser_list_files(directory: str = ".", config: RunnableConfig = None) -> str:
     """Compatibility alias that lists files relative to the generated project root."""
-    return list_files.run(directory)
+    return list_files.invoke({"directory": directory}, config)
 
 
 @tool("repo_browser.get_current_directory")
-def repo_browser_get_current_directory() -> str:
+@traced("repo_browser.get_current_directory", "tool")
+def repo_browser_get_current_directory(config: RunnableConfig = None) -> str:
     """Compatibility alias that returns the generated project root path."""
-    return get_current_directory.run()
+    return get_current_directory.invoke({}, config)
 
 
 @tool("repo_browser.run_cmd")
-def repo_browser_run_cmd(cmd: str, cwd: str = None, timeout: int = 30) -> Tuple[int, str, str]:
+@traced("repo_browser.run_cmd", "tool")
+def repo_browser_run_cmd(cmd: str, cwd: str = None, timeout: int = 30, config: RunnableConfig = None) -> Tuple[int, str, str]:
     """Compatibility alias that runs a command within the generated project root."""
-    return run_cmd.run(cmd, cwd, timeout)
+    return run_cmd.invoke({"cmd": cmd, "cwd": cwd, "timeout": timeout}, config)
 
 
 @tool("repo_browser.print_tree")
-def repo_browser_print_tree(path: str = "", depth: int = 2) -> str:
-    """Compatibility alias that prints a tree of files under the generated project root.
-
-    Args:
-        path: Subdirectory relative to the project root to list. Defaults to root.
-        depth: Max depth of recursion. Defaults to 2.
-    """
-    base = safe_path_for_project(path) if path else PROJECT_ROOT
-    if not base.exists():
-        return f"Path not found: {base}"
-    lines: list[str] = []
-
-    def walk(p: pathlib.Path, level: int):
-        if level > depth:
-            return
-        try:
-            entries = sorted(p.iterdir(), key=lambda x: (x.is_file(), x.name.lower()))
-        except Exception:
-            return
-        for e in entries:
-            rel = e.relative_to(PROJECT_ROOT)
-            prefix = "  " * level + ("- " if level else "")
-            lines.append(f"{prefix}{rel}/" if e.is_dir() else f"{prefix}{rel}")
-            if e.is_dir():
-                walk(e, level + 1)
-
-    walk(base, 0)
-    return "\n".join(lines) if lines else "(empty)"
\ No newline at end of file
+@traced("repo_browser.print_tree", "tool")
+def repo_browser_print_tree(path: str = "", depth: int = 2, config: RunnableConfig = None) -> str:
+    """Compatibility alias that prints a tree of files under the generated project root."""
+    return print_tree.invoke({"path": path, "depth": depth}, config)
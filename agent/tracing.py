@@ -0,0 +1,211 @@
+import contextvars
+import functools
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Optional
+
+TRACE_DIR = pathlib.Path(os.getenv("SOLACE_TRACE_DIR", "/tmp/solace/traces"))
+
+
+class MetricsRegistry:
+    """In-process counters and histograms, labelled by name.
+
+    Histograms keep the last `max_samples` observations per series, which is
+    enough for p50/p95 of recent generations without unbounded growth.
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._histograms: dict[tuple, deque] = {}
+
+    @staticmethod
+    def _key(metric: str, labels: dict) -> tuple:
+        return (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def incr(self, metric: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[self._key(metric, labels)] += value
+
+    def observe(self, metric: str, value: float, **labels) -> None:
+        with self._lock:
+            key = self._key(metric, labels)
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = deque(maxlen=self.max_samples)
+            series.append(value)
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        """Counters and histogram summaries (count, sum, p50, p95, max) as plain dicts."""
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self._counters.items()]
+            histograms = []
+            for (n, l), series in self._histograms.items():
+                values = sorted(series)
+                histograms.append({
+                    "name": n, "labels": dict(l), "count": len(values), "sum": sum(values),
+                    "p50": values[int((len(values) - 1) * 0.50)], "p95": values[int((len(values) - 1) * 0.95)],
+                    "max": values[-1],
+                })
+        return {"counters": counters, "histograms": histograms}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class _Trace:
+    def __init__(self, trace_id: str, session_id: Optional[str], path: pathlib.Path):
+        self.trace_id = trace_id
+        self.session_id = session_id
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class Span:
+    def __init__(self, name: str, kind: str, parent_id: Optional[str], attrs: dict):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.kind = kind
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+
+_current_trace: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar("solace_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("solace_span", default=None)
+
+
+@contextmanager
+def start_trace(session_id: Optional[str] = None):
+    """Collect spans for one generation into TRACE_DIR/<trace_id>.jsonl; yields the trace id."""
+    trace_id = uuid.uuid4().hex
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    token = _current_trace.set(_Trace(trace_id, session_id, TRACE_DIR / f"{trace_id}.jsonl"))
+    try:
+        yield trace_id
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "span", **attrs):
+    """Time a block: records duration into the metrics registry and, inside start_trace, a JSONL span."""
+    parent = _current_span.get()
+    s = Span(name, kind, parent.span_id if parent else None, attrs)
+    token = _current_span.set(s)
+    start = time.time()
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield s
+    except BaseException as e:
+        status = "error"
+        s.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - t0) * 1000
+        _current_span.reset(token)
+        metrics.observe(f"{kind}.duration_ms", duration_ms, name=name)
+        metrics.incr(f"{kind}.calls", name=name)
+        if status == "error":
+            metrics.incr(f"{kind}.errors", name=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            try:
+                trace.write({
+                    "trace_id": trace.trace_id, "session_id": trace.session_id, "span_id": s.span_id,
+                    "parent_id": s.parent_id, "name": name, "kind": kind, "start": start,
+                    "duration_ms": round(duration_ms, 3), "status": status, "attrs": s.attrs,
+                })
+            except OSError:
+                # tracing must never break a generation
+                pass
+
+
+def traced(name: str, kind: str):
+    """Decorator form of span(); keeps the wrapped signature so it can sit under @tool."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def annotate(**attrs) -> None:
+    """Add attributes to the current span, if any; they are written with it."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def record_usage(messages: Any) -> dict[str, int]:
+    """Add token usage from AI messages to the current span and the token counters."""
+    if not isinstance(messages, (list, tuple)):
+        messages = [messages]
+    totals = {"input_tokens": 0, "output_tokens": 0}
+    for m in messages:
+        usage = getattr(m, "usage_metadata", None) or {}
+        for k in totals:
+            totals[k] += int(usage.get(k) or 0)
+    current = _current_span.get()
+    name = current.name if current else "unknown"
+    for k, v in totals.items():
+        if v:
+            metrics.incr(f"llm.{k}", v, name=name)
+    if current is not None:
+        for k, v in totals.items():
+            current.attrs[k] = current.attrs.get(k, 0) + v
+    return totals
+
+
+def read_trace(trace_id: str) -> list[dict]:
+    """Spans recorded for a trace, in start order."""
+    path = TRACE_DIR / f"{trace_id}.jsonl"
+    if not path.exists():
+        return []
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return sorted(spans, key=lambda r: r["start"])
+
+
+def cleanup_traces(max_age_hours: int = 6) -> int:
+    """Remove trace files older than max_age_hours. Returns number of deletions."""
+    if not TRACE_DIR.exists():
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    count = 0
+    for entry in TRACE_DIR.glob("*.jsonl"):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+                count += 1
+        except OSError:
+            continue
+    return count
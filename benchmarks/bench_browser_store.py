@@ -0,0 +1,95 @@
+"""Browser persistence size and latency: base64 JSON in the URL vs compressed, content-addressed blobs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_browser_store [--sizes 10,1024,5120]
+
+Projects of the given sizes (KB) are built from this repository's own
+source files, so they compress like real code. "old" is the previous
+scheme: the whole payload inlined as JSON into a components.html snippet,
+and a restore that reloads the page with the payload base64-encoded into
+the `ls` query parameter. "new" is browser_store: raw-deflate blobs
+chunked across localStorage keys, a manifest, and restores returned as the
+component's value. Latencies are the Python side of a save and a restore;
+localStorage itself is not measured here.
+"""
+import argparse
+import base64
+import json
+import pathlib
+import statistics
+import time
+
+import browser_store
+
+# Chrome refuses URLs over 2 MB; many proxies and servers stop at 8-16 KB
+URL_LIMITS = {"chrome": 2 * 1024 * 1024, "typical server": 8 * 1024}
+# localStorage quota in characters per origin (Chrome, Firefox)
+QUOTA_CHARS = 5 * 1024 * 1024
+
+
+def make_project(target_bytes: int) -> dict[str, str]:
+    sources = [p.read_text() for p in sorted(pathlib.Path(__file__).resolve().parents[1].glob("agent/*.py"))]
+    files, size, i = {}, 0, 0
+    while size < target_bytes:
+        body = f"// module {i}\n" + sources[i % len(sources)]
+        body = body[: target_bytes - size] if size + len(body) > target_bytes else body
+        files[f"src/part{i // 25}/module{i}.js"] = body
+        size += len(body)
+        i += 1
+    return files
+
+
+def timed(fn, repeats: int = 5) -> tuple[float, object]:
+    samples, result = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+def human(n: int) -> str:
+    return f"{n / 1024 / 1024:.2f} MB" if n >= 1024 * 1024 else f"{n / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1024,5120", help="project sizes in KB")
+    args = parser.parse_args()
+
+    for kb in (int(s) for s in args.sizes.split(",")):
+        files = make_project(kb * 1024)
+        raw = sum(len(c.encode()) for c in files.values())
+
+        old_save_ms, snippet = timed(lambda: json.dumps(files))
+        old_url_ms, url_param = timed(lambda: base64.b64encode(json.dumps(files).encode()).decode())
+        old_restore_ms, _ = timed(lambda: json.loads(base64.b64decode(url_param)))
+        fits = ", ".join(f"{name} {'ok' if len(url_param) < limit else 'too long'}" for name, limit in URL_LIMITS.items())
+
+        new_save_ms, (manifest, blobs) = timed(lambda: browser_store.encode_payload(files))
+        sent = len(json.dumps({"manifest": manifest, "blobs": blobs}))
+        stored = sum(len(c) for chunks in blobs.values() for c in chunks) + len(json.dumps(manifest))
+        keys = sum(len(chunks) for chunks in blobs.values()) + 2
+        known = {e["h"]: e["n"] for e in manifest["files"].values()}
+        edited = dict(files)
+        first = next(iter(edited))
+        edited[first] += "\n// edited\n"
+        resave_ms, (m2, b2) = timed(lambda: browser_store.encode_payload(edited, known))
+        resent = len(json.dumps({"manifest": m2, "blobs": b2}))
+        joined = {h: "".join(chunks) for h, chunks in blobs.items()}
+        new_restore_ms, restored = timed(lambda: browser_store.decode_payload(manifest, joined))
+        assert restored == files
+
+        print(f"project {human(raw)} in {len(files)} files")
+        quota = lambda chars: "fits quota" if chars < QUOTA_CHARS else "over quota"
+        print(f"  old: component {human(len(snippet))}, stored {human(len(snippet))} ({quota(len(snippet))}) "
+              f"(save {old_save_ms:.1f} ms), restore URL {human(len(url_param))} "
+              f"({fits}), restore {old_url_ms + old_restore_ms:.1f} ms, every save re-sends {human(len(snippet))}")
+        print(f"  new: sent {human(sent)}, stored {human(stored)} in {keys} keys ({quota(stored)}) (save {new_save_ms:.1f} ms), "
+              f"restore {human(sent)} over the websocket ({new_restore_ms:.1f} ms), "
+              f"save after a 1-file edit sends {human(resent)} ({resave_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
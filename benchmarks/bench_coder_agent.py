@@ -0,0 +1,73 @@
+"""Per-step coder setup overhead: building the ReAct agent every step vs. reusing it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_coder_agent [--steps 50]
+
+Both variants drive the same fake chat model (no network), so the difference
+is the cost of `create_agent` plus the tool list rebuild on every step.
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain.agents import create_agent
+
+from agent.graph import CODER_TOOLS, get_coder_agent
+from agent.tools import delete_session_root, init_project_root
+from benchmarks.fake_llm import FakeChatModel
+
+
+def _messages(i: int) -> dict:
+    return {"messages": [
+        {"role": "system", "content": "You are the CODER agent."},
+        {"role": "user", "content": f"Task: step {i}\nFile to modify: file_{i}.js\n"},
+    ]}
+
+
+def run(steps: int) -> dict:
+    model = FakeChatModel()
+    sid = f"bench-{uuid.uuid4()}"
+    init_project_root(sid)
+    config = {"configurable": {"session_id": sid}}
+
+    def per_step_build(i: int):
+        t0 = time.perf_counter()
+        agent = create_agent(model, list(CODER_TOOLS))
+        setup = time.perf_counter() - t0
+        agent.invoke(_messages(i), config)
+        return setup, time.perf_counter() - t0
+
+    def cached(i: int):
+        t0 = time.perf_counter()
+        agent = get_coder_agent(model)
+        setup = time.perf_counter() - t0
+        agent.invoke(_messages(i), config)
+        return setup, time.perf_counter() - t0
+
+    results = {}
+    for name, fn in (("rebuild_per_step", per_step_build), ("cached_agent", cached)):
+        setups, totals = zip(*(fn(i) for i in range(steps)))
+        results[name] = {
+            "setup_ms_mean": statistics.mean(setups) * 1000,
+            "setup_ms_p50": statistics.median(setups) * 1000,
+            "step_ms_mean": statistics.mean(totals) * 1000,
+        }
+    delete_session_root(sid)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=50)
+    args = parser.parse_args()
+    for name, r in run(args.steps).items():
+        print(f"{name:18s} setup mean {r['setup_ms_mean']:8.3f} ms  p50 {r['setup_ms_p50']:8.3f} ms  whole step {r['step_ms_mean']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Bytes sent to and received from the model per coder step: full-file rewrites vs. excerpts + edit_file.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_edit_bytes [--functions 60] [--edits 5]
+
+The plan creates one large JS file and then runs `--edits` steps that each
+change a single function in it. In "full" mode (SOLACE_CODER_CONTEXT=full)
+the prompt carries the whole file and the fake model re-emits it with
+write_file. In "excerpt" mode the prompt carries only the relevant lines
+and the fake model answers with one edit_file search/replace.
+"""
+import argparse
+import json
+import os
+import re
+import uuid
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+import agent.graph as graph_module
+from agent.states import ImplementationTask
+from agent.tools import delete_session_root, init_project_root, read_file
+from benchmarks.fake_llm import FakeChatModel
+
+FILE = "app.js"
+
+
+def initial_source(functions: int) -> str:
+    blocks = []
+    for k in range(functions):
+        blocks.append(
+            f"function handler{k}(event) {{\n"
+            f"  const target = event.target;\n"
+            f"  const value = Number(target.value || {k});\n"
+            f"  if (Number.isNaN(value)) {{\n"
+            f"    return null;\n"
+            f"  }}\n"
+            f"  return value * {k + 1};\n"
+            f"}}\n"
+        )
+    return "\n".join(blocks)
+
+
+def make_responder(functions: int, meter: dict):
+    def responder(messages):
+        meter["sent"] += sum(len(str(m.content)) + len(json.dumps(getattr(m, "tool_calls", []) or [])) for m in messages)
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            reply = AIMessage(content="done")
+        else:
+            text = str(last.content)
+            m = re.search(r"handler(\d+)", text.split("\n", 1)[0])
+            if "does not exist yet" in text:
+                call = {"name": "write_file", "args": {"path": FILE, "content": initial_source(functions)}}
+            elif "Relevant excerpt" in text:
+                k = m.group(1)
+                line = next(l.split("| ", 1)[1] for l in text.splitlines() if f"function handler{k}(" in l)
+                call = {"name": "edit_file", "args": {"path": FILE, "edits": [
+                    {"search": line, "replace": f"// updated\n{line}"}]}}
+            else:
+                k = m.group(1)
+                body = text.split("Existing file content:\n", 1)[1].rsplit("\nUse edit_file", 1)[0]
+                line = f"function handler{k}(event) {{"
+                call = {"name": "write_file", "args": {"path": FILE, "content": body.replace(line, f"// updated\n{line}", 1)}}
+            reply = AIMessage(content="", tool_calls=[{**call, "id": f"call_{uuid.uuid4().hex[:8]}"}])
+        meter["received"] += len(str(reply.content)) + len(json.dumps([c["args"] for c in reply.tool_calls]))
+        return reply
+    return responder
+
+
+def run(mode: str, functions: int, edits: int) -> list[dict]:
+    os.environ["SOLACE_CODER_CONTEXT"] = mode
+    meter = {"sent": 0, "received": 0}
+    graph_module.llm = FakeChatModel(responder=make_responder(functions, meter))
+    sid = f"bench-{uuid.uuid4()}"
+    init_project_root(sid)
+    tasks = [ImplementationTask(file_path=FILE, task_description="Create the event handlers module")]
+    tasks += [ImplementationTask(file_path=FILE, task_description=f"Update handler{k * 7 % functions} to log its result") for k in range(1, edits + 1)]
+    rows = []
+    for i, task in enumerate(tasks):
+        meter.update(sent=0, received=0)
+        graph_module._coder_step(task, sid)
+        rows.append({"step": i, "sent_bytes": meter["sent"], "received_bytes": meter["received"]})
+    final = read_file.invoke({"path": FILE, "session_id": sid})
+    assert final.count("// updated") == edits, f"{mode}: expected {edits} edits applied"
+    delete_session_root(sid)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=60)
+    parser.add_argument("--edits", type=int, default=5)
+    args = parser.parse_args()
+    results = {mode: run(mode, args.functions, args.edits) for mode in ("full", "excerpt")}
+    print(f"{'step':>4} {'full sent':>10} {'full recv':>10} {'excerpt sent':>13} {'excerpt recv':>13}")
+    for full, ex in zip(results["full"], results["excerpt"]):
+        print(f"{full['step']:>4} {full['sent_bytes']:>10} {full['received_bytes']:>10} {ex['sent_bytes']:>13} {ex['received_bytes']:>13}")
+    for mode, rows in results.items():
+        later = rows[1:]
+        print(f"{mode:8s} edit steps: {sum(r['sent_bytes'] for r in later)} bytes sent, {sum(r['received_bytes'] for r in later)} bytes received")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""ZIP export: re-zipping into BytesIO on every rerun vs the content-keyed archive cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export [--files 200] [--file-kb 8] [--assets 20] [--asset-kb 200]
+
+The project has `--files` text files plus `--assets` already-compressed
+binaries (random bytes named .png). "old" is ui.py's zip_directory_to_bytes,
+which ran on every rerun to render the download button. "new" is
+agent.export.zip_bytes: the first rerun after a change builds the archive
+on disk, later reruns fingerprint the project and read the cached
+archive. Peak Python memory is measured with tracemalloc.
+"""
+import argparse
+import io
+import os
+import pathlib
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+
+def old_zip(directory: pathlib.Path) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for file_path in directory.rglob("*"):
+            if file_path.is_file():
+                zipf.write(file_path, arcname=file_path.relative_to(directory))
+    buffer.seek(0)
+    return buffer.read()
+
+
+def measure(fn, repeats: int = 5) -> tuple[float, int, object]:
+    samples, peak, result = [], 0, None
+    for _ in range(repeats):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(samples), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=8)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--asset-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["SOLACE_EXPORT_DIR"] = str(pathlib.Path(tmp) / "exports")
+        from agent import export
+
+        export.EXPORT_DIR = pathlib.Path(os.environ["SOLACE_EXPORT_DIR"])
+        project = pathlib.Path(tmp) / "generated_project"
+        line = "function handler(event) { return event.target.value.trim(); }\n"
+        for i in range(args.files):
+            p = project / f"src/m{i // 20}/file{i}.js"
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_text(f"// {i}\n" + line * (args.file_kb * 1024 // len(line)))
+        for i in range(args.assets):
+            p = project / f"assets/img{i}.png"
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_bytes(os.urandom(args.asset_kb * 1024))
+        payload = {p.relative_to(project).as_posix(): (p.read_text() if p.suffix == ".js" else p.read_bytes())
+                   for p in project.rglob("*") if p.is_file()}
+        raw = sum(len(v) for v in payload.values())
+        print(f"{len(payload)} files, {raw // 1024} KB")
+
+        ms, peak, data = measure(lambda: old_zip(project))
+        print(f"old, every rerun        {ms:8.1f} ms  peak {peak / 1024 / 1024:6.1f} MB  zip {len(data) // 1024} KB")
+        for name, source in (("directory", project), ("payload", payload)):
+            for p in export.EXPORT_DIR.glob("*.zip"):
+                p.unlink()
+            ms, peak, data = measure(lambda: export.zip_bytes(source), repeats=1)
+            print(f"new {name:9s} build     {ms:8.1f} ms  peak {peak / 1024 / 1024:6.1f} MB  zip {len(data) // 1024} KB")
+            ms, peak, data = measure(lambda: export.zip_bytes(source))
+            print(f"new {name:9s} rerun     {ms:8.1f} ms  peak {peak / 1024 / 1024:6.1f} MB")
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            stored = sum(1 for i in zf.infolist() if i.compress_type == zipfile.ZIP_STORED)
+        print(f"{stored} already-compressed assets stored without deflate")
+
+
+if __name__ == "__main__":
+    main()
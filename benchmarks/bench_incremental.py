@@ -0,0 +1,107 @@
+"""Incremental regeneration: LLM work for a prompt tweak, regenerating from zero vs reusing unchanged steps.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_incremental [--steps 12] [--changed 1] [--added 1] [--latency 0.05]
+
+A first generation builds a project of `--steps` files (each a module
+importing the one before it, every third file depending on the first).
+The tweak then rewrites the task of `--changed` steps and adds `--added`
+new files, the way "same app but add a history panel" does. "full" reruns
+every coder step; "incremental" (stream_generation(incremental=True))
+only reruns new or changed steps and the steps depending on them. The
+fake model answers planner and architect with the same plan both times,
+as the incremental prompts ask a real one to. Reports coder steps run,
+model calls, wall clock and the fraction of steps skipped.
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+from langchain_core.messages import AIMessage
+
+import agent.graph as graph_module
+from agent.incremental import restore_files
+from agent.tools import delete_session_root, get_storage, init_project_root, session_scope
+from benchmarks.fake_llm import FakeChatModel, coder_responder
+
+
+def task_plan(steps: int, changed: int, added: int, tweaked: bool) -> dict:
+    tasks = []
+    for i in range(steps):
+        deps = [f"src/m{i - 1}.js"] if i % 3 == 1 else (["src/m0.js"] if i % 3 == 2 and i > 2 else [])
+        desc = f"Module {i}: export its part of the calculator."
+        # the tweak changes the last `changed` modules, so what depends on them is small
+        if tweaked and i >= steps - changed:
+            desc += " Also record every result in the history panel."
+        tasks.append({"file_path": f"src/m{i}.js", "task_description": desc, "depends_on": deps})
+    if tweaked:
+        tasks += [{"file_path": f"src/history{j}.js", "task_description": "Render the history panel.",
+                   "depends_on": [f"src/m{steps - 1}.js"]} for j in range(added)]
+    return {"implimentation_steps": tasks}
+
+
+def make_responder(args, tweaked: bool):
+    def responder(messages):
+        text = str(messages[-1].content)
+        if "expert software planner" in text:
+            return AIMessage(content=json.dumps({"name": "calc", "description": "d", "techstack": "js", "features": [],
+                                                 "files": []}))
+        if "expert software architect" in text:
+            return AIMessage(content=json.dumps(task_plan(args.steps, args.changed, args.added, tweaked)))
+        return coder_responder(messages)
+    return responder
+
+
+def generate(sid: str, args, tweaked: bool, incremental: bool) -> tuple[int, int, float, dict]:
+    model = FakeChatModel(responder=make_responder(args, tweaked), latency=args.latency)
+    graph_module.llm = model
+    started = reused = 0
+    t0 = time.perf_counter()
+    with session_scope(sid):
+        for event in graph_module.stream_generation("calculator" + (" with history" if tweaked else ""), sid,
+                                                    incremental=incremental):
+            started += event.kind == "step_started"
+            if event.kind == "task_plan_ready":
+                reused = event.reused_steps or 0
+    return started, model.calls, time.perf_counter() - t0, {"reused": reused}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=12)
+    parser.add_argument("--changed", type=int, default=1)
+    parser.add_argument("--added", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    sid = f"incr-{uuid.uuid4().hex[:12]}"
+    init_project_root(sid)
+    generate(sid, args, tweaked=False, incremental=False)
+    # what the browser keeps after the first generation
+    project = get_storage(sid).snapshot()
+    total = args.steps + args.added
+
+    results = {}
+    # incremental first: every finished run replaces the session's run record
+    for incremental in (True, False):
+        restore_files(sid, project)
+        results[incremental] = generate(sid, args, tweaked=True, incremental=incremental)
+    delete_session_root(sid)
+
+    for incremental, (started, calls, elapsed, extra) in sorted(results.items()):
+        name = "incremental" if incremental else "full"
+        print(f"{name:11s}: {started:3d}/{total} coder steps run, {calls:3d} model calls, {elapsed:5.2f}s"
+              + (f", {extra['reused']} reused" if incremental else ""))
+    full, incr = results[False], results[True]
+    print(f"steps skipped: {1 - incr[0] / total:.0%}; model calls {full[1]} -> {incr[1]} "
+          f"({1 - incr[1] / full[1]:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Generation job queue: how long a Streamlit script thread is blocked, admission under a burst, and cancellation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_jobs [--users 40] [--workers 4] [--queue-limit 16] [--files 4] [--latency 0.05]
+
+Uses the offline fake model (every call sleeps `--latency` seconds).
+"old" is the previous behaviour: the script thread runs the whole
+generation, so it is blocked for its full duration. "new" submits to the
+job queue and polls it: the script thread only pays for submit() and each
+get(). `--users` sessions submit at once; at most `--workers` run and
+`--queue-limit` wait, the rest are refused. Cancellation latency is the
+time from cancel() to the job's row reading "cancelled".
+"""
+import argparse
+import os
+import pathlib
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+import agent.graph as graph_module
+from agent.jobs import CANCELLED, FINISHED, JobQueue, JobRejected, JobStore
+from agent.tools import delete_session_root, init_project_root, session_scope
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.stress_sessions import make_responder
+
+
+def pct(samples: list[float], q: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def run_inline(marker: str) -> float:
+    t0 = time.perf_counter()
+    init_project_root(marker)
+    with session_scope(marker):
+        for _ in graph_module.stream_generation(f"build {marker}", marker):
+            pass
+    delete_session_root(marker)
+    return (time.perf_counter() - t0) * 1000
+
+
+def wait(queue: JobQueue, job_id: str, poll_ms: list[float]) -> dict:
+    while True:
+        t0 = time.perf_counter()
+        job = queue.get(job_id)
+        poll_ms.append((time.perf_counter() - t0) * 1000)
+        if job["status"] in FINISHED:
+            return job
+        time.sleep(0.02)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-limit", type=int, default=16)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    graph_module.llm = FakeChatModel(responder=make_responder(args.files), latency=args.latency)
+
+    inline_ms = [run_inline(f"jobs-{uuid.uuid4().hex[:12]}") for _ in range(3)]
+    print(f"old: script thread blocked {statistics.median(inline_ms):.0f} ms per generation "
+          f"({args.files} files, {args.latency * 1000:.0f} ms model latency)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(JobStore(pathlib.Path(tmp, "jobs.sqlite")), workers=args.workers, queue_limit=args.queue_limit)
+        markers = [f"jobs-{uuid.uuid4().hex[:12]}" for _ in range(args.users)]
+        submit_ms, accepted, rejected = [], [], 0
+        barrier = threading.Barrier(args.users)
+        lock = threading.Lock()
+
+        def submit(marker: str) -> None:
+            nonlocal rejected
+            barrier.wait()
+            t0 = time.perf_counter()
+            try:
+                job_id = queue.submit(f"build {marker}", marker)
+            except JobRejected:
+                job_id = None
+            with lock:
+                submit_ms.append((time.perf_counter() - t0) * 1000)
+                if job_id is None:
+                    rejected += 1
+                else:
+                    accepted.append(job_id)
+
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=submit, args=(m,)) for m in markers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        poll_ms: list[float] = []
+        jobs = [wait(queue, job_id, poll_ms) for job_id in accepted]
+        elapsed = time.perf_counter() - t0
+        statuses = {s: sum(j["status"] == s for j in jobs) for s in {j["status"] for j in jobs}}
+        waits = [(j["started_at"] - j["created_at"]) * 1000 for j in jobs]
+        print(f"new: {args.users} users at once, {args.workers} workers, queue limit {args.queue_limit}: "
+              f"{len(accepted)} accepted, {rejected} refused, finished {statuses} in {elapsed:.2f}s")
+        print(f"     script thread blocked: submit p50 {statistics.median(submit_ms):.2f} ms / p99 {pct(submit_ms, 0.99):.2f} ms, "
+              f"poll p50 {statistics.median(poll_ms):.3f} ms / p99 {pct(poll_ms, 0.99):.3f} ms")
+        print(f"     queue wait p50 {statistics.median(waits):.0f} ms / max {max(waits):.0f} ms")
+
+        cancel_ms, outcomes = [], []
+        for _ in range(5):
+            marker = f"jobs-{uuid.uuid4().hex[:12]}"
+            markers.append(marker)
+            job_id = queue.submit(f"build {marker}", marker)
+            while not queue.get(job_id)["total_steps"]:
+                time.sleep(0.005)
+            t0 = time.perf_counter()
+            queue.cancel(job_id)
+            job = wait(queue, job_id, [])
+            cancel_ms.append((time.perf_counter() - t0) * 1000)
+            outcomes.append(job["status"])
+        print(f"     cancel once the task plan is ready -> finished p50 {statistics.median(cancel_ms):.0f} ms / "
+              f"max {max(cancel_ms):.0f} ms, {outcomes.count(CANCELLED)}/{len(outcomes)} cancelled "
+              f"(steps already running finish first)")
+        for marker in markers:
+            delete_session_root(marker)
+
+
+if __name__ == "__main__":
+    main()
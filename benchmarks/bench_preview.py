@@ -0,0 +1,167 @@
+"""Preview page load: per-session single-threaded file server vs the shared in-memory preview server.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_preview [--assets 20] [--asset-kb 30] [--sessions 20] [--connections 6]
+
+"old" is what ui.py did before: write the payload to a preview directory
+and serve it with a TCPServer (no ThreadingMixIn) + SimpleHTTPRequestHandler,
+one server per session. "new" is agent.preview: one ThreadingHTTPServer for
+all sessions, serving from memory. Each page load fetches index.html and
+`--assets` assets over `--connections` parallel keep-alive connections, like
+a browser; a reload sends If-None-Match. A slow client (one connection that
+stalls mid-request) shows head-of-line blocking on the old server.
+"""
+import argparse
+import http.client
+import pathlib
+import shutil
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+from socketserver import TCPServer
+
+from agent.preview import PreviewServer
+
+
+def make_payload(assets: int, asset_kb: int) -> dict[str, str]:
+    body = "".join(f"  .rule-{i} {{ color: #{i % 4096:03x}; margin: {i % 17}px; }}\n" for i in range(asset_kb * 20))
+    files = {f"assets/part{i}.{'css' if i % 2 else 'js'}": body[: asset_kb * 1024] for i in range(assets)}
+    tags = "\n".join(f'<link rel="stylesheet" href="{p}">' for p in files)
+    files["index.html"] = f"<!doctype html><html><head>{tags}</head><body>preview</body></html>"
+    return files
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class OldServer:
+    """ui.py before: materialize to disk, then a non-threaded TCPServer per session."""
+
+    def __init__(self, directory: pathlib.Path, files: dict[str, str]):
+        t0 = time.perf_counter()
+        if directory.exists():
+            shutil.rmtree(directory)
+        for rel, content in files.items():
+            target = directory / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content, encoding="utf-8")
+        self.publish_ms = (time.perf_counter() - t0) * 1000
+        handler = partial(QuietHandler, directory=str(directory))
+        TCPServer.allow_reuse_address = True
+        self.httpd = TCPServer(("127.0.0.1", 0), handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.prefix = "/"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def load_page(port: int, prefix: str, paths: list[str], connections: int, etags: dict) -> tuple[float, int, int]:
+    """(ms, bytes received, 304s) for one page load over parallel keep-alive connections."""
+    received = [0, 0]
+    lock = threading.Lock()
+    chunks = [paths[i::connections] for i in range(connections)]
+
+    def worker(chunk):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        for path in chunk:
+            headers = {"Accept-Encoding": "gzip"}
+            if path in etags:
+                headers["If-None-Match"] = etags[path]
+            try:
+                conn.request("GET", prefix + path, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                # HTTP/1.0 servers close after each response; reconnect like a browser would
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                conn.request("GET", prefix + path, headers=headers)
+                resp = conn.getresponse()
+            body = resp.read()
+            if resp.getheader("ETag"):
+                etags[path] = resp.getheader("ETag")
+            with lock:
+                received[0] += len(body)
+                received[1] += resp.status == 304
+            if resp.getheader("Connection", "").lower() == "close" or resp.version == 10:
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.close()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(worker, chunks))
+    return (time.perf_counter() - t0) * 1000, received[0], received[1]
+
+
+def stalled_client(port: int, hold: float) -> threading.Thread:
+    """A connection that sends half a request line and then waits, like a slow or idle browser socket."""
+    def run():
+        s = socket.create_connection(("127.0.0.1", port))
+        s.sendall(b"GET /index")
+        time.sleep(hold)
+        s.close()
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    time.sleep(0.05)
+    return t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--asset-kb", type=int, default=30)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--connections", type=int, default=6)
+    parser.add_argument("--loads", type=int, default=10)
+    args = parser.parse_args()
+
+    files = make_payload(args.assets, args.asset_kb)
+    paths = ["index.html"] + [p for p in files if p != "index.html"]
+    raw = sum(len(v.encode()) for v in files.values())
+    print(f"{len(paths)} requests per page, {raw // 1024} KB raw, {args.sessions} sessions, "
+          f"{args.connections} connections per load")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        olds = [OldServer(pathlib.Path(tmp) / f"s{i}", files) for i in range(args.sessions)]
+        shared = PreviewServer()
+        t0 = time.perf_counter()
+        for i in range(args.sessions):
+            shared.publish(f"s{i}", files)
+        new_publish = (time.perf_counter() - t0) * 1000 / args.sessions
+        results = {}
+        for name, port, prefix in (("old", olds[0].port, "/"), ("new", shared.port, "/s0/")):
+            cold, warm = [], []
+            for _ in range(args.loads):
+                etags: dict = {}
+                ms, nbytes, _ = load_page(port, prefix, paths, args.connections, etags)
+                cold.append(ms)
+                ms, rbytes, not_modified = load_page(port, prefix, paths, args.connections, etags)
+                warm.append(ms)
+            stall = stalled_client(port, hold=2.0)
+            stalled_ms, _, _ = load_page(port, prefix, paths, args.connections, {})
+            stall.join()
+            results[name] = (statistics.median(cold), nbytes, statistics.median(warm), rbytes, not_modified, stalled_ms)
+        for name, (cold, nbytes, warm, rbytes, not_modified, stalled_ms) in results.items():
+            print(f"{name}: page load p50 {cold:6.1f} ms, {nbytes // 1024:4d} KB   reload p50 {warm:6.1f} ms, "
+                  f"{rbytes // 1024:4d} KB, {not_modified:2d} x 304   with a stalled connection {stalled_ms:7.1f} ms")
+        print(f"publish per session: old {statistics.median(o.publish_ms for o in olds):.1f} ms (write to disk), "
+              f"new {new_publish:.1f} ms (in memory)")
+        print(f"server threads for {args.sessions} sessions: old {args.sessions}, new 1 (+1 per open connection)")
+        for o in olds:
+            o.close()
+        shared.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Preview sync latency per Streamlit rerun on a large payload.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_preview_sync [--files 200] [--file-kb 4] [--reruns 50]
+
+"materialize" is what ui.py did on every rerun of the App Preview tab
+before the shared preview server: rmtree the preview directory and write
+every file again. "full publish" rebuilds every asset of the session on
+each call. The incremental publish is measured for an unchanged payload
+(the same mapping, as st.session_state hands back on a rerun), an equal
+copy of it, and one edited file. The disk-backed preview (generated_project)
+is measured reading every file vs DirectorySnapshot.refresh().
+"""
+import argparse
+import pathlib
+import shutil
+import statistics
+import tempfile
+import time
+
+from agent.preview import DirectorySnapshot, PreviewServer
+
+
+def materialize(preview_dir: pathlib.Path, files: dict[str, str]) -> None:
+    if preview_dir.exists():
+        shutil.rmtree(preview_dir, ignore_errors=True)
+    preview_dir.mkdir(parents=True, exist_ok=True)
+    for rel, content in files.items():
+        target = preview_dir / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+
+
+def read_all(directory: pathlib.Path) -> dict[str, bytes]:
+    return {p.relative_to(directory).as_posix(): p.read_bytes() for p in directory.rglob("*") if p.is_file()}
+
+
+def p50(fn, reruns: int) -> float:
+    samples = []
+    for i in range(reruns):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=4)
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    line = "export const value = computeSomething(alpha, beta, gamma);\n"
+    files = {f"src/module{i // 20}/file{i}.js": f"// file {i}\n" + line * (args.file_kb * 1024 // len(line))
+             for i in range(args.files)}
+    files["index.html"] = "<!doctype html><script type=module src=src/module0/file0.js></script>"
+    print(f"{len(files)} files, {sum(len(c) for c in files.values()) // 1024} KB, p50 over {args.reruns} reruns")
+
+    server = PreviewServer()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        rows = {
+            "materialize (old)": lambda i: materialize(root / "preview", files),
+            "full publish": lambda i: server.publish(f"full{i}", files),
+        }
+        server.publish("inc", files)
+        rows["publish, same payload"] = lambda i: server.publish("inc", files)
+        rows["publish, equal copy"] = lambda i: server.publish("inc", dict(files))
+        edited = [dict(files, **{"src/module0/file0.js": files["src/module0/file0.js"] + f"// {i}\n"})
+                  for i in range(args.reruns)]
+        rows["publish, 1 file edited"] = lambda i: server.publish("inc", edited[i])
+        for name, fn in rows.items():
+            print(f"{name:28s} {p50(fn, args.reruns):8.2f} ms")
+
+        project = root / "generated_project"
+        materialize(project, files)
+        snapshot = DirectorySnapshot(project)
+        snapshot.refresh()
+        print(f"{'disk: read every file (old)':28s} {p50(lambda i: read_all(project), args.reruns):8.2f} ms")
+        print(f"{'disk: snapshot refresh':28s} {p50(lambda i: snapshot.refresh(), args.reruns):8.2f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
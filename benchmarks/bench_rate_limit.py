@@ -0,0 +1,105 @@
+"""Concurrent sessions against a rate-limited fake provider, with and without the LLM scheduler.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rate_limit [--sessions 12] [--coder-calls 8] [--limit 20] [--window 1.0]
+
+The fake provider answers at most `--limit` requests per `--window` seconds
+and raises a 429 for the rest. Each session makes one planner call, one
+architect call, then `--coder-calls` coder calls on a small pool. The
+"naive" client retries every 429 after a fixed delay, like a provider SDK
+would, so sessions that were rejected together retry together. The
+"scheduled" client goes through ScheduledChatModel and an LLMScheduler set
+to the provider's limit (time is scaled so one minute = `--window` seconds).
+The report gives wall time, 429s received and per-lane latency.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+
+from agent.ratelimit import LLMScheduler, ScheduledChatModel, is_retryable, llm_lane
+from agent.tracing import metrics
+from benchmarks.fake_llm import FakeChatModel
+
+
+def naive_invoke(model, prompt: str, retry_delay: float):
+    while True:
+        try:
+            return model.invoke(prompt)
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            time.sleep(retry_delay)
+
+
+def run(mode: str, args) -> dict:
+    provider = FakeChatModel(responder=lambda m: AIMessage(content="ok"), latency=args.latency,
+                             rate_limit=args.limit, rate_window=args.window)
+    if mode == "scheduled":
+        scheduler = LLMScheduler(rpm=args.limit, max_concurrency=args.concurrency, period=args.window)
+        model = ScheduledChatModel(inner=provider, scheduler=scheduler, max_retries=20,
+                                   backoff_base=args.window / 20, backoff_cap=args.window)
+        call = lambda prompt: model.invoke(prompt)
+    else:
+        call = lambda prompt: naive_invoke(provider, prompt, args.window / 2)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    lock = threading.Lock()
+
+    def timed(lane: str, prompt: str) -> None:
+        t0 = time.perf_counter()
+        with llm_lane(lane):
+            call(prompt)
+        with lock:
+            latencies[lane].append((time.perf_counter() - t0) * 1000)
+
+    def session(i: int) -> None:
+        timed("planner", f"plan {i}")
+        timed("architect", f"architect {i}")
+        with ContextThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda k: timed("coder", f"code {i}.{k}"), range(args.coder_calls)))
+
+    metrics.reset()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        # stagger session starts so planners arrive while other sessions are coding
+        futures = []
+        for i in range(args.sessions):
+            futures.append(pool.submit(session, i))
+            time.sleep(args.window / args.sessions)
+        for f in futures:
+            f.result()
+    wall = time.perf_counter() - t0
+    lanes = {lane: {"p50": statistics.median(v), "p95": sorted(v)[int((len(v) - 1) * 0.95)]}
+             for lane, v in latencies.items()}
+    return {"wall_s": wall, "calls": provider.calls, "rate_limited": provider.rate_limited, "lanes": lanes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--coder-calls", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=20, help="provider requests per window")
+    parser.add_argument("--window", type=float, default=1.0, help="seconds standing in for one minute")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    total = args.sessions * (2 + args.coder_calls)
+    print(f"{args.sessions} sessions, {total} successful calls needed, provider limit {args.limit}/{args.window}s")
+    for mode in ("naive", "scheduled"):
+        r = run(mode, args)
+        lanes = "  ".join(f"{lane} p50 {v['p50']:.0f}ms p95 {v['p95']:.0f}ms" for lane, v in sorted(r["lanes"].items()))
+        print(f"{mode:9s}: wall {r['wall_s']:6.2f}s  provider calls {r['calls']:4d}  429s {r['rate_limited']:4d}  {lanes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Latency of short sequential commands: one subprocess per command vs the persistent session shell.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_runner [--commands 50] [--repeats 5]
+
+"old" is the previous run_cmd body: subprocess.run(shell=True, capture_output=True)
+per command. "subprocess" is agent.runner.run_subprocess: still a process per
+command, now with its own process group, limits and truncation. "shell" is
+agent.runner.ShellRunner, which keeps one bash per session. The report
+also lists how many bytes of a noisy command's output reach the model, and
+the peak Python memory (tracemalloc) of capturing `--flood-mb` of stdout.
+"""
+import argparse
+import pathlib
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from agent.runner import ShellRunner, output_cap, run_subprocess
+
+COMMANDS = ["echo hello", "ls", "true", "cat package.json", "pwd", "test -f package.json && echo yes", "wc -l package.json"]
+
+
+def old_run(cmd: str, cwd: pathlib.Path, timeout: float = 30):
+    res = subprocess.run(cmd, shell=True, cwd=str(cwd), capture_output=True, text=True, timeout=timeout)
+    return res.returncode, res.stdout, res.stderr
+
+
+def timed(run, cwd: pathlib.Path, n: int) -> list[float]:
+    samples = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        code, _, _ = run(COMMANDS[i % len(COMMANDS)], cwd)
+        samples.append((time.perf_counter() - t0) * 1000)
+        assert code == 0
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--flood-mb", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = pathlib.Path(tmp)
+        (cwd / "package.json").write_text('{"name": "bench"}\n')
+        shell = ShellRunner(cwd)
+        runners = {"old": old_run, "subprocess": run_subprocess, "shell": lambda c, d: shell.run(c, d)}
+        shell.run("true", cwd)  # the shell starts once per session; count it separately
+        print(f"{args.commands} sequential commands, {args.repeats} repeats")
+        for name, run in runners.items():
+            totals, per_cmd = [], []
+            for _ in range(args.repeats):
+                samples = timed(run, cwd, args.commands)
+                totals.append(sum(samples))
+                per_cmd.extend(samples)
+            per_cmd.sort()
+            print(f"{name:10s}: total p50 {statistics.median(totals):7.1f} ms   per command p50 "
+                  f"{per_cmd[len(per_cmd) // 2]:6.2f} ms  p95 {per_cmd[int(len(per_cmd) * 0.95)]:6.2f} ms")
+        t0 = time.perf_counter()
+        ShellRunner(cwd).run("true", cwd)
+        print(f"shell startup + first command: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        noisy = "seq 1 200000"
+        old_bytes = len(old_run(noisy, cwd)[1].encode())
+        new_bytes = len(shell.run(noisy, cwd)[1].encode())
+        print(f"'{noisy}' stdout returned to the model: old {old_bytes} bytes, new {new_bytes} bytes (cap {output_cap()})")
+
+        flood = f"head -c {args.flood_mb * 1000000} /dev/zero | tr '\\0' x"
+        for name, run in (("old", old_run), ("subprocess", run_subprocess)):
+            tracemalloc.start()
+            run(flood, cwd)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:10s}: peak memory capturing {args.flood_mb} MB of stdout {peak / 1e6:.1f} MB")
+        shell.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Streamlit app startup and rerun cost: import-time breakdown, first run and no-op reruns.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--app ui.py] [--reruns 20] [--top 12]
+
+Each measurement runs in a fresh interpreter so nothing is already
+imported. The import breakdown is `python -X importtime` over the app's
+top-level imports (read from the app file) and lists the slowest
+top-level modules by cumulative time. The script run is
+timed with streamlit.testing.v1.AppTest: the first run (imports, page
+build) and the median of `--reruns` no-op reruns.
+"""
+import argparse
+import ast
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+RUNNER = """
+import json, os, statistics, sys, time
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+from streamlit.testing.v1 import AppTest
+app, reruns = sys.argv[1], int(sys.argv[2])
+at = AppTest.from_file(app, default_timeout=120)
+t0 = time.perf_counter()
+at.run()
+first = (time.perf_counter() - t0) * 1000
+samples = []
+for _ in range(reruns):
+    t0 = time.perf_counter()
+    at.run()
+    samples.append((time.perf_counter() - t0) * 1000)
+heavy = [m for m in ("agent.graph", "langgraph.graph", "langchain.agents", "langchain_core.language_models",
+                     "langchain_google_genai", "langchain_groq") if m in sys.modules]
+print(json.dumps({"first": first, "rerun": statistics.median(samples), "heavy": heavy,
+                  "exceptions": [str(e.value) for e in at.exception]}))
+"""
+
+
+def top_level_imports(app: pathlib.Path) -> list[str]:
+    """Modules the app imports at module level (not inside functions)."""
+    mods = []
+    for node in ast.parse(app.read_text()).body:
+        if isinstance(node, ast.Import):
+            mods += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            mods.append(node.module)
+    return mods
+
+
+def import_breakdown(mods: list[str], top: int) -> tuple[float, list[tuple[str, float]]]:
+    env = dict(os.environ, GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "offline-benchmark"))
+    code = "\n".join(f"import {m}" for m in mods)
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env)
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        try:
+            rows.append((name.rstrip(), int(cumulative) / 1000))
+        except ValueError:
+            continue
+    # nesting is shown by indentation; top-level entries (one leading space) add up to the total
+    tops = sorted(((name.strip(), ms) for name, ms in rows if not name.startswith("  ")), key=lambda r: -r[1])
+    return sum(ms for _, ms in tops), tops[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="ui.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    app = pathlib.Path(args.app).resolve()
+    mods = top_level_imports(app)
+    total, tops = import_breakdown(mods, args.top)
+    print(f"{app.name} top-level imports: {total:.0f} ms")
+    for name, ms in tops:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    res = subprocess.run([sys.executable, "-c", RUNNER, str(app), str(args.reruns)], capture_output=True, text=True,
+                         cwd=str(app.parent), env=dict(os.environ, PYTHONPATH=str(app.parent)))
+    if res.returncode != 0:
+        sys.exit(res.stderr)
+    run = json.loads(res.stdout.strip().splitlines()[-1])
+    print(f"first script run {run['first']:.0f} ms, no-op rerun p50 {run['rerun']:.1f} ms")
+    print(f"heavy modules loaded after the first page: {', '.join(run['heavy']) or 'none'}")
+    if run["exceptions"]:
+        print("app exceptions:", run["exceptions"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Parse a corpus of malformed planner/architect replies the old way and the new way.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_structured
+
+The old path took the greedy first-'{' to last-'}' match and ran json.loads,
+then model_validate; any error killed the generation, so the whole run had
+to be repeated. The new path (agent.structured.invoke_structured, in "json"
+mode) repairs the reply locally. It re-asks the model with only the error
+only when the repair fails. A fake model answers each re-ask with the clean
+JSON. The report counts model calls for both paths and how many the new
+path saved.
+"""
+import json
+import os
+import re
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ["SOLACE_STRUCTURED_OUTPUT"] = "json"
+
+from langchain_core.messages import AIMessage
+
+from agent.states import Plan, TaskPlan
+from agent.structured import StructuredOutputError, invoke_structured
+from benchmarks.fake_llm import FakeChatModel
+
+PLAN = {
+    "name": "Calculator",
+    "description": "A simple calculator web app",
+    "techstack": "HTML, CSS, JavaScript",
+    "features": ["add", "subtract", "multiply", "divide"],
+    "files": [
+        {"path": "index.html", "purpose": "markup"},
+        {"path": "style.css", "purpose": "styles"},
+        {"path": "script.js", "purpose": "logic"},
+    ],
+}
+TASK_PLAN = {"implimentation_steps": [
+    {"file_path": "index.html", "task_description": "Create the calculator layout with a display and buttons.", "depends_on": []},
+    {"file_path": "style.css", "task_description": "Style the grid of buttons and the display.", "depends_on": ["index.html"]},
+    {"file_path": "script.js", "task_description": "Wire button clicks to evaluate(expr) and update #display.", "depends_on": ["index.html"]},
+]}
+
+
+def _pretty(data) -> str:
+    return json.dumps(data, indent=2)
+
+
+def _truncate_after(text: str, marker: str) -> str:
+    return text[: text.rindex(marker) + len(marker)]
+
+
+# (label, schema, reply)
+CORPUS = [
+    ("clean plan", Plan, json.dumps(PLAN)),
+    ("clean task plan", TaskPlan, json.dumps(TASK_PLAN)),
+    ("fenced plan", Plan, "```json\n" + _pretty(PLAN) + "\n```"),
+    ("fenced task plan", TaskPlan, "```\n" + _pretty(TASK_PLAN) + "\n```"),
+    ("prose before", Plan, "Here is the plan you asked for:\n" + _pretty(PLAN)),
+    ("prose after with braces", Plan, _pretty(PLAN) + "\n\nNote: keep {state} in one object."),
+    ("trailing commas", Plan, re.sub(r"(\]|\"|\})(\n\s*[\]\}])", r"\1,\2", _pretty(PLAN))),
+    ("trailing comma in steps", TaskPlan, _pretty(TASK_PLAN).replace("}\n  ]", "},\n  ]")),
+    ("truncated mid-step", TaskPlan, _truncate_after(_pretty(TASK_PLAN), '"task_description": "Wire button')),
+    ("truncated after step", TaskPlan, _truncate_after(_pretty(TASK_PLAN), '"index.html"\n      ]\n    }')),
+    ("truncated files array", Plan, _truncate_after(_pretty(PLAN), '"purpose": "styles"')),
+    ("raw newline in string", TaskPlan, json.dumps(TASK_PLAN).replace("display and buttons.", "display\nand buttons.")),
+    ("two objects", Plan, json.dumps(PLAN) + "\n" + json.dumps({"extra": True})),
+    ("fence plus prose", TaskPlan, "Sure!\n```json\n" + _pretty(TASK_PLAN) + "\n```\nLet me know if you need changes."),
+    ("missing field", Plan, json.dumps({k: v for k, v in PLAN.items() if k != "techstack"})),
+    ("wrong type", TaskPlan, json.dumps({"implimentation_steps": "index.html, style.css, script.js"})),
+    ("not json", Plan, "I cannot produce a plan without more details."),
+]
+
+
+def old_parse(text: str, schema) -> bool:
+    m = re.search(r"\{[\s\S]*\}", text)
+    try:
+        schema.model_validate(json.loads(m.group(0) if m else text))
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    clean = {Plan: json.dumps(PLAN), TaskPlan: json.dumps(TASK_PLAN)}
+    old_calls = new_calls = 0
+    print(f"{'case':28s} {'old':>6s} {'new':>10s} calls")
+    for label, schema, reply in CORPUS:
+        # old: one call, plus one full re-run of the node when parsing failed
+        old_ok = old_parse(reply, schema)
+        old_calls += 1 if old_ok else 2
+        replies = iter([reply, clean[schema]])
+        model = FakeChatModel(responder=lambda messages: AIMessage(content=next(replies)))
+        try:
+            invoke_structured(model, "prompt", schema)
+            outcome = "local" if model.calls == 1 else "re-ask"
+        except StructuredOutputError:
+            outcome = "failed"
+        new_calls += model.calls
+        print(f"{label:28s} {'ok' if old_ok else 'FAIL':>6s} {outcome:>10s} {model.calls}")
+    print(f"\nmodel calls for {len(CORPUS)} replies: old {old_calls}, new {new_calls} "
+          f"({old_calls - new_calls} avoided)")
+
+
+if __name__ == "__main__":
+    main()
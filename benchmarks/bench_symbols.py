@@ -0,0 +1,169 @@
+"""Coder tool calls and prompt bytes per step with and without the project interface summary.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_symbols [--modules 10] [--functions 12]
+
+The plan writes style.css, index.html and `--modules` JS modules; module i
+imports from modules i-1 and i-2 and uses element ids of index.html, and
+its step depends on those files. The fake coder does what the coder system
+prompt asks for compatibility: before writing, it needs the interface of
+every file its step depends on. "off" is SOLACE_CODER_INTERFACE_CHARS=0,
+so it calls read_file for each of them; "summary" gives every step the
+symbol index's summary, so it reads only dependencies the summary does not
+list. Prompt bytes are everything sent to the model during the step
+(system prompt, task, tool calls and tool results, over all turns). Both
+runs must leave the same files behind.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+import uuid
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+import agent.graph as graph_module
+from agent.states import ImplementationTask
+from agent.symbols import symbol_index
+from agent.tools import delete_session_root, get_storage, init_project_root
+from benchmarks.fake_llm import FakeChatModel
+
+IDS = ["display", "history", "keys", "status", "clear"]
+
+
+def module_path(i: int) -> str:
+    return f"src/m{i}.js"
+
+
+def source(path: str, functions: int) -> str:
+    if path == "style.css":
+        rules = [f"#{name} {{\n  display: block;\n  margin: 4px;\n}}\n" for name in IDS]
+        rules += [f".item-{k} {{\n  color: var(--accent);\n  padding: {k}px;\n}}\n" for k in range(functions)]
+        return ":root {\n  --accent: #3366ff;\n}\n" + "\n".join(rules)
+    if path == "index.html":
+        body = "\n".join(f'    <div id="{name}" class="panel item-{k}"></div>' for k, name in enumerate(IDS))
+        return ('<!doctype html>\n<html>\n  <head>\n    <link rel="stylesheet" href="style.css">\n  </head>\n'
+                f'  <body>\n{body}\n    <script type="module" src="src/main.js"></script>\n  </body>\n</html>\n')
+    i = int(re.search(r"m(\d+)\.js", path).group(1))
+    lines = [f"import {{ m{d}_f0, m{d}_f1 }} from './m{d}.js';" for d in (i - 1, i - 2) if d >= 0]
+    for k in range(functions):
+        lines.append(
+            f"\nexport function m{i}_f{k}(value, options = {{}}) {{\n"
+            f"  const el = document.getElementById('{IDS[k % len(IDS)]}');\n"
+            f"  const scale = options.scale || {k + 1};\n"
+            f"  const result = Number(value) * scale;\n"
+            f"  if (Number.isNaN(result)) {{\n"
+            f"    el.textContent = 'invalid input';\n"
+            f"    return null;\n"
+            f"  }}\n"
+            f"  el.textContent = String(result);\n"
+            f"  return result;\n"
+            f"}}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def make_responder(functions: int, meter: dict):
+    def responder(messages):
+        meter["model_calls"] += 1
+        meter["sent"] += sum(len(str(m.content)) + len(json.dumps(getattr(m, "tool_calls", []) or [])) for m in messages)
+        task = next(str(m.content) for m in messages if "File to modify:" in str(m.content))
+        path = re.search(r"File to modify: (.+)", task).group(1).strip()
+        needs = re.findall(r"uses (\S+) ", task.split("\n", 1)[0])
+        if isinstance(messages[-1], ToolMessage):
+            if any(getattr(m, "tool_calls", None) and m.tool_calls[0]["name"] == "write_file" for m in messages):
+                return AIMessage(content="done")
+            calls = []
+        else:
+            listed = task.split("Other project files and their interfaces", 1)[1] if "Other project files" in task else ""
+            calls = [{"name": "read_file", "args": {"path": dep}} for dep in needs
+                     if not re.search(rf"^{re.escape(dep)}( - |$)", listed, re.M)]
+        if not calls:
+            calls = [{"name": "write_file", "args": {"path": path, "content": source(path, functions)}}]
+        meter["tool_calls"] += len(calls)
+        meter["reads"] += sum(c["name"] == "read_file" for c in calls)
+        return AIMessage(content="", tool_calls=[{**c, "id": f"call_{uuid.uuid4().hex[:8]}"} for c in calls])
+    return responder
+
+
+def plan(modules: int) -> list[ImplementationTask]:
+    tasks = [ImplementationTask(file_path="style.css", task_description="Write the stylesheet", depends_on=[]),
+             ImplementationTask(file_path="index.html", task_description="Write the page; uses style.css for its layout",
+                                depends_on=["style.css"])]
+    for i in range(modules):
+        deps = ["index.html"] + [module_path(d) for d in (i - 1, i - 2) if d >= 0]
+        uses = "".join(f"; uses {d} for its interface" for d in deps)
+        tasks.append(ImplementationTask(file_path=module_path(i), task_description=f"Write module {i}{uses}",
+                                        depends_on=deps))
+    return tasks
+
+
+def run(mode: str, args) -> tuple[list[dict], dict[str, str]]:
+    os.environ["SOLACE_CODER_INTERFACE_CHARS"] = "0" if mode == "off" else str(args.budget)
+    meter = {"model_calls": 0, "tool_calls": 0, "reads": 0, "sent": 0}
+    graph_module.llm = FakeChatModel(responder=make_responder(args.functions, meter))
+    sid = f"symbols-{uuid.uuid4().hex[:12]}"
+    init_project_root(sid)
+    rows = []
+    for task in plan(args.modules):
+        for key in meter:
+            meter[key] = 0
+        t0 = time.perf_counter()
+        interface = graph_module._project_interface([task], sid)
+        summary_ms = (time.perf_counter() - t0) * 1000
+        graph_module._coder_step(task, sid)
+        rows.append({"file": task.file_path, "summary_ms": summary_ms, "interface_chars": len(interface), **meter})
+    files = get_storage(sid).snapshot()
+    delete_session_root(sid)
+    return rows, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modules", type=int, default=10)
+    parser.add_argument("--functions", type=int, default=12)
+    parser.add_argument("--budget", type=int, default=3000, help="SOLACE_CODER_INTERFACE_CHARS for the summary run")
+    args = parser.parse_args()
+
+    off, off_files = run("off", args)
+    on, on_files = run("summary", args)
+    assert off_files == on_files, "the two runs produced different files"
+
+    print(f"{'file':12} {'off: calls':>10} {'reads':>5} {'sent':>7} | {'summary: calls':>14} {'reads':>5} {'sent':>7} {'summary':>7}")
+    for a, b in zip(off, on):
+        print(f"{a['file']:12} {a['tool_calls']:>10} {a['reads']:>5} {a['sent']:>7} | "
+              f"{b['tool_calls']:>14} {b['reads']:>5} {b['sent']:>7} {b['interface_chars']:>7}")
+    for name, rows in (("off", off), ("summary", on)):
+        print(f"{name:8s} per step: {statistics.mean(r['tool_calls'] for r in rows):.2f} tool calls, "
+              f"{statistics.mean(r['model_calls'] for r in rows):.2f} model calls, "
+              f"{statistics.mean(r['sent'] for r in rows):.0f} prompt bytes "
+              f"(total {sum(r['sent'] for r in rows)})")
+    symbol_index_ms = [r["summary_ms"] for r in on]
+    print(f"summary build per step: p50 {statistics.median(symbol_index_ms):.2f} ms / max {max(symbol_index_ms):.2f} ms")
+
+    storage_sid = f"symbols-{uuid.uuid4().hex[:12]}"
+    init_project_root(storage_sid)
+    storage = get_storage(storage_sid)
+    data = source(module_path(3), args.functions).encode("utf-8")
+    write_ms = []
+    for indexed in (False, True):
+        if indexed:
+            symbol_index(storage)
+        t0 = time.perf_counter()
+        for n in range(200):
+            # distinct content each time, so the index really re-parses
+            storage.write(module_path(3), data + f"// {n}\n".encode())
+        write_ms.append((time.perf_counter() - t0) / 200 * 1000)
+    print(f"storage write ({len(data)} byte module): {write_ms[0]:.3f} ms, "
+          f"{write_ms[1]:.2f} ms with the symbol index listening")
+    delete_session_root(storage_sid)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Deterministic chat model used by the offline benchmarks.
+
+It never calls a provider: every turn is answered by `responder`, which gets
+the message list and returns an AIMessage. The default responder plays the
+coder agent: it writes the file named in the "File to modify:" line with a
+small body, then finishes once it sees the tool result.
+
+With `rate_limit` set it also behaves like a provider that allows that many
+requests per `rate_window` seconds: calls over the limit raise
+RateLimitError (status_code 429) without being answered.
+
+stream() sends a text reply in pieces of `stream_chars` characters, one
+every `stream_latency` seconds (after `latency`), like a provider
+generating tokens; invoke() takes the same total time.
+"""
+import json
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class RateLimitError(Exception):
+    """What the fake provider raises when over its limit; shaped like an HTTP 429."""
+
+    status_code = 429
+
+
+def coder_responder(messages: list[BaseMessage]) -> AIMessage:
+    """Write the requested file on the first turn and stop after the tool result."""
+    if isinstance(messages[-1], ToolMessage):
+        return AIMessage(content="done")
+    prompt = str(messages[-1].content)
+    m = re.search(r"File to modify: (.+)", prompt)
+    path = m.group(1).strip() if m else "main.py"
+    return AIMessage(
+        content="",
+        tool_calls=[{
+            "name": "write_file",
+            "args": {"path": path, "content": f"// generated {path}\n"},
+            "id": f"call_{len(messages)}",
+        }],
+    )
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted chat model with optional injected latency."""
+
+    responder: Callable[[list[BaseMessage]], AIMessage] = coder_responder
+    latency: float = 0.0
+    calls: int = 0
+    rate_limit: int = 0
+    rate_window: float = 60.0
+    rate_limited: int = 0
+    stream_chars: int = 0
+    stream_latency: float = 0.0
+    _recent: deque = PrivateAttr(default_factory=deque)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"model": "fake-chat", "latency": self.latency}
+
+    def _pieces(self, message: AIMessage) -> list[str]:
+        text = message.content if isinstance(message.content, str) and not message.tool_calls else ""
+        if not self.stream_chars or not text:
+            return [text]
+        return [text[i:i + self.stream_chars] for i in range(0, len(text), self.stream_chars)]
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self._admit()
+        message = self.responder(messages)
+        if self.stream_latency:
+            time.sleep(self.stream_latency * len(self._pieces(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._admit()
+        message = self.responder(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content, tool_call_chunks=[
+                tool_call_chunk(name=c["name"], args=json.dumps(c["args"]), id=c["id"], index=n)
+                for n, c in enumerate(message.tool_calls)
+            ]))
+            return
+        for piece in self._pieces(message):
+            if self.stream_latency:
+                time.sleep(self.stream_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    def _admit(self) -> None:
+        with self._lock:
+            self.calls += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                while self._recent and self._recent[0] <= now - self.rate_window:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.rate_limited += 1
+                    raise RateLimitError("429 RESOURCE_EXHAUSTED: rate limit exceeded")
+                self._recent.append(now)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def bind_tools(self, tools, **kwargs):
+        # The responder decides which tools to call, so binding is a no-op.
+        return self
@@ -0,0 +1,215 @@
+"""Offline end-to-end benchmark of the compiled agent graph with a deterministic fake model.
+
+Run from the repository root:
+
+    python -m benchmarks.run_e2e [--sizes 1 10 50 200] [--repeats 5] [--latency 0.02]
+                                 [--batch-tokens 0] [--out bench_results/e2e.json] [--compare old.json]
+
+For every plan size the fake model returns a canned Plan and TaskPlan with
+that many files, and the coder answers each step with one write_file call.
+Every model call sleeps for `--latency` seconds, plus up to `--jitter`
+seconds more. Per-node latency comes from the graph's "updates" stream.
+The report also has tool-call counts, bytes written, and end-to-end
+p50/p95 per size. Results are written as JSON together with the current
+git commit. `--compare` prints the change against an earlier results file.
+`--batch-tokens` sets SOLACE_CODER_BATCH_TOKENS, so running once with 0 and
+once with a budget shows the LLM calls saved by batched coder mode.
+"""
+import argparse
+import json
+import os
+import pathlib
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+import agent.graph as graph_module
+from agent.tools import delete_session_root, get_storage, init_project_root, session_scope
+from benchmarks.fake_llm import FakeChatModel
+
+
+def canned_plan(size: int) -> dict:
+    return {
+        "name": f"bench-{size}",
+        "description": "benchmark app",
+        "techstack": "HTML, CSS, JavaScript",
+        "features": ["feature"],
+        "files": [{"path": f"src/module_{i}.js", "purpose": f"module {i}"} for i in range(size)],
+    }
+
+
+def canned_task_plan(size: int) -> dict:
+    steps = []
+    for i in range(size):
+        # every fourth module builds on the first one, the rest are independent
+        depends = ["src/module_0.js"] if i and i % 4 == 0 else []
+        steps.append({"file_path": f"src/module_{i}.js", "task_description": f"Implement module {i}", "depends_on": depends})
+    return {"implimentation_steps": steps}
+
+
+class ScriptedModel:
+    """Builds the fake model's responder and counts what the 'model' asked for."""
+
+    def __init__(self, size: int, file_bytes: int, latency: float, jitter: float, seed: int):
+        self.size = size
+        self.body = ("x" * 79 + "\n") * max(1, file_bytes // 80)
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.model_calls = 0
+        self.tool_calls: Counter = Counter()
+
+    def __call__(self, messages):
+        with self.lock:
+            self.model_calls += 1
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content="done")
+        text = str(last.content)
+        if "expert software planner" in text:
+            return AIMessage(content=json.dumps(canned_plan(self.size)))
+        if "expert software architect" in text:
+            return AIMessage(content=json.dumps(canned_task_plan(self.size)))
+        # a batched coder prompt lists several files; write each of them
+        paths = [p.strip() for p in re.findall(r"File to modify: (.+)", text)]
+        with self.lock:
+            self.tool_calls["write_file"] += len(paths)
+        return AIMessage(content="", tool_calls=[{
+            "name": "write_file", "args": {"path": path, "content": self.body}, "id": f"call_{uuid.uuid4().hex[:8]}",
+        } for path in paths])
+
+
+def run_once(size: int, args, seed: int) -> dict:
+    scripted = ScriptedModel(size, args.file_bytes, args.latency, args.jitter, seed)
+    graph_module.llm = FakeChatModel(responder=scripted)
+    sid = f"bench-{uuid.uuid4()}"
+    init_project_root(sid)
+    node_ms: dict[str, float] = defaultdict(float)
+    coder_passes = 0
+    t0 = last = time.perf_counter()
+    with session_scope(sid):
+        for update in graph_module.get_agent().stream(
+            {"user_prompt": f"benchmark {size}", "session_id": sid},
+            {"recursion_limit": 10 * size + 20, "configurable": {"thread_id": sid}},
+            stream_mode="updates",
+        ):
+            now = time.perf_counter()
+            for node in update:
+                node_ms[node] += (now - last) * 1000
+                coder_passes += node == "coder"
+            last = now
+    total_ms = (time.perf_counter() - t0) * 1000
+    graph_module.get_agent().checkpointer.delete_thread(sid)
+    files = get_storage(sid).snapshot()
+    delete_session_root(sid)
+    assert len(files) == size, f"expected {size} files, got {len(files)}"
+    return {
+        "total_ms": total_ms,
+        "node_ms": dict(node_ms),
+        "coder_passes": coder_passes,
+        "model_calls": scripted.model_calls,
+        "tool_calls": dict(scripted.tool_calls),
+        "bytes_written": sum(len(c.encode("utf-8")) for c in files.values()),
+    }
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(size: int, runs: list[dict]) -> dict:
+    totals = [r["total_ms"] for r in runs]
+    nodes = sorted({n for r in runs for n in r["node_ms"]})
+    return {
+        "plan_size": size,
+        "runs": len(runs),
+        "e2e_ms_p50": percentile(totals, 0.50),
+        "e2e_ms_p95": percentile(totals, 0.95),
+        "e2e_ms_mean": statistics.mean(totals),
+        "node_ms_mean": {n: statistics.mean(r["node_ms"].get(n, 0.0) for r in runs) for n in nodes},
+        "coder_passes": runs[-1]["coder_passes"],
+        "model_calls": runs[-1]["model_calls"],
+        "tool_calls": runs[-1]["tool_calls"],
+        "bytes_written": runs[-1]["bytes_written"],
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: str) -> None:
+    baseline = json.loads(pathlib.Path(baseline_path).read_text(encoding="utf-8"))
+    old = {r["plan_size"]: r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} (commit {baseline.get('commit')}):")
+    for r in current["results"]:
+        b = old.get(r["plan_size"])
+        if not b:
+            continue
+        for key in ("e2e_ms_p50", "e2e_ms_p95", "model_calls"):
+            delta = (r[key] - b[key]) / b[key] * 100 if b[key] else 0.0
+            print(f"  size {r['plan_size']:>4} {key:12s} {b[key]:10.1f} -> {r[key]:10.1f} ({delta:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every model call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency per call, up to this many seconds")
+    parser.add_argument("--file-bytes", type=int, default=2048)
+    parser.add_argument("--batch-tokens", type=int, help="coder batch budget (SOLACE_CODER_BATCH_TOKENS); 0 disables")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results/e2e.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+    if args.batch_tokens is not None:
+        os.environ["SOLACE_CODER_BATCH_TOKENS"] = str(args.batch_tokens)
+
+    results = []
+    for size in args.sizes:
+        runs = [run_once(size, args, args.seed + i) for i in range(args.repeats)]
+        summary = summarize(size, runs)
+        results.append(summary)
+        nodes = ", ".join(f"{n} {ms:.0f}ms" for n, ms in summary["node_ms_mean"].items())
+        print(f"size {size:>4}: p50 {summary['e2e_ms_p50']:8.1f} ms  p95 {summary['e2e_ms_p95']:8.1f} ms  "
+              f"model calls {summary['model_calls']:4d}  tool calls {sum(summary['tool_calls'].values()):4d}  "
+              f"bytes {summary['bytes_written']:8d}  [{nodes}]")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "env": {k: v for k, v in os.environ.items() if k.startswith("SOLACE_")},
+        "results": results,
+    }
+    out = pathlib.Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"wrote {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
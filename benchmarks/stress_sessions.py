@@ -0,0 +1,104 @@
+"""Run many simulated generations concurrently and check no session writes into another.
+
+Run from the repository root:
+
+    python -m benchmarks.stress_sessions [--sessions 40] [--workers 16] [--files 4]
+
+Every session gets a unique marker. The fake model plans `--files` files
+whose task descriptions carry the marker, and the coder writes the marker
+into each file. Afterwards each session's storage must contain exactly its
+own files, each carrying only its own marker. Exits non-zero on any leak.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("SOLACE_LLM_CACHE", "0")
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+import agent.graph as graph_module
+from agent.tools import delete_session_root, get_storage, init_project_root, session_scope
+from benchmarks.fake_llm import FakeChatModel
+
+
+def make_responder(files: int):
+    def responder(messages):
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content="done")
+        text = str(last.content)
+        if "expert software planner" in text:
+            marker = re.search(r"User request: build (\S+)", text).group(1)
+            return AIMessage(content=json.dumps({
+                "name": marker, "description": "stress", "techstack": "js", "features": [],
+                "files": [{"path": f"src/f{i}.js", "purpose": "x"} for i in range(files)],
+            }))
+        if "expert software architect" in text:
+            marker = re.search(r'"name":\s*"([^"]+)"', text).group(1)
+            return AIMessage(content=json.dumps({"implimentation_steps": [
+                {"file_path": f"src/f{i}.js", "task_description": f"marker {marker}", "depends_on": []}
+                for i in range(files)
+            ]}))
+        marker = re.search(r"Task: marker (\S+)", text).group(1)
+        path = re.search(r"File to modify: (.+)", text).group(1).strip()
+        time.sleep(random.uniform(0, 0.01))  # shuffle interleavings between sessions
+        return AIMessage(content="", tool_calls=[{
+            "name": "write_file", "args": {"path": path, "content": marker}, "id": f"call_{uuid.uuid4().hex[:8]}",
+        }])
+    return responder
+
+
+def run_session(marker: str) -> None:
+    init_project_root(marker)
+    with session_scope(marker):
+        for _ in graph_module.stream_generation(f"build {marker}", marker):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--files", type=int, default=4)
+    args = parser.parse_args()
+
+    graph_module.llm = FakeChatModel(responder=make_responder(args.files))
+    markers = [f"stress-{uuid.uuid4().hex[:12]}" for _ in range(args.sessions)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(run_session, markers))
+    elapsed = time.perf_counter() - t0
+
+    expected = {f"src/f{i}.js" for i in range(args.files)}
+    leaks = []
+    for marker in markers:
+        files = get_storage(marker).snapshot()
+        if set(files) != expected:
+            leaks.append(f"{marker}: files {sorted(files)}")
+        for rel, content in files.items():
+            if content != marker:
+                leaks.append(f"{marker}/{rel}: contains {content!r}")
+        delete_session_root(marker)
+    stray = get_storage(None).list()
+    if stray:
+        leaks.append(f"writes escaped to the default project root: {stray[:5]}")
+
+    print(f"{args.sessions} sessions x {args.files} files on {args.workers} threads in {elapsed:.2f}s")
+    if leaks:
+        print(f"FAIL: {len(leaks)} cross-session writes")
+        for line in leaks[:20]:
+            print("  " + line)
+        sys.exit(1)
+    print("OK: no cross-session writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Project persistence in the browser's localStorage, through a bidirectional Streamlit component.
+
+Layout (written by frontend/index.html):
+
+    solace:m:<session id>   manifest JSON {"v": 1, "t": saved-at ms, "files": {path: {"h", "n", "s"}}}
+    solace:b:<hash>:<i>     chunk i of a blob: base64 of the raw-deflate-compressed file content
+    solace:last             session id of the most recent save
+
+Blobs are content-addressed, so files that did not change are neither
+sent to the browser again nor rewritten, and blobs no manifest references
+are deleted after each save. Compression happens here (zlib raw deflate,
+the same format as the browser's CompressionStream("deflate-raw")), so
+what crosses the websocket is already compressed. Restores come back as
+the component's value instead of through the page URL.
+"""
+import base64
+import hashlib
+import json
+import pathlib
+import time
+import zlib
+from typing import Optional
+
+FRONTEND_DIR = pathlib.Path(__file__).parent / "frontend"
+
+# characters per localStorage value; keeps single writes small and under per-item limits
+CHUNK_CHARS = 256 * 1024
+
+_component = None
+
+
+def _store():
+    global _component
+    if _component is None:
+        import streamlit.components.v1 as components
+
+        _component = components.declare_component("solace_store", path=str(FRONTEND_DIR))
+    return _component
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+def compress(content: str) -> str:
+    c = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return base64.b64encode(c.compress(content.encode("utf-8")) + c.flush()).decode("ascii")
+
+
+def decompress(blob: str) -> str:
+    return zlib.decompress(base64.b64decode(blob), -15).decode("utf-8")
+
+
+def encode_payload(files: dict[str, str], known: Optional[dict[str, int]] = None) -> tuple[dict, dict[str, list[str]]]:
+    """(manifest, blobs) for files; blobs the browser already has (known: hash -> chunk count) are left out."""
+    known = known or {}
+    manifest: dict = {"v": 1, "t": int(time.time() * 1000), "files": {}}
+    blobs: dict[str, list[str]] = {}
+    for path, content in files.items():
+        h = content_hash(content)
+        if h not in known and h not in blobs:
+            data = compress(content)
+            blobs[h] = [data[i:i + CHUNK_CHARS] for i in range(0, len(data), CHUNK_CHARS)] or [""]
+        manifest["files"][path] = {"h": h, "n": known[h] if h in known else len(blobs[h]), "s": len(content)}
+    return manifest, blobs
+
+
+def decode_payload(manifest: dict, blobs: dict[str, str]) -> dict[str, str]:
+    """path -> content from a restored manifest and its blobs (joined chunks); unreadable files are skipped."""
+    files = {}
+    for path, entry in (manifest.get("files") or {}).items():
+        blob = blobs.get(entry.get("h"))
+        if blob is None:
+            continue
+        try:
+            files[path] = decompress(blob)
+        except (ValueError, zlib.error, UnicodeDecodeError):
+            continue
+    return files
+
+
+def save(session_id: str, files: dict[str, str], known: Optional[dict[str, int]] = None,
+         key: Optional[str] = None) -> dict[str, int]:
+    """Store files in the browser under session_id; returns the blobs it now has (hash -> chunk count)."""
+    manifest, blobs = encode_payload(files, known)
+    _store()(op="save", sid=session_id, manifest=manifest, blobs=blobs, nonce=manifest["t"],
+             key=key or f"solace_store_save_{manifest['t']}", default=None)
+    return {entry["h"]: entry["n"] for entry in manifest["files"].values()}
+
+
+def restore(key: str = "solace_store_restore") -> Optional[dict]:
+    """The most recently saved project, once the component has answered.
+
+    None while waiting; then {"sid", "files", "known"} (files empty when
+    the browser has nothing stored; known is the blobs it holds, for save()).
+    """
+    value = _store()(op="restore", key=key, default=None)
+    if not value:
+        return None
+    if value.get("legacy"):
+        # written by the old send_to_local_storage: one JSON string per session
+        try:
+            files = json.loads(value["legacy"])
+        except ValueError:
+            files = {}
+        return {"sid": value.get("sid"), "files": files if isinstance(files, dict) else {}, "known": {}}
+    manifest = value.get("manifest") or {}
+    files = decode_payload(manifest, value.get("blobs") or {})
+    entries = manifest.get("files") or {}
+    known = {entries[p]["h"]: entries[p]["n"] for p in files}
+    return {"sid": value.get("sid"), "files": files, "known": known}
+
+
+def clear(session_id: str, key: Optional[str] = None) -> None:
+    """Delete a session's manifest (and blobs no other session uses) from the browser."""
+    nonce = int(time.time() * 1000)
+    _store()(op="clear", sid=session_id, nonce=nonce, key=key or f"solace_store_clear_{nonce}", default=None)
@@ -0,0 +1,59 @@
+import pathlib
+import tempfile
+import unittest
+
+from agent.storage import MemoryBackend
+
+
+class MemoryMirrorTest(unittest.TestCase):
+    """The disk mirror run_cmd works on must follow deletions made in memory."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tmp.name) / "project"
+        self.storage = MemoryBackend()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def command(self, run=None):
+        # what run_cmd does around every command
+        self.storage.sync_to_disk(self.root)
+        if run is not None:
+            run(self.root)
+        self.storage.sync_from_disk(self.root)
+
+    def test_deleted_file_stays_deleted_across_commands(self):
+        self.storage.write("a.js", b"a")
+        self.storage.write("b.js", b"b")
+        self.command()
+        self.storage.delete("b.js")
+        self.command()
+        self.assertEqual(self.storage.list(), ["a.js"])
+        self.assertFalse((self.root / "b.js").exists())
+
+    def test_deleted_file_not_imported_before_next_sync_to_disk(self):
+        self.storage.write("a.js", b"a")
+        self.command()
+        self.storage.delete("a.js")
+        self.storage.sync_from_disk(self.root)
+        self.assertEqual(self.storage.list(), [])
+
+    def test_rewritten_file_survives(self):
+        self.storage.write("a.js", b"a")
+        self.command()
+        self.storage.delete("a.js")
+        self.storage.write("a.js", b"again")
+        self.command()
+        self.assertEqual(self.storage.read("a.js"), b"again")
+
+    def test_command_can_recreate_deleted_file(self):
+        self.storage.write("a.js", b"a")
+        self.command()
+        self.storage.delete("a.js")
+        self.command(lambda root: (root / "a.js").write_bytes(b"from command"))
+        self.assertEqual(self.storage.read("a.js"), b"from command")
+
+
+if __name__ == "__main__":
+    unittest.main()
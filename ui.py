@@ -1,173 +1,67 @@
-import io
 import os
+import threading
 import time
-import zipfile
 from pathlib import Path
 import uuid
-from functools import partial
-import threading
-import socket
-from http.server import SimpleHTTPRequestHandler
-from socketserver import TCPServer
 
 import streamlit as st
 from dotenv import load_dotenv
-from streamlit import components
-import base64
-import json as _json
-import urllib.parse
-import shutil
+
+import browser_store
 
 # Ensure environment variables (e.g., API keys) are loaded
 load_dotenv()
 
-# Import the compiled agent and project tools
-from agent.graph import agent  # type: ignore
-from agent.tools import (
-    init_project_root,
-    get_project_root,
-    delete_session_root,
-    cleanup_stale_sessions,
-    set_default_session_id,
-)
+# Lightweight helpers only: the graph, model clients and project tools (langgraph, langchain) are
+# imported where they are used, so the first page renders without them
+from agent.export import zip_bytes
+from agent.jobs import CANCELLED, FINISHED, QUEUED, SUCCEEDED, JobRejected, job_queue
+from agent.preview import DirectorySnapshot, preview_server
+from agent.tracing import read_trace
 
 
 PROJECT_DIR = Path.cwd() / "generated_project"
 
 
-def get_preview_dir(session_id: str) -> Path:
-    return Path(f"/tmp/solace/preview/{session_id}")
-
-
-def materialize_preview(session_id: str, files_payload: dict[str, str]) -> Path:
-    """Write the in-memory files to a temp preview directory and return the path."""
-    preview_dir = get_preview_dir(session_id)
-    # clean old
-    if preview_dir.exists():
+def _housekeeping_loop(interval: float) -> None:
+    # best-effort cleanup of stale sessions and traces, off the render path; the first pass waits a
+    # minute so its imports don't compete with the first page renders
+    time.sleep(min(60.0, interval))
+    while True:
         try:
-            shutil.rmtree(preview_dir)
-        except Exception:
-            pass
-    preview_dir.mkdir(parents=True, exist_ok=True)
-    for rel_path, content in files_payload.items():
-        try:
-            target = preview_dir / rel_path
-            target.parent.mkdir(parents=True, exist_ok=True)
-            target.write_text(content, encoding="utf-8")
-        except Exception:
-            # skip any problematic files
-            continue
-    return preview_dir
+            from agent.tools import cleanup_stale_sessions
+            from agent.tracing import cleanup_traces
 
+            from agent.incremental import cleanup_runs
 
-def clear_preview_dir(session_id: str) -> None:
-    p = get_preview_dir(session_id)
-    if p.exists():
-        try:
-            shutil.rmtree(p)
+            cleanup_stale_sessions(max_age_hours=6)
+            cleanup_traces(max_age_hours=6)
+            cleanup_runs(max_age_hours=48)
+            job_queue().store.cleanup(max_age_hours=6)
         except Exception:
             pass
+        time.sleep(interval)
 
 
-# best-effort cleanup of stale sessions on app start
-try:
-    cleanup_stale_sessions(max_age_hours=6)
-except Exception:
-    pass
+@st.cache_resource
+def start_background_services() -> None:
+    """Once per server process: start periodic housekeeping (SOLACE_HOUSEKEEPING_SECONDS, default 30 min)."""
+    interval = float(os.getenv("SOLACE_HOUSEKEEPING_SECONDS", "1800"))
+    threading.Thread(target=_housekeeping_loop, args=(interval,), name="solace-housekeeping", daemon=True).start()
 
-# On hard refresh, optionally restore from URL query params if provided by the browser bridge
-params = st.query_params
 
-def _first_param_value(v):
-    try:
-        # Streamlit may return list-like values in query params
-        if isinstance(v, (list, tuple)):
-            return v[0] if v else ""
-        return v or ""
-    except Exception:
-        return ""
-if (
-    "ls" in params
-    and _first_param_value(params.get("ls"))
-    and "restored_once" not in st.session_state
-):
-    try:
-        sid = _first_param_value(params.get("sid", ""))
-        b64 = _first_param_value(params.get("ls", ""))
-        raw = base64.b64decode(b64).decode("utf-8")
-        payload = _json.loads(raw)
-        if sid:
-            st.session_state["session_id"] = sid
-        st.session_state["project_files_payload"] = payload
-        st.session_state["url_cleaned"] = False
-        st.session_state["restored_once"] = True
-    except Exception:
-        pass
-    # Defer URL cleanup to after Streamlit state is initialized
-
-# If no in-memory payload and no URL restore present, auto-restore from LocalStorage (pick most recent)
-if "project_files_payload" not in st.session_state and not ("ls" in params and params.get("ls")):
-    auto_bridge = """
-    <script>
-    (function() {
-      try {
-        // Don't loop if params already present
-        const urlParams = new URLSearchParams(window.location.search);
-        if (urlParams.get('ls')) return;
-
-        // Pick most recent by saved timestamp
-        let chosenSid = null;
-        let latestTs = -1;
-        for (let i = 0; i < localStorage.length; i++) {
-          const k = localStorage.key(i);
-          if (!k) continue;
-          if (k.startsWith('solace_saved_at:')) {
-            const sid = k.substring('solace_saved_at:'.length);
-            const ts = parseInt(localStorage.getItem(k) || '0', 10) || 0;
-            if (ts > latestTs) { latestTs = ts; chosenSid = sid; }
-          }
-        }
-        if (!chosenSid) {
-          chosenSid = localStorage.getItem('solace_session_id') || null;
-        }
-        if (!chosenSid) {
-          // fallback: first JSON-looking entry
-          for (let i = 0; i < localStorage.length; i++) {
-            const k = localStorage.key(i);
-            if (!k) continue;
-            try {
-              const v = localStorage.getItem(k) || '';
-              const obj = JSON.parse(v);
-              if (obj && typeof obj === 'object') { chosenSid = k; break; }
-            } catch (e) { /* ignore */ }
-          }
-        }
-        if (!chosenSid) return; // nothing to restore
-        const data = localStorage.getItem(chosenSid) || '{}';
-        const b64 = btoa(unescape(encodeURIComponent(data)));
-        const params = new URLSearchParams(window.location.search);
-        params.set('sid', chosenSid);
-        params.set('ls', b64);
-        const next = window.location.pathname + '?' + params.toString();
-        window.location.replace(next);
-      } catch (e) {
-        console.error('auto-restore failed', e);
-      }
-    })();
-    </script>
-    """
-    components.v1.html(auto_bridge, height=0)
-
-
-
-def zip_directory_to_bytes(directory: Path) -> bytes:
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in directory.rglob("*"):
-            if file_path.is_file():
-                zipf.write(file_path, arcname=file_path.relative_to(directory))
-    buffer.seek(0)
-    return buffer.read()
+start_background_services()
+
+# On a fresh page load, restore the most recent project saved in this browser (answered by the component)
+if "project_files_payload" not in st.session_state and not st.session_state.get("browser_restore_done"):
+    restored = browser_store.restore()
+    if restored is not None:
+        st.session_state["browser_restore_done"] = True
+        if restored["files"]:
+            if restored["sid"]:
+                st.session_state["session_id"] = restored["sid"]
+            st.session_state["project_files_payload"] = restored["files"]
+            st.session_state["browser_known_blobs"] = restored["known"]
 
 
 def list_files_recursive(directory: Path) -> list[Path]:
@@ -194,102 +88,132 @@ def render_file_preview(file_path: Path):
         st.text(content)
 
 
-def run_generation(user_prompt: str, session_id: str):
-    # Ensure session directory exists (agent also initializes)
-    init_project_root(session_id)
-    # Force all tool calls to route to this session
-    try:
-        set_default_session_id(session_id)
-    except Exception:
-        pass
-    # Invoke the agent with session context
-    result = agent.invoke({"user_prompt": user_prompt, "session_id": session_id}, {"recursion_limit": 100})
-    return result
+def render_run_timings(trace_id: str):
+    """Show the spans of one generation: graph nodes, coder steps and tool calls."""
+    spans = read_trace(trace_id)
+    if not spans:
+        st.caption("No timings recorded for the last generation.")
+        return
+    nodes = [s for s in spans if s["kind"] == "node"]
+    tokens_in = sum(s["attrs"].get("input_tokens", 0) for s in spans if s["kind"] in ("node", "step"))
+    tokens_out = sum(s["attrs"].get("output_tokens", 0) for s in spans if s["kind"] in ("node", "step"))
+    wall_ms = (max(s["start"] * 1000 + s["duration_ms"] for s in spans) - spans[0]["start"] * 1000)
+    st.caption(f"Wall clock {wall_ms / 1000:.1f}s · {len(nodes)} node runs · tokens in {tokens_in} / out {tokens_out}")
+    rows = []
+    for s in spans:
+        label = s["name"]
+        if s["kind"] == "step":
+            label = f"step {s['attrs'].get('step', 0) + 1}: {s['attrs'].get('file_path', '')}"
+        rows.append({
+            "span": label,
+            "kind": s["kind"],
+            "start (s)": round(s["start"] - spans[0]["start"], 3),
+            "duration (ms)": round(s["duration_ms"], 1),
+            "tokens in": s["attrs"].get("input_tokens", ""),
+            "tokens out": s["attrs"].get("output_tokens", ""),
+            "status": s["status"] + (f", {s['attrs']['dropped_items']} truncated item(s) dropped"
+                                     if s["attrs"].get("dropped_items") else ""),
+        })
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every=1.0)
+def render_job_progress(job_id: str):
+    """Poll a running generation job; only this fragment reruns until the job finishes."""
+    job = job_queue().get(job_id)
+    if job is None or job["status"] in FINISHED:
+        # the full script run collects the result
+        st.rerun(scope="app")
+    with st.status("Resuming generation..." if job["resume"] else "Generating app...", expanded=True):
+        if job["status"] == QUEUED:
+            stats = job_queue().stats()
+            st.write(f"Waiting for a free worker ({stats['waiting']} generations waiting, {stats['running']} running)...")
+        elif not job["total_steps"]:
+            st.write(f"Plan ready: **{job['plan_name']}**, writing the task plan..." if job["plan_name"] else "Planning...")
+        else:
+            st.write(f"Plan: **{job['plan_name']}**")
+            st.progress(job["steps_done"] / job["total_steps"],
+                        text=f"{job['steps_done']}/{job['total_steps']} steps done"
+                        + (f" · working on `{job['current_file']}`" if job["current_file"] else ""))
+        if job["steps_reused"]:
+            st.caption(f"{job['steps_reused']} unchanged steps kept from the current project")
+        if job["files_written"]:
+            st.markdown("\n".join(f"- {name}" for name in sorted(job["files_written"])))
+        if job["last_file"]:
+            st.caption(f"Latest write: `{job['last_file']}`")
+            st.code(job["last_content"] or "", language=job["last_file"].split(".")[-1])
+    if not job["cancel_requested"] and st.button("Cancel generation", key="cancel_job"):
+        job_queue().cancel(job_id)
+        job["cancel_requested"] = True
+    if job["cancel_requested"]:
+        st.caption("Cancelling after the steps in progress...")
+
+
+def collect_job(job: dict):
+    """Take a finished job's result into this page: files to the browser store on success, Resume otherwise."""
+    st.session_state.pop("job_id", None)
+    st.query_params.pop("job", None)
+    if job["trace_id"]:
+        st.session_state["last_trace_id"] = job["trace_id"]
+    session_id = job["session_id"]
+    if job["status"] == SUCCEEDED:
+        files_payload = read_all_session_files(session_id)
+        reused = f"reused {job['steps_reused']} of {job['total_steps']} steps, " if job["steps_reused"] else ""
+        # persist in the browser; blobs it already holds are not sent again
+        st.session_state["browser_known_blobs"] = browser_store.save(
+            session_id, files_payload, st.session_state.get("browser_known_blobs"))
+        # keep in-memory copy for immediate preview
+        st.session_state["project_files_payload"] = files_payload
+        # release the session's server-side storage (memory and any disk mirror)
+        from agent.tools import delete_session_root
+
+        delete_session_root(session_id)
+        st.session_state.pop("failed_prompt", None)
+        st.success(f"Generation complete ({reused}stored in your browser)")
+    elif job["status"] == CANCELLED:
+        st.session_state["failed_prompt"] = job["prompt"]
+        st.warning(f"Generation cancelled after {job['steps_done']} of {job['total_steps'] or '?'} steps "
+                   "(use Resume to continue)")
+    else:
+        st.session_state["failed_prompt"] = job["prompt"]
+        st.error(f"Generation failed (use Resume to continue): {job['error']}")
 
 
-def read_all_session_files(session_id: str) -> dict[str, str]:
-    """Read all files from the per-session temp directory and return a mapping of path->content."""
-    root = get_project_root(session_id)
-    data: dict[str, str] = {}
-    if not root.exists():
-        return data
-    for p in root.rglob("*"):
-        if p.is_file():
-            rel = str(p.relative_to(root))
-            try:
-                data[rel] = p.read_text(encoding="utf-8")
-            except Exception:
-                # skip unreadable files
-                continue
-    return data
-
-
-def send_to_local_storage(session_id: str, payload: dict[str, str]):
-    """Emit a small HTML/JS component that stores payload JSON in localStorage under sessionId."""
-    js = f"""
-    <script>
-      try {{
-        const key = {session_id!r};
-        const payload = {_json.dumps(payload)};
-        localStorage.setItem(key, JSON.stringify(payload));
-        // remember last session id
-        localStorage.setItem('solace_session_id', key);
-        // store a timestamp to help pick the most recent session
-        try {{ localStorage.setItem('solace_saved_at:' + key, String(Date.now())); }} catch (e) {{}}
-        window.parent.postMessage({{ type: 'solace-localstore-success', sessionId: key }}, '*');
-      }} catch (e) {{
-        window.parent.postMessage({{ type: 'solace-localstore-error', error: String(e) }}, '*');
-      }}
-    </script>
-    """
-    components.v1.html(js, height=0)
-
-
-# --- Sandbox HTTP server for live app preview ---
-class ThreadedTCPServer(TCPServer):
-    allow_reuse_address = True
-
-
-def find_free_port() -> int:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("127.0.0.1", 0))
-        return s.getsockname()[1]
-
-
-def ensure_sandbox_server(directory: Path):
-    if "sandbox_server" not in st.session_state:
-        st.session_state["sandbox_server"] = {
-            "thread": None,
-            "port": None,
-            "dir": None,
-        }
-    sv = st.session_state["sandbox_server"]
-    if sv["thread"] and sv["thread"].is_alive() and sv["dir"] == str(directory):
-        return sv["port"]
-
-    # Start/restart server
-    port = find_free_port()
-    handler = partial(SimpleHTTPRequestHandler, directory=str(directory))
-
-    httpd = ThreadedTCPServer(("127.0.0.1", port), handler)
-
-    def serve():
-        try:
-            httpd.serve_forever()
-        finally:
-            httpd.server_close()
+def _can_resume(session_id: str) -> bool:
+    from agent.graph import can_resume
+
+    return can_resume(session_id)
 
-    thread = threading.Thread(target=serve, daemon=True)
-    thread.start()
 
-    sv.update({"thread": thread, "port": port, "dir": str(directory)})
-    return port
+def read_all_session_files(session_id: str) -> dict[str, str]:
+    """Return the session's generated files as a mapping of path->content, straight from its storage backend."""
+    from agent.tools import get_storage
+
+    return get_storage(session_id).snapshot()
 
 
 st.set_page_config(page_title="Solace", page_icon="🤖", layout="wide")
 st.title("Solace UI")
 st.write("Type a prompt, generate an app, preview files, and download.")
 
+# A job id in the URL reattaches this page to a generation started before a reload or navigation
+if "job_id" not in st.session_state and st.query_params.get("job"):
+    reattached = job_queue().get(st.query_params["job"])
+    if reattached is not None:
+        st.session_state["job_id"] = reattached["id"]
+        st.session_state["session_id"] = reattached["session_id"]
+    else:
+        st.query_params.pop("job", None)
+
+# Collect a finished job before the sidebar is built, so Resume is offered right away
+if "job_id" in st.session_state:
+    finished_job = job_queue().get(st.session_state["job_id"])
+    if finished_job is None:
+        st.session_state.pop("job_id", None)
+        st.query_params.pop("job", None)
+    elif finished_job["status"] in FINISHED:
+        collect_job(finished_job)
+
 with st.sidebar:
     # Ensure a per-tab session id
     if "session_id" not in st.session_state:
@@ -302,15 +226,25 @@ with st.sidebar:
         placeholder="e.g., Create a simple calculator web app with +, -, ×, ÷",
         height=140,
     )
-    generate_clicked = st.button("Generate", type="primary", use_container_width=True)
+    job_running = "job_id" in st.session_state
+    # With a project on screen, a changed prompt only redoes the steps it affects
+    incremental = False
+    if st.session_state.get("project_files_payload"):
+        incremental = st.checkbox("Build on the current project", value=True, disabled=job_running,
+                                  help="Keep unchanged files and only redo the steps your new prompt changes.")
+    generate_clicked = st.button("Generate", type="primary", use_container_width=True, disabled=job_running)
+    # After a failed run, offer to continue it from the last completed step instead of starting over
+    resume_clicked = False
+    if st.session_state.get("failed_prompt") and not job_running and _can_resume(session_id):
+        resume_clicked = st.button("Resume last generation", use_container_width=True)
 
     st.divider()
     clear_clicked = st.button("Clear generated project", use_container_width=True)
 
     if clear_clicked:
-        # also clear any preview directory
+        # stop serving this session's preview
         try:
-            clear_preview_dir(session_id)
+            preview_server().release(session_id)
         except Exception:
             pass
         if PROJECT_DIR.exists():
@@ -326,48 +260,55 @@ with st.sidebar:
         # Clear in-memory payload
         if "project_files_payload" in st.session_state:
             st.session_state.pop("project_files_payload", None)
-        # Clear LocalStorage entries for this session in the browser
-        components.v1.html(
-            (
-                """
-                <script>
-                try {
-                  const sid = localStorage.getItem('solace_session_id') || %s;
-                  if (sid) {
-                    localStorage.removeItem(sid);
-                    try { localStorage.removeItem('solace_saved_at:' + sid); } catch (e) {}
-                  }
-                  try { localStorage.removeItem('solace_session_id'); } catch (e) {}
-                } catch (e) {}
-                </script>
-                """
-                % (repr(session_id))
-            ),
-            height=0,
-        )
+        # Clear this session's project from the browser on the next run (st.rerun would cut this one short)
+        st.session_state["browser_clear_pending"] = session_id
+        st.session_state.pop("browser_known_blobs", None)
         st.rerun()
 
+    if st.session_state.get("browser_clear_pending"):
+        browser_store.clear(st.session_state.pop("browser_clear_pending"))
+
 
-if generate_clicked:
-    if not prompt or not prompt.strip():
+if generate_clicked or resume_clicked:
+    if generate_clicked and (not prompt or not prompt.strip()):
         st.error("Please enter a prompt before generating.")
     else:
-        with st.status("Generating app...", expanded=True) as status:
-            st.write("Invoking agent with your prompt...")
-            try:
-                _ = run_generation(prompt.strip(), session_id)
-                # collect all generated files for this session
-                files_payload = read_all_session_files(session_id)
-                # send to localStorage in the browser
-                send_to_local_storage(session_id, files_payload)
-                # keep in-memory copy for immediate preview
-                st.session_state["project_files_payload"] = files_payload
-                # delete temp session directory on the server
-                delete_session_root(session_id)
-                status.update(label="Generation complete (stored in your browser)", state="complete")
-            except Exception as e:
-                status.update(label="Generation failed", state="error")
-                st.exception(e)
+        user_prompt = prompt.strip() if generate_clicked else st.session_state["failed_prompt"]
+        incremental = incremental and generate_clicked
+        if incremental:
+            # the previous project lives in the browser; put it back in the session's storage to build on
+            from agent.incremental import restore_files
+
+            restore_files(session_id, st.session_state["project_files_payload"])
+        # the generation runs on the server's job workers; this page only polls it
+        try:
+            job_id = job_queue().submit(user_prompt, session_id, resume=resume_clicked, incremental=incremental)
+        except JobRejected as e:
+            st.warning(f"Generation not started: {e}")
+        else:
+            st.session_state["job_id"] = job_id
+            st.query_params["job"] = job_id
+            st.rerun()
+
+if "job_id" in st.session_state:
+    render_job_progress(st.session_state["job_id"])
+
+if st.session_state.get("last_trace_id"):
+    with st.expander("Run timings", expanded=False):
+        render_run_timings(st.session_state["last_trace_id"])
+        from agent.models import route_stats
+
+        stats = route_stats()
+        if stats:
+            st.caption("Model routes since server start: calls, errors, fallbacks taken and latency of successful calls")
+            st.dataframe(stats, use_container_width=True, hide_index=True)
+        from agent.llm_cache import response_cache
+
+        cache = response_cache()
+        if cache is not None:
+            c = cache.stats()
+            st.caption(f"LLM response cache since server start: {c['hits']} hits / {c['misses']} misses · "
+                       f"{c['entries']} entries ({c['bytes'] / 1e6:.1f} MB) · {c['evictions']} evictions")
 
 
 left, right = st.columns([1, 2], gap="large")
@@ -379,6 +320,16 @@ with left:
         file_names = sorted(files_payload.keys())
         for name in file_names:
             st.write(f"- {name}")
+
+        st.divider()
+        st.download_button(
+            label="Download project as ZIP",
+            data=zip_bytes(files_payload),
+            file_name="generated_project.zip",
+            mime="application/zip",
+            use_container_width=True,
+            key="download_zip",
+        )
     else:
         files = list_files_recursive(PROJECT_DIR)
         if not files:
@@ -390,13 +341,13 @@ with left:
         st.divider()
         zip_disabled = not PROJECT_DIR.exists() or not any(PROJECT_DIR.rglob("*"))
         if not zip_disabled:
-            zip_bytes = zip_directory_to_bytes(PROJECT_DIR)
             st.download_button(
                 label="Download project as ZIP",
-                data=zip_bytes,
+                data=zip_bytes(PROJECT_DIR),
                 file_name="generated_project.zip",
                 mime="application/zip",
                 use_container_width=True,
+                key="download_zip",
             )
 
 with right:
@@ -415,13 +366,12 @@ with right:
 
             with tab_app:
                 try:
-                    preview_dir = materialize_preview(session_id, files_payload)
-                    port = ensure_sandbox_server(preview_dir)
+                    preview_url = preview_server().publish(session_id, files_payload)
                     nonce = str(int(time.time()))
                     st.markdown(
                         f"""
                         <div style="background:white; border-radius:8px; overflow:hidden;">
-                            <iframe src="http://127.0.0.1:{port}?_={nonce}" width="100%" height="700" frameborder="0"></iframe>
+                            <iframe src="{preview_url}?_={nonce}" width="100%" height="700" frameborder="0"></iframe>
                         </div>
                         """,
                         unsafe_allow_html=True
@@ -445,34 +395,17 @@ with right:
                 if not index_html.exists():
                     st.info("No index.html found. Generate a web app with an index.html to preview.")
                 else:
-                    port = ensure_sandbox_server(PROJECT_DIR)
+                    if "project_dir_snapshot" not in st.session_state:
+                        st.session_state["project_dir_snapshot"] = DirectorySnapshot(PROJECT_DIR)
+                    snapshot = st.session_state["project_dir_snapshot"]
+                    preview_url = preview_server().publish(session_id, snapshot.refresh())
                     # cache-buster to force reload on rerun
                     nonce = str(int(time.time()))
                     st.markdown(
                         f"""
                         <div style="background:white; border-radius:8px; overflow:hidden;">
-                            <iframe src="http://127.0.0.1:{port}?_={nonce}" width="100%" height="700" frameborder="0"></iframe>
+                            <iframe src="{preview_url}?_={nonce}" width="100%" height="700" frameborder="0"></iframe>
                         </div>
                         """,
                         unsafe_allow_html=True
                     )
-
-# After UI render: clean URL once after a successful restore
-params = st.query_params
-if (
-    "project_files_payload" in st.session_state
-    and not st.session_state.get("url_cleaned")
-    and "ls" in params
-    and _first_param_value(params.get("ls"))
-):
-    components.v1.html(
-        """
-        <script>
-        try { window.history.replaceState({}, document.title, window.location.pathname); } catch (e) {}
-        </script>
-        """,
-        height=0,
-    )
-    st.session_state["url_cleaned"] = True
-
-